@@ -0,0 +1,513 @@
+import mmap
+import struct
+import sys
+from array import array
+from heapq import heappush, heappop
+from math import isnan
+
+NO_POS = float('nan')  # the value stored in pos_x and pos_y for a node without position
+
+# binary file: header (magic, byte order check, n, m, mc), followed by the buffers of FIELDS in this order,
+# every buffer holds 8-byte items in the byte order of the machine that wrote the file.
+MAGIC = b'DWGCSR01'
+HEADER = struct.Struct('=8sqqqq')
+FIELDS = (('ids', 'q'), ('pos_x', 'd'), ('pos_y', 'd'),
+          ('out_offsets', 'q'), ('out_targets', 'q'), ('out_weights', 'd'),
+          ('in_offsets', 'q'), ('in_sources', 'q'), ('in_weights', 'd'))
+
+
+class CSRGraph:
+    """
+    This class represents a frozen, array-backed snapshot of a directed weighted graph - DiGraph.
+    The graph is stored in Compressed Sparse Row (CSR) form:
+    every node gets an index 0..n-1 (ids[i] is the node id of index i, and index[node_id] is the opposite map),
+    the out edges of index i are out_targets[out_offsets[i]:out_offsets[i + 1]] with the matching out_weights,
+    and the in edges are stored the same way in in_offsets, in_sources and in_weights.
+    All the buffers are flat typed arrays ('q' for indices, 'd' for weights and positions),
+    so an edge costs 16 bytes in each direction instead of a dict entry, and the buffers
+    can be handed to NumPy (numpy.frombuffer) without copying.
+    The snapshot is read only, it remembers the mode count (mc) of the graph it was built from.
+    """
+
+    def __init__(self, ids, pos_x, pos_y, out_offsets, out_targets, out_weights,
+                 in_offsets, in_sources, in_weights, mc: int = 0):
+        """
+        Constructor, wraps the given buffers as they are (they are not copied).
+        Any sequence of the right type may be used, e.g. array.array or a casted memoryview.
+        :param ids: node id of every index.
+        :param pos_x: x coordinate of every index, NO_POS (nan) if the node has no position.
+        :param pos_y: y coordinate of every index, NO_POS (nan) if the node has no position.
+        :param out_offsets: n + 1 offsets into out_targets and out_weights.
+        :param out_targets: index of the destination of every out edge.
+        :param out_weights: weight of every out edge.
+        :param in_offsets: n + 1 offsets into in_sources and in_weights.
+        :param in_sources: index of the source of every in edge.
+        :param in_weights: weight of every in edge.
+        :param mc: the mode count of the graph this snapshot represents.
+        """
+        self.ids = ids
+        self.pos_x = pos_x
+        self.pos_y = pos_y
+        self.out_offsets = out_offsets
+        self.out_targets = out_targets
+        self.out_weights = out_weights
+        self.in_offsets = in_offsets
+        self.in_sources = in_sources
+        self.in_weights = in_weights
+        self.mc = mc
+        self.index = {node_id: i for i, node_id in enumerate(ids)}
+        self.mapping = None  # the memory mapped file of load, closed by close
+
+    @classmethod
+    def from_graph(cls, g) -> 'CSRGraph':
+        """
+        Builds a snapshot of the given DiGraph.
+        The nodes get indices in the iteration order of g.get_all_v().
+        :param g: the graph.
+        :return: new CSRGraph
+        """
+        nodes = g.get_all_v()
+        index = {node_id: i for i, node_id in enumerate(nodes)}
+        ids = CSRGraph.id_array(nodes)
+        pos_x = array('d')
+        pos_y = array('d')
+        out_offsets = array('q', [0])
+        out_targets = []
+        out_weights = []
+        in_offsets = array('q', [0])
+        in_sources = []
+        in_weights = []
+        for node in nodes.values():
+            if node.position is None:
+                pos_x.append(NO_POS)
+                pos_y.append(NO_POS)
+            else:
+                pos_x.append(node.position[0])
+                pos_y.append(node.position[1])
+            for dest, w in node.node_out.items():
+                out_targets.append(index[dest])
+                out_weights.append(w)
+            out_offsets.append(len(out_targets))
+            for src, w in node.node_in.items():
+                in_sources.append(index[src])
+                in_weights.append(w)
+            in_offsets.append(len(in_sources))
+
+        return cls(ids, pos_x, pos_y, out_offsets, array('q', out_targets), array('d', out_weights),
+                   in_offsets, array('q', in_sources), array('d', in_weights), g.get_mc())
+
+    @staticmethod
+    def id_array(ids):
+        """
+        :param ids: iterable of node ids.
+        :return: the ids as array('q') if they are all integers, as a list o.w.
+        (only a snapshot with integer ids has a binary form, see write).
+        """
+        ids = list(ids)
+        if all(type(i) is int for i in ids):
+            try:
+                return array('q', ids)
+            except OverflowError:
+                pass
+        return ids
+
+    def with_index_ids(self) -> 'CSRGraph':
+        """
+        :return: a CSRGraph that shares the buffers of this graph, with the indices 0..n-1 as node ids,
+        it has a binary form even if the ids of this graph are not integers.
+        """
+        return CSRGraph(array('q', range(self.v_size())), self.pos_x, self.pos_y,
+                        self.out_offsets, self.out_targets, self.out_weights,
+                        self.in_offsets, self.in_sources, self.in_weights, self.mc)
+
+    @staticmethod
+    def field_lengths(n: int, m: int) -> dict:
+        """
+        :param n: number of nodes.
+        :param m: number of edges.
+        :return: dictionary of field name -> number of items, for the names in FIELDS.
+        """
+        return {'ids': n, 'pos_x': n, 'pos_y': n,
+                'out_offsets': n + 1, 'out_targets': m, 'out_weights': m,
+                'in_offsets': n + 1, 'in_sources': m, 'in_weights': m}
+
+    def nbytes(self) -> int:
+        """
+        :return: the size in bytes of the binary form of this graph (see write).
+        """
+        return HEADER.size + 8 * sum(CSRGraph.field_lengths(self.v_size(), self.e_size()).values())
+
+    def check_binary(self):
+        """
+        :raise ValueError: if this graph has no binary form, since its node ids are not all integers.
+        """
+        if isinstance(self.ids, list):
+            raise ValueError('Only a graph with integer node ids has a binary form')
+
+    def write(self, file):
+        """
+        Writes the binary form of this graph: the header, then every buffer of FIELDS as raw bytes.
+        :param file: binary file object, opened for writing.
+        :raise ValueError: if the node ids are not all integers (see check_binary).
+        """
+        self.check_binary()
+        file.write(HEADER.pack(MAGIC, 1, self.v_size(), self.e_size(), self.mc))
+        for name, _ in FIELDS:
+            file.write(memoryview(getattr(self, name)).cast('B'))
+
+    def write_into(self, buf) -> int:
+        """
+        Writes the binary form of this graph (as written by write) into a writable buffer,
+        e.g. a multiprocessing.shared_memory buffer, so other processes can wrap it by from_buffer.
+        :param buf: writable bytes-like object of at least nbytes() bytes.
+        :return: the number of bytes written.
+        :raise ValueError: if the node ids are not all integers (see check_binary).
+        """
+        self.check_binary()
+        view = memoryview(buf).cast('B')
+        HEADER.pack_into(view, 0, MAGIC, 1, self.v_size(), self.e_size(), self.mc)
+        offset = HEADER.size
+        for name, _ in FIELDS:
+            data = memoryview(getattr(self, name)).cast('B')
+            view[offset:offset + len(data)] = data
+            offset += len(data)
+        return offset
+
+    def save(self, file_name: str):
+        """
+        Saves the binary form of this graph to a file.
+        :param file_name: The path to the out file.
+        :raise OSError: if the file can not be written.
+        :raise ValueError: if the node ids are not all integers (see check_binary), nothing is written.
+        """
+        self.check_binary()
+        with open(file_name, 'wb') as file:
+            self.write(file)
+
+    @classmethod
+    def from_buffer(cls, buf) -> 'CSRGraph':
+        """
+        Wraps the binary form of a graph (as written by write), the buffers of the new CSRGraph
+        are views into buf, nothing is copied (unless the data was written with the other byte order).
+        :param buf: bytes-like object, e.g. bytes, mmap or multiprocessing.shared_memory buffer.
+        :return: new CSRGraph
+        :raise ValueError: if buf does not hold a graph in binary form.
+        """
+        view = memoryview(buf)
+        if len(view) < HEADER.size:
+            raise ValueError('Not a binary graph: too short')
+        magic, order, n, m, mc = HEADER.unpack_from(view)
+        swap = order != 1
+        if swap:
+            # written on a machine with the other byte order
+            magic, order, n, m, mc = struct.unpack_from(('>' if sys.byteorder == 'little' else '<') + '8sqqqq', view)
+        if magic != MAGIC or order != 1:
+            raise ValueError('Not a binary graph: bad header')
+        lengths = CSRGraph.field_lengths(n, m)
+        offset = HEADER.size
+        buffers = []
+        for name, typecode in FIELDS:
+            end = offset + 8 * lengths[name]
+            if end > len(view):
+                raise ValueError('Not a binary graph: truncated')
+            if swap:
+                arr = array(typecode)
+                arr.frombytes(view[offset:end])
+                arr.byteswap()
+                buffers.append(arr)
+            else:
+                buffers.append(view[offset:end].cast(typecode))
+            offset = end
+        return cls(*buffers, mc)
+
+    @classmethod
+    def load(cls, file_name: str) -> 'CSRGraph':
+        """
+        Opens a graph saved by save, the file is memory mapped (read only), so opening is near-instant
+        and all the processes that open the same file share the same physical pages.
+        The mapping stays open until close is called (or the graph is used in a with statement),
+        or until the graph and all the views of its buffers are garbage collected.
+        :param file_name: The path to the binary file.
+        :return: new CSRGraph
+        :raise OSError: if the file can not be opened.
+        :raise ValueError: if the file does not hold a graph in binary form.
+        """
+        with open(file_name, 'rb') as file:
+            buf = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        csr = cls.from_buffer(buf)
+        csr.mapping = buf
+        return csr
+
+    def close(self):
+        """
+        Releases the buffers of this graph that are views (see from_buffer) and closes the memory mapped
+        file of load, the graph can not be used after.
+        :raise BufferError: if other views of the buffers are still held, e.g. NumPy arrays of numpy.frombuffer.
+        """
+        for name, _ in FIELDS:
+            buf = getattr(self, name)
+            if isinstance(buf, memoryview):
+                buf.release()
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def v_size(self) -> int:
+        """
+        :return: the number of vertices in this graph.
+        """
+        return len(self.ids)
+
+    def e_size(self) -> int:
+        """
+        :return: the number of edges in this graph.
+        """
+        return len(self.out_targets)
+
+    def get_mc(self) -> int:
+        """
+        :return: the mode count of the graph this snapshot was built from.
+        """
+        return self.mc
+
+    def get_pos(self, node_id: int):
+        """
+        :param node_id: node id
+        :return: the (x, y) position of the node, None if it has no position.
+        """
+        i = self.index[node_id]
+        if isnan(self.pos_x[i]):
+            return None
+        return self.pos_x[i], self.pos_y[i]
+
+    def all_out_edges_of_node(self, id1: int) -> dict:
+        """
+        Return a dictionary of all the nodes connected from id1,
+        each node is represented using a pair (key, weight).
+        The dictionary is built on every call, algorithms should use the arrays directly.
+        :param id1: node id
+        :return: dictionary contains nodes connected from id1
+        """
+        i = self.index[id1]
+        ids = self.ids
+        return {ids[self.out_targets[e]]: self.out_weights[e]
+                for e in range(self.out_offsets[i], self.out_offsets[i + 1])}
+
+    def all_in_edges_of_node(self, id1: int) -> dict:
+        """
+        Return a dictionary of all the nodes connected to (into) id1,
+        each node is represented using a pair (key, weight).
+        The dictionary is built on every call, algorithms should use the arrays directly.
+        :param id1: node id
+        :return: dictionary contains nodes connected to id1
+        """
+        i = self.index[id1]
+        ids = self.ids
+        return {ids[self.in_sources[e]]: self.in_weights[e]
+                for e in range(self.in_offsets[i], self.in_offsets[i + 1])}
+
+    def bfs(self, id1: int, reverse: bool = False) -> list:
+        """
+        Breadth first traversal from id1.
+        :param id1: the start node id
+        :param reverse: if True, the traversal goes over the in edges (the transpose graph).
+        :return: list of the node ids reachable from id1 (or reaching id1 if reverse), in BFS order,
+        None if id1 is not in the graph.
+        """
+        if id1 not in self.index:
+            return None
+        ids = self.ids
+        return [ids[i] for i in self.reach(self.index[id1], reverse)]
+
+    def reach(self, src: int, reverse: bool = False) -> list:
+        """
+        Breadth first traversal over indices.
+        :param src: the start index
+        :param reverse: if True, the traversal goes over the in edges.
+        :return: list of the indices reachable from src, in BFS order.
+        """
+        if reverse:
+            offsets, targets = self.in_offsets, self.in_sources
+        else:
+            offsets, targets = self.out_offsets, self.out_targets
+        seen = bytearray(len(self.ids))
+        seen[src] = 1
+        order = [src]
+        for v in order:
+            for e in range(offsets[v], offsets[v + 1]):
+                u = targets[e]
+                if not seen[u]:
+                    seen[u] = 1
+                    order.append(u)
+        return order
+
+    def shortest_path(self, id1: int, id2: int) -> (float, list):
+        """
+        Returns the shortest path from node id1 to node id2 using Dijkstra's Algorithm over the arrays.
+        :param id1: The start node id
+        :param id2: The end node id
+        :return: The distance of the path, the path as a list
+        """
+        if id1 not in self.index or id2 not in self.index:
+            return float("inf"), None
+        if id1 == id2:
+            return 0, [id1]
+
+        src = self.index[id1]
+        dest = self.index[id2]
+        offsets, targets, weights = self.out_offsets, self.out_targets, self.out_weights
+        inf = float("inf")
+        dist = [inf] * len(self.ids)
+        prev = [-1] * len(self.ids)
+        dist[src] = 0
+        heap = [(0, src)]
+        while heap:
+            d, v = heappop(heap)
+            if v == dest:
+                break
+            if d > dist[v]:
+                continue
+            for e in range(offsets[v], offsets[v + 1]):
+                u = targets[e]
+                nd = d + weights[e]
+                if nd < dist[u]:
+                    dist[u] = nd
+                    prev[u] = v
+                    heappush(heap, (nd, u))
+
+        if dist[dest] == inf:
+            return inf, None
+        path = [dest]
+        while path[-1] != src:
+            path.append(prev[path[-1]])
+        path.reverse()
+        ids = self.ids
+        return dist[dest], [ids[i] for i in path]
+
+    def distances(self, src: int, reverse: bool = False) -> list:
+        """
+        Dijkstra's Algorithm over indices, from src to all the nodes.
+        :param src: the start index
+        :param reverse: if True, the search goes over the in edges, so the result holds the distances to src.
+        :return: list, the distance of every index from src (to src if reverse), inf if it can not be reached.
+        """
+        if reverse:
+            offsets, targets, weights = self.in_offsets, self.in_sources, self.in_weights
+        else:
+            offsets, targets, weights = self.out_offsets, self.out_targets, self.out_weights
+        inf = float("inf")
+        dist = [inf] * len(self.ids)
+        dist[src] = 0
+        heap = [(0, src)]
+        while heap:
+            d, v = heappop(heap)
+            if d > dist[v]:
+                continue
+            for e in range(offsets[v], offsets[v + 1]):
+                u = targets[e]
+                nd = d + weights[e]
+                if nd < dist[u]:
+                    dist[u] = nd
+                    heappush(heap, (nd, u))
+        return dist
+
+    def connected_component(self, id1: int) -> list:
+        """
+        Finds the Strongly Connected Component(SCC) that node id1 is a part of,
+        the nodes reachable from id1 that can also reach id1.
+        :param id1: The node id
+        :return: The list of nodes in the SCC, None if id1 is not in the graph.
+        """
+        if id1 not in self.index:
+            return None
+        src = self.index[id1]
+        forward = set(self.reach(src))
+        ids = self.ids
+        return [ids[i] for i in self.reach(src, True) if i in forward]
+
+    def connected_components(self, as_map: bool = False):
+        """
+        Finds all the Strongly Connected Component(SCC) in the graph,
+        using the same iterative Tarjan's algorithm as GraphAlgo.scc_map, over indices.
+        :param as_map: if True, returns a dictionary of node id -> component id instead of a list of lists.
+        :return: The list all SCC, or a dictionary of node id -> component id if as_map is True
+        """
+        comp = self.scc_indices()
+        ids = self.ids
+        if as_map:
+            return {ids[i]: c for i, c in enumerate(comp)}
+        components = [[] for _ in range(max(comp, default=-1) + 1)]
+        for i, c in enumerate(comp):
+            components[c].append(ids[i])
+        return components
+
+    def scc_indices(self) -> list:
+        """
+        Iterative Tarjan's algorithm over the arrays.
+        :return: list, the component id of every index, numbered from 0 in completion order.
+        """
+        n = len(self.ids)
+        offsets, targets = self.out_offsets, self.out_targets
+        index = [-1] * n
+        low = [0] * n
+        on_stack = bytearray(n)
+        comp = [-1] * n
+        stack = []
+        counter = 0
+        comp_count = 0
+
+        for root in range(n - 1, -1, -1):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [[root, offsets[root]]]
+            while work:
+                frame = work[-1]
+                v, e = frame
+                end = offsets[v + 1]
+                while e < end:
+                    w = targets[e]
+                    e += 1
+                    if index[w] == -1:
+                        break
+                    if on_stack[w] and index[w] < low[v]:
+                        low[v] = index[w]
+                else:
+                    # all the out edges of v were scanned
+                    work.pop()
+                    if work:
+                        u = work[-1][0]
+                        if low[v] < low[u]:
+                            low[u] = low[v]
+                    if low[v] == index[v]:
+                        while True:
+                            w = stack.pop()
+                            on_stack[w] = 0
+                            comp[w] = comp_count
+                            if w == v:
+                                break
+                        comp_count += 1
+                    continue
+                frame[1] = e
+                index[w] = low[w] = counter
+                counter += 1
+                stack.append(w)
+                on_stack[w] = 1
+                work.append([w, offsets[w]])
+
+        return comp
+
+    def __str__(self):
+        return 'CSRGraph: |V| = ' + str(self.v_size()) + '\t|E| = ' + str(self.e_size()) + '\tmc = ' + str(self.mc)
+
+    def __repr__(self):
+        return self.__str__()
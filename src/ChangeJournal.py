@@ -0,0 +1,64 @@
+from collections import deque
+
+
+class ChangeJournal:
+    """
+    This class represents a bounded journal of the changes of a DiGraph.
+    It is a listener of the graph (see DiGraph.add_listener) that records every change event together with
+    the version (mode count) of the graph it belongs to, so a consumer that knows the graph at version N
+    can ask for the changes since N (changes_since) and apply them to its copy (DiGraph.apply_changes),
+    instead of reloading the whole graph.
+    Only the last maxlen events are kept: start is the oldest version the journal can answer for,
+    older versions get None, and the consumer must reload the whole graph.
+    """
+
+    def __init__(self, g, maxlen: int = 100000):
+        """
+        Starts recording the changes of g, from its current version.
+        :param g: DiGraph
+        :param maxlen: the largest number of events to keep.
+        """
+        if maxlen < 1:
+            raise ValueError('maxlen must be at least 1, got ' + str(maxlen))
+        self.graph = g
+        self.entries = deque()
+        self.maxlen = maxlen
+        self.start = g.get_mc()
+        g.add_listener(self.record)
+
+    def close(self):
+        """
+        Stops recording the changes of the graph.
+        """
+        self.graph.remove_listener(self.record)
+
+    def record(self, event: tuple):
+        """
+        Appends one event with the current version of the graph (the listener, see DiGraph.add_listener).
+        :param event: the event tuple.
+        """
+        entries = self.entries
+        entries.append((self.graph.get_mc(), event))
+        if len(entries) > self.maxlen:
+            self.start = entries.popleft()[0]
+
+    def changes_since(self, mc: int) -> list:
+        """
+        Returns the changes made after version mc, in order.
+        :param mc: a version of the graph (get_mc()).
+        :return: list of (version, event), empty if mc is the current version,
+        or None if the journal does not reach back to mc.
+        """
+        if mc < self.start or mc > self.graph.get_mc():
+            return None
+        # the versions only grow, so the changes after mc are a suffix of the journal
+        changes = []
+        for entry in reversed(self.entries):
+            if entry[0] <= mc:
+                break
+            changes.append(entry)
+        changes.reverse()
+        return changes
+
+    def __len__(self):
+        return len(self.entries)
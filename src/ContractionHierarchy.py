@@ -0,0 +1,303 @@
+from array import array
+from heapq import heappush, heappop
+
+from CSRGraph import CSRGraph
+
+
+class ContractionHierarchy:
+    """
+    This class represents a Contraction Hierarchy (CH) of a directed weighted graph, for fast shortest path queries
+    on a graph that does not change.
+    The nodes are contracted one by one in order of importance (see build): a contracted node is removed from the
+    graph, and a shortcut edge u -> w, which remembers the contracted node as its middle, is added wherever
+    u -> v -> w was the only shortest path between the remaining neighbours u and w.
+    The rank of a node is its place in that order. Every edge (original or shortcut) then goes up or down in rank,
+    and for any pair of nodes there is a shortest path that goes only up and then only down,
+    so a query is a bidirectional Dijkstra that goes only up: forward over the up edges from the source,
+    backward over the down edges into the target, both of which are tiny compared to the whole graph.
+    The search graph is kept in CSR form (see CSRGraph): up_targets[up_offsets[i]:up_offsets[i + 1]] are the
+    higher ranked nodes that index i has an edge to, and down_sources[down_offsets[i]:down_offsets[i + 1]] are the
+    higher ranked nodes that have an edge to i, each edge with its weight and middle (-1 for an original edge).
+    """
+
+    WITNESS_SETTLE_LIMIT = 32  # nodes a witness search may settle before it gives up and the shortcut is added
+
+    def __init__(self, ids, rank, up_offsets, up_targets, up_weights, up_middle,
+                 down_offsets, down_sources, down_weights, down_middle, mc: int = 0):
+        """
+        Constructor, wraps the given buffers as they are (they are not copied).
+        :param ids: node id of every index.
+        :param rank: the contraction order of every index.
+        :param up_offsets: n + 1 offsets into the up buffers.
+        :param up_targets: index of the destination of every up edge.
+        :param up_weights: weight of every up edge.
+        :param up_middle: the index a shortcut up edge goes through, -1 for an original edge.
+        :param down_offsets: n + 1 offsets into the down buffers.
+        :param down_sources: index of the source of every down edge.
+        :param down_weights: weight of every down edge.
+        :param down_middle: the index a shortcut down edge goes through, -1 for an original edge.
+        :param mc: the mode count of the graph the hierarchy was built from.
+        """
+        self.ids = ids
+        self.rank = rank
+        self.up_offsets = up_offsets
+        self.up_targets = up_targets
+        self.up_weights = up_weights
+        self.up_middle = up_middle
+        self.down_offsets = down_offsets
+        self.down_sources = down_sources
+        self.down_weights = down_weights
+        self.down_middle = down_middle
+        self.mc = mc
+        self.index = {node_id: i for i, node_id in enumerate(ids)}
+
+    @classmethod
+    def build(cls, csr: CSRGraph) -> 'ContractionHierarchy':
+        """
+        Contracts all the nodes of the snapshot.
+        The next node to contract is the one with the smallest priority:
+        (shortcuts its contraction adds) - (edges it removes) + (neighbours already contracted),
+        so nodes whose removal keeps the graph small go first, and the contracted nodes spread evenly.
+        Priorities are kept in a heap and recomputed lazily: a popped node whose priority grew
+        is pushed back, unless it is still not larger than the next one.
+        A shortcut u -> v -> w is skipped if a witness search (see witness) finds another path u -> w
+        that is not longer; the search is limited, so some unneeded shortcuts may be added, which
+        costs a little query time but never correctness.
+        :param csr: the graph snapshot.
+        :return: new ContractionHierarchy
+        """
+        n = len(csr.ids)
+        # the remaining graph: out_adj[u][w] = in_adj[w][u] = (weight, middle)
+        out_adj = [{} for _ in range(n)]
+        in_adj = [{} for _ in range(n)]
+        for u in range(n):
+            for e in range(csr.out_offsets[u], csr.out_offsets[u + 1]):
+                w = csr.out_targets[e]
+                if w != u:
+                    out_adj[u][w] = in_adj[w][u] = (csr.out_weights[e], -1)
+
+        deleted_neighbours = [0] * n
+        rank = array('q', [0] * n)
+        up, down = [None] * n, [None] * n
+
+        def priority(v, shortcuts):
+            return len(shortcuts) - len(out_adj[v]) - len(in_adj[v]) + deleted_neighbours[v]
+
+        heap = [(priority(v, cls.shortcuts(v, out_adj, in_adj)), v) for v in range(n)]
+        heap.sort()
+        order = 0
+        while heap:
+            _, v = heappop(heap)
+            shortcuts = cls.shortcuts(v, out_adj, in_adj)
+            p = priority(v, shortcuts)
+            if heap and p > heap[0][0]:
+                heappush(heap, (p, v))
+                continue
+
+            for u, w, weight in shortcuts:
+                if w not in out_adj[u] or weight < out_adj[u][w][0]:
+                    out_adj[u][w] = in_adj[w][u] = (weight, v)
+            up[v] = out_adj[v]
+            down[v] = in_adj[v]
+            for w in out_adj[v]:
+                del in_adj[w][v]
+                deleted_neighbours[w] += 1
+            for u in in_adj[v]:
+                del out_adj[u][v]
+                deleted_neighbours[u] += 1
+            out_adj[v] = in_adj[v] = None
+            rank[v] = order
+            order += 1
+
+        up_offsets, up_targets, up_weights, up_middle = cls.compact(up)
+        down_offsets, down_sources, down_weights, down_middle = cls.compact(down)
+        return cls(CSRGraph.id_array(csr.ids), rank, up_offsets, up_targets, up_weights, up_middle,
+                   down_offsets, down_sources, down_weights, down_middle, csr.get_mc())
+
+    @classmethod
+    def shortcuts(cls, v: int, out_adj: list, in_adj: list) -> list:
+        """
+        Finds the shortcuts that contracting v would add to the remaining graph.
+        :param v: the index to contract
+        :param out_adj: the out edges of the remaining graph
+        :param in_adj: the in edges of the remaining graph
+        :return: list of (u, w, weight) for every pair of neighbours whose shortest path goes through v.
+        """
+        res = []
+        out_v = out_adj[v]
+        if not out_v:
+            return res
+        max_out = max(edge[0] for edge in out_v.values())
+        for u, (w_uv, _) in in_adj[v].items():
+            dist = cls.witness(u, v, w_uv + max_out, len(out_v), out_v, out_adj)
+            for w, (w_vw, _) in out_v.items():
+                if w != u and dist.get(w, float("inf")) > w_uv + w_vw:
+                    res.append((u, w, w_uv + w_vw))
+        return res
+
+    @classmethod
+    def witness(cls, src: int, avoid: int, limit: float, count: int, targets: dict, out_adj: list) -> dict:
+        """
+        Dijkstra's Algorithm from src over the remaining graph without the node avoid,
+        up to distance limit and at most WITNESS_SETTLE_LIMIT settled nodes,
+        it stops early once all the count targets are settled.
+        :return: dictionary of index -> distance of the nodes it reached (not always the shortest).
+        """
+        dist = {src: 0}
+        heap = [(0, src)]
+        settled = 0
+        while heap and settled < cls.WITNESS_SETTLE_LIMIT:
+            d, x = heappop(heap)
+            if d > dist[x]:
+                continue
+            if d > limit:
+                break
+            settled += 1
+            if x in targets:
+                count -= 1
+                if count == 0:
+                    break
+            for y, (w, _) in out_adj[x].items():
+                nd = d + w
+                if y != avoid and (y not in dist or nd < dist[y]):
+                    dist[y] = nd
+                    heappush(heap, (nd, y))
+        return dist
+
+    @staticmethod
+    def compact(adj: list) -> tuple:
+        """
+        Packs adjacency dictionaries of index -> (weight, middle) into CSR buffers.
+        :return: offsets, targets, weights, middle
+        """
+        offsets = array('q', [0])
+        targets, weights, middle = array('q'), array('d'), array('q')
+        for edges in adj:
+            for w, (weight, mid) in edges.items():
+                targets.append(w)
+                weights.append(weight)
+                middle.append(mid)
+            offsets.append(len(targets))
+        return offsets, targets, weights, middle
+
+    def get_mc(self) -> int:
+        """
+        :return: the mode count of the graph the hierarchy was built from.
+        """
+        return self.mc
+
+    def shortcut_count(self) -> int:
+        """
+        :return: the number of shortcut edges in the search graph.
+        """
+        return sum(1 for m in self.up_middle if m >= 0) + sum(1 for m in self.down_middle if m >= 0)
+
+    def shortest_path(self, id1: int, id2: int, stats: dict = None) -> (float, list):
+        """
+        Returns the shortest path from node id1 to node id2, the same as GraphAlgo.shortest_path.
+        A forward search from id1 over the up edges and a backward search from id2 over the down edges,
+        every step expands the side with the smaller distance; mu is the shortest path through a node
+        reached by both sides. A side stops once its smallest distance is at least mu
+        (the sides can not stop on their sum, as in bidirectional Dijkstra, since each sees only part of the graph).
+        The path is then unpacked: every shortcut is replaced by its two halves, down to original edges,
+        and the distance is summed along it.
+        :param id1: The start node id
+        :param id2: The end node id
+        :param stats: if given, 'settled', 'relaxed' and 'pushes' of this dictionary are increased by the number
+        of nodes settled, edges relaxed and heap pushes (see GraphAlgo.add_stats)
+        :return: The distance of the path, the path as a list
+        """
+        if id1 not in self.index or id2 not in self.index:
+            return float("inf"), None
+        if id1 == id2:
+            return 0, [id1]
+
+        src, dest = self.index[id1], self.index[id2]
+        inf = float("inf")
+        dist_f, dist_b = {src: 0}, {dest: 0}
+        prev_f, prev_b = {src: None}, {dest: None}  # index -> (the index, the edge position) it was reached from
+        queue_f, queue_b = [(0, src)], [(0, dest)]
+        settled = relaxed = pushes = 0
+        mu = inf
+        meet = -1
+        while True:
+            top_f = queue_f[0][0] if queue_f else inf
+            top_b = queue_b[0][0] if queue_b else inf
+            if min(top_f, top_b) >= mu:
+                break
+            if top_f <= top_b:
+                d, v = heappop(queue_f)
+                if d > dist_f[v]:
+                    continue
+                offsets, targets, weights, queue, dist, prev, other = \
+                    self.up_offsets, self.up_targets, self.up_weights, queue_f, dist_f, prev_f, dist_b
+            else:
+                d, v = heappop(queue_b)
+                if d > dist_b[v]:
+                    continue
+                offsets, targets, weights, queue, dist, prev, other = \
+                    self.down_offsets, self.down_sources, self.down_weights, queue_b, dist_b, prev_b, dist_f
+            settled += 1
+            relaxed += offsets[v + 1] - offsets[v]
+            if v in other and d + other[v] < mu:
+                mu = d + other[v]
+                meet = v
+            for e in range(offsets[v], offsets[v + 1]):
+                u = targets[e]
+                nd = d + weights[e]
+                if u not in dist or nd < dist[u]:
+                    dist[u] = nd
+                    prev[u] = (v, e)
+                    pushes += 1
+                    heappush(queue, (nd, u))
+
+        if stats is not None:
+            stats['settled'] = stats.get('settled', 0) + settled
+            stats['relaxed'] = stats.get('relaxed', 0) + relaxed
+            stats['pushes'] = stats.get('pushes', 0) + pushes
+        if meet < 0:
+            return inf, None
+
+        # the edges of the up-down path: (source, target, weight, middle)
+        edges = []
+        v = meet
+        while prev_f[v] is not None:
+            u, e = prev_f[v]
+            edges.append((u, v, self.up_weights[e], self.up_middle[e]))
+            v = u
+        edges.reverse()
+        v = meet
+        while prev_b[v] is not None:
+            u, e = prev_b[v]
+            edges.append((v, u, self.down_weights[e], self.down_middle[e]))
+            v = u
+
+        path = [src]
+        dist = 0
+        stack = edges[::-1]
+        while stack:
+            u, w, weight, mid = stack.pop()
+            if mid < 0:
+                path.append(w)
+                dist += weight
+            else:
+                stack.append(self.edge(mid, w))
+                stack.append(self.edge(u, mid))
+        ids = self.ids
+        return dist, [ids[i] for i in path]
+
+    def edge(self, u: int, w: int) -> tuple:
+        """
+        Finds the edge u -> w of the search graph, it is stored at the lower ranked of the two.
+        :return: (u, w, weight, middle)
+        """
+        if self.rank[u] < self.rank[w]:
+            offsets, targets, weights, middle, v, x = self.up_offsets, self.up_targets, self.up_weights, \
+                                                      self.up_middle, u, w
+        else:
+            offsets, targets, weights, middle, v, x = self.down_offsets, self.down_sources, self.down_weights, \
+                                                      self.down_middle, w, u
+        for e in range(offsets[v], offsets[v + 1]):
+            if targets[e] == x:
+                return u, w, weights[e], middle[e]
+        raise KeyError((u, w))
@@ -1,4 +1,32 @@
+import sys
+from math import isnan
+
+import numpy as np
+
+from CSRGraph import CSRGraph
+from ChangeJournal import ChangeJournal
 from GraphInterface import *
+from Profiler import Profiler
+
+
+class EmptyEdges(dict):
+    """
+    Read only empty dictionary, NO_EDGES is the only instance.
+    Nodes without out (or in) edges share NO_EDGES instead of holding their own empty dictionary,
+    the node gets its own dictionary when the first edge is added (see NodeData.add_out and add_in).
+    """
+
+    def read_only(self, *args, **kwargs):
+        raise TypeError('NO_EDGES is read only, use NodeData.add_out / add_in')
+
+    __setitem__ = __delitem__ = __ior__ = setdefault = update = pop = popitem = clear = read_only
+
+    def __reduce__(self):
+        # copies and unpickled graphs share the same instance
+        return 'NO_EDGES'
+
+
+NO_EDGES = EmptyEdges()
 
 
 class DiGraph(GraphInterface):
@@ -12,6 +40,10 @@ class DiGraph(GraphInterface):
         self.nodes = dict()
         self.mode_count = 0
         self.edge_size = 0
+        self.csr = None  # the last snapshot returned by to_csr
+        self.listeners = []  # functions called with every change, see add_listener
+        self.journal = None  # ChangeJournal of enable_journal
+        self.profiler = None  # Profiler of enable_profiling
 
     def v_size(self) -> int:
         """
@@ -40,18 +72,22 @@ class DiGraph(GraphInterface):
         Return a dictionary of all the nodes connected to (into) node_id,
         each node is represented using a pair (key, weight)
         :param id1: node id
-        :return: dictionary contains nodes connected to id1
+        :return: dictionary contains nodes connected to id1,
+        a new empty dictionary if there are none (not the shared, read only NO_EDGES of the node).
         """
-        return self.nodes[id1].node_in
+        edges = self.nodes[id1].node_in
+        return {} if edges is NO_EDGES else edges
 
     def all_out_edges_of_node(self, id1: int) -> dict:
         """
         Return a dictionary of all the nodes connected from node_id,
         each node is represented using a pair (key, weight)
         :param id1: node id
-        :return: dictionary contains nodes connected from id1
+        :return: dictionary contains nodes connected from id1,
+        a new empty dictionary if there are none (not the shared, read only NO_EDGES of the node).
         """
-        return self.nodes[id1].node_out
+        edges = self.nodes[id1].node_out
+        return {} if edges is NO_EDGES else edges
 
     def get_mc(self) -> int:
         """
@@ -84,6 +120,8 @@ class DiGraph(GraphInterface):
         self.nodes[id2].add_in(id1, weight)
         self.mode_count += 1
         self.edge_size += 1
+        if self.listeners:
+            self.notify(('add_edge', id1, id2, weight))
         return True
 
     def add_node(self, node_id: int, pos: tuple = None) -> bool:
@@ -100,6 +138,8 @@ class DiGraph(GraphInterface):
             return False
         self.nodes[node_id] = DiGraph.NodeData(node_id, pos)
         self.mode_count += 1
+        if self.listeners:
+            self.notify(('add_node', node_id, pos))
         return True
 
     def remove_node(self, node_id: int) -> bool:
@@ -114,6 +154,25 @@ class DiGraph(GraphInterface):
         if node_id not in self.nodes:
             return False
 
+        if self.listeners:
+            # the edges are removed one at a time from both ends, so every listener sees a consistent graph,
+            # all the events of the removal have the version of the removal
+            self.mode_count += 1
+            node = self.nodes[node_id]
+            for n in list(node.node_in):
+                w = node.node_in.pop(n)
+                self.nodes[n].node_out.pop(node_id)
+                self.edge_size -= 1
+                self.notify(('remove_edge', n, node_id, w))
+            for n in list(node.node_out):
+                w = node.node_out.pop(n)
+                self.nodes[n].node_in.pop(node_id)
+                self.edge_size -= 1
+                self.notify(('remove_edge', node_id, n, w))
+            self.nodes.pop(node_id)
+            self.notify(('remove_node', node_id))
+            return True
+
         for n in self.nodes[node_id].node_in.keys():
             self.nodes[n].node_out.pop(node_id)
             self.edge_size -= 1
@@ -139,12 +198,490 @@ class DiGraph(GraphInterface):
                 or node_id2 not in self.nodes[node_id1].node_out:
             return False
 
-        self.nodes[node_id1].node_out.pop(node_id2)
+        w = self.nodes[node_id1].node_out.pop(node_id2)
         self.nodes[node_id2].node_in.pop(node_id1)
         self.edge_size -= 1
         self.mode_count += 1
+        if self.listeners:
+            self.notify(('remove_edge', node_id1, node_id2, w))
+        return True
+
+    def update_edge_weight(self, id1: int, id2: int, weight: float) -> bool:
+        """
+        Changes the weight of an existing edge, in place (node_out of id1 and node_in of id2).
+        If the edge does not exist, the weight is not positive or it is the same as before, the function will do nothing.
+        :param id1: The start node of the edge.
+        :param id2: The end node of the edge.
+        :param weight: The new weight of the edge.
+        :return: True if the weight was changed, False o.w.
+        """
+        return len(self.update_edge_weights(((id1, id2, weight),))) == 1
+
+    def update_edge_weights(self, edges) -> list:
+        """
+        Changes the weights of many existing edges, with the same checks as update_edge_weight,
+        the mode count is increased once for the whole batch (if any weight changed).
+        Every change is reported to the listeners as ('update_edge', src, dest, old weight, new weight),
+        all with the version of the batch.
+        :param edges: iterable of (src, dest, weight), or a NumPy array of shape (k, 3).
+        :return: the change log, list of (src, dest, old weight, new weight) for every edge that changed, in order.
+        """
+        nodes = self.nodes
+        listeners = self.listeners
+        changes = []
+        for src, dest, w in DiGraph.rows(edges, 2):
+            if not w > 0 or src not in nodes:
+                continue
+            out = nodes[src].node_out
+            old = out.get(dest)
+            if old is None or old == w:
+                continue
+            out[dest] = w
+            nodes[dest].node_in[src] = w
+            if not changes:
+                self.mode_count += 1
+            changes.append((src, dest, old, w))
+            if listeners:
+                self.notify(('update_edge', src, dest, old, w))
+        return changes
+
+    def set_positions(self, positions: dict) -> int:
+        """
+        Sets the positions of existing nodes, e.g. the positions computed by a layout (see Layout),
+        the mode count is increased once (if any position changed), so what depends on the positions
+        (the CSR snapshot, the A* scale of GraphAlgo) is computed again.
+        Every change is reported to the listeners as ('set_pos', node_id, pos), all with the version of the batch.
+        :param positions: dictionary of node id -> position tuple, ids that are not in the graph are skipped.
+        :return: the number of positions that changed.
+        """
+        nodes = self.nodes
+        changed = 0
+        for node_id, pos in positions.items():
+            node = nodes.get(node_id)
+            if node is None or node.position == pos:
+                continue
+            if not changed:
+                self.mode_count += 1
+            node.position = pos
+            changed += 1
+            if self.listeners:
+                self.notify(('set_pos', node_id, pos))
+        return changed
+
+    def add_nodes_from(self, nodes, mask: bool = False):
+        """
+        Adds many nodes to the graph, with the same checks as add_node,
+        the mode count is updated once for the whole batch (by the number of nodes added),
+        or node by node while there are listeners, so every event is reported with its own version.
+        Without listeners, the repeated ids of a NumPy array of integers are found in NumPy (see integral).
+        :param nodes: iterable of node ids, or of (node id, pos) pairs.
+        :param mask: if True, returns a mask of the accepted nodes instead of their number.
+        :return: the number of nodes that were added,
+        or if mask is True, bytearray with 1 for every node that was added and 0 for every node that was not.
+        """
+        all_nodes = self.nodes
+        listeners = self.listeners
+        if not listeners and isinstance(nodes, np.ndarray) and nodes.ndim == 1 and DiGraph.integral(nodes):
+            # the first of the equal ids is found in NumPy, only the new nodes are made one by one
+            ids = nodes.astype(np.int64)
+            first = np.zeros(len(ids), dtype=bool)
+            first[np.unique(ids, return_index=True)[1]] = True
+            keep = first.tolist()
+            node_data = DiGraph.NodeData
+            for i, node_id in enumerate(ids.tolist()):
+                if keep[i]:
+                    if node_id in all_nodes:
+                        keep[i] = False
+                    else:
+                        all_nodes[node_id] = node_data(node_id)
+            added = keep.count(True)
+            self.mode_count += added
+            return bytearray(keep) if mask else added
+        accepted = bytearray()
+        for node in DiGraph.rows(nodes):
+            if isinstance(node, (tuple, list)):
+                node_id, pos = node
+            else:
+                node_id, pos = node, None
+            if node_id in all_nodes:
+                accepted.append(0)
+                continue
+            all_nodes[node_id] = DiGraph.NodeData(node_id, pos)
+            accepted.append(1)
+            if listeners:
+                self.mode_count += 1
+                self.notify(('add_node', node_id, pos))
+        added = accepted.count(1)
+        if not listeners:
+            self.mode_count += added
+        return accepted if mask else added
+
+    def add_edges_from(self, edges, mask: bool = False):
+        """
+        Adds many edges to the graph, with the same checks as add_edge,
+        the edge size and mode count are updated once for the whole batch (by the number of edges added),
+        or edge by edge while there are listeners, so every event is reported with its own version.
+        Without listeners, a NumPy array is checked and grouped in NumPy (see add_edges_array).
+        :param edges: iterable of (src, dest, weight), or a NumPy array of shape (k, 3).
+        :param mask: if True, returns a mask of the accepted edges instead of their number.
+        :return: the number of edges that were added,
+        or if mask is True, bytearray with 1 for every edge that was added and 0 for every edge that was not.
+        """
+        if not self.listeners and isinstance(edges, np.ndarray) and edges.ndim == 2 and edges.shape[1] == 3:
+            accepted = self.add_edges_array(edges)
+            if accepted is not None:
+                return bytearray(accepted.view(np.uint8)) if mask else int(accepted.sum())
+        nodes = self.nodes
+        listeners = self.listeners
+        accepted = bytearray()
+        for src, dest, w in DiGraph.rows(edges, 2):
+            if src == dest or not w > 0 or src not in nodes or dest not in nodes:
+                accepted.append(0)
+                continue
+            src_node = nodes[src]
+            if dest in src_node.node_out:
+                accepted.append(0)
+                continue
+            src_node.add_out(dest, w)
+            nodes[dest].add_in(src, w)
+            accepted.append(1)
+            if listeners:
+                self.edge_size += 1
+                self.mode_count += 1
+                self.notify(('add_edge', src, dest, w))
+        added = accepted.count(1)
+        if not listeners:
+            self.edge_size += added
+            self.mode_count += added
+        return accepted if mask else added
+
+    def add_edges_array(self, edges: np.ndarray):
+        """
+        The add_edges_from of a NumPy array, while there are no listeners.
+        The weight, self loop and node checks of add_edge are done on the whole array at once in NumPy,
+        then the edges are grouped by source (in the order of the array), and the edges of a source
+        whose node has no out edges yet become its node_out by one dict call; only sources that already
+        have edges, or that appear with the same destination twice, are checked edge by edge.
+        The in edges are grouped by destination and added by one update per node.
+        :param edges: NumPy array of shape (k, 3) of (src, dest, weight).
+        :return: NumPy bool array of the accepted edges, or None if the node ids of the graph or of the array
+        are not all integers (see integral), then add_edges_from checks the edges one by one.
+        """
+        if not DiGraph.integral(edges[:, 0]) or not DiGraph.integral(edges[:, 1]):
+            return None
+        nodes = self.nodes
+        try:
+            ids = np.fromiter(nodes.keys(), dtype=np.int64, count=len(nodes))
+        except (TypeError, ValueError, OverflowError):
+            return None
+        src = edges[:, 0].astype(np.int64)
+        dest = edges[:, 1].astype(np.int64)
+        w = edges[:, 2].astype(np.float64)
+        ok = (w > 0) & (src != dest)
+        if len(ids) == 0:
+            ok[:] = False
+        elif ids.max() - ids.min() < 4 * len(ids):
+            # the ids are dense enough for a lookup table
+            low = ids.min()
+            present = np.zeros(ids.max() - low + 1, dtype=bool)
+            present[ids - low] = True
+            for col in (src, dest):
+                inside = (col >= low) & (col - low < len(present))
+                ok &= inside
+                ok[inside] &= present[col[inside] - low]
+        else:
+            ids.sort()
+            for col in (src, dest):
+                ok &= ids[np.minimum(np.searchsorted(ids, col), len(ids) - 1)] == col
+
+        # the out edges by source, in the order of the array
+        cand = np.flatnonzero(ok)
+        cand = cand[np.argsort(src[cand], kind='stable')]
+        srcs, dests, weights = src[cand].tolist(), dest[cand].tolist(), w[cand].tolist()
+        bounds = [0] + (np.flatnonzero(np.diff(src[cand])) + 1).tolist() + [len(cand)]
+        rejected = []
+        for start, end in zip(bounds, bounds[1:]):
+            if start == end:
+                continue
+            node = nodes[srcs[start]]
+            out = node.node_out
+            if out is NO_EDGES:
+                new = dict(zip(dests[start:end], weights[start:end]))
+                if len(new) == end - start:
+                    node.node_out = new
+                    continue
+                out = node.node_out = {}
+            # the first edge to a destination is added, as add_edge would
+            for i in range(start, end):
+                if dests[i] in out:
+                    rejected.append(cand[i])
+                else:
+                    out[dests[i]] = weights[i]
+        ok[rejected] = False
+
+        # the in edges of the accepted edges by destination
+        cand = np.flatnonzero(ok)
+        cand = cand[np.argsort(dest[cand], kind='stable')]
+        srcs, dests, weights = src[cand].tolist(), dest[cand].tolist(), w[cand].tolist()
+        bounds = [0] + (np.flatnonzero(np.diff(dest[cand])) + 1).tolist() + [len(cand)]
+        for start, end in zip(bounds, bounds[1:]):
+            if start == end:
+                continue
+            node = nodes[dests[start]]
+            if node.node_in is NO_EDGES:
+                node.node_in = dict(zip(srcs[start:end], weights[start:end]))
+            else:
+                node.node_in.update(zip(srcs[start:end], weights[start:end]))
+        added = len(cand)
+        self.edge_size += added
+        self.mode_count += added
+        return ok
+
+    def remove_edges_from(self, edges, mask: bool = False):
+        """
+        Removes many edges from the graph, edges that do not exist are ignored,
+        the edge size and mode count are updated once for the whole batch (by the number of edges removed),
+        or edge by edge while there are listeners, so every event is reported with its own version.
+        :param edges: iterable of (src, dest) (further items, e.g. a weight, are ignored),
+        or a NumPy array of shape (k, 2) or (k, 3).
+        :param mask: if True, returns a mask of the removed edges instead of their number.
+        :return: the number of edges that were removed,
+        or if mask is True, bytearray with 1 for every edge that was removed and 0 for every edge that was not.
+        """
+        nodes = self.nodes
+        listeners = self.listeners
+        accepted = bytearray()
+        for edge in DiGraph.rows(edges, 2):
+            src, dest = edge[0], edge[1]
+            if src not in nodes or dest not in nodes or dest not in nodes[src].node_out:
+                accepted.append(0)
+                continue
+            w = nodes[src].node_out.pop(dest)
+            del nodes[dest].node_in[src]
+            accepted.append(1)
+            if listeners:
+                self.edge_size -= 1
+                self.mode_count += 1
+                self.notify(('remove_edge', src, dest, w))
+        removed = accepted.count(1)
+        if not listeners:
+            self.edge_size -= removed
+            self.mode_count += removed
+        return accepted if mask else removed
+
+    def add_listener(self, listener):
+        """
+        Registers a function that is called after every single change of the graph, with one event tuple:
+        ('add_node', node_id, pos), ('remove_node', node_id),
+        ('add_edge', src, dest, weight), ('remove_edge', src, dest, weight)
+        ('update_edge', src, dest, old weight, new weight) or ('set_pos', node_id, pos).
+        Removing a node reports the removal of each of its edges before the removal of the node,
+        and the batch methods report every accepted item, so a listener can keep a structure
+        derived from the graph up to date without rebuilding it (e.g. IncrementalSCC).
+        When a listener is called, get_mc() is the version of the change (see ChangeJournal).
+        The listeners are not copied or pickled with the graph.
+        :param listener: function of one event tuple.
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener) -> bool:
+        """
+        Unregisters a function registered by add_listener.
+        :param listener: the function.
+        :return: True if it was registered, False o.w.
+        """
+        if listener not in self.listeners:
+            return False
+        self.listeners.remove(listener)
         return True
 
+    def notify(self, event: tuple):
+        """
+        Calls every listener with the event.
+        :param event: the event tuple (see add_listener).
+        """
+        for listener in self.listeners:
+            listener(event)
+
+    def enable_journal(self, maxlen: int = 100000) -> ChangeJournal:
+        """
+        Starts recording the changes of this graph in a bounded journal (see ChangeJournal),
+        so changes_since can tell what changed after a given version.
+        :param maxlen: the largest number of changes to keep.
+        :return: the journal
+        """
+        self.disable_journal()
+        self.journal = ChangeJournal(self, maxlen)
+        return self.journal
+
+    def disable_journal(self):
+        """
+        Stops recording the changes of this graph and drops the journal.
+        """
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def enable_profiling(self, profiler: Profiler = None) -> Profiler:
+        """
+        Starts counting the changes of this graph by kind, as 'graph.add_edge' etc. (see Profiler.event).
+        The profiler is a listener, so the batch methods add the items one at a time while it is enabled.
+        :param profiler: the Profiler to count in, a new one if not given.
+        :return: the profiler
+        """
+        self.disable_profiling()
+        self.profiler = Profiler() if profiler is None else profiler
+        self.add_listener(self.profiler.event)
+        return self.profiler
+
+    def disable_profiling(self):
+        """
+        Stops counting the changes of this graph.
+        """
+        if self.profiler is not None:
+            self.remove_listener(self.profiler.event)
+            self.profiler = None
+
+    def changes_since(self, mc: int) -> list:
+        """
+        Returns the changes made after version mc (see ChangeJournal.changes_since).
+        :param mc: a version of this graph (get_mc()).
+        :return: list of (version, event tuple), or None if there is no journal or it does not reach back to mc.
+        """
+        if self.journal is None:
+            return None
+        return self.journal.changes_since(mc)
+
+    def apply_changes(self, changes):
+        """
+        Applies the changes of another graph, as returned by its changes_since, to this graph,
+        which is expected to be a copy of the other graph at the version they were asked from.
+        The events are replayed by the usual methods, so the mode count of this graph grows on its own.
+        :param changes: iterable of (version, event tuple).
+        :return: the version of the last change applied, None if there were no changes.
+        """
+        version = None
+        for version, event in changes:
+            kind = event[0]
+            if kind == 'add_node':
+                self.add_node(event[1], event[2])
+            elif kind == 'remove_node':
+                self.remove_node(event[1])
+            elif kind == 'add_edge':
+                self.add_edge(event[1], event[2], event[3])
+            elif kind == 'remove_edge':
+                self.remove_edge(event[1], event[2])
+            elif kind == 'update_edge':
+                self.update_edge_weight(event[1], event[2], event[4])
+            elif kind == 'set_pos':
+                self.set_positions({event[1]: event[2]})
+            else:
+                raise ValueError('Unknown change: ' + str(event))
+        return version
+
+    @staticmethod
+    def rows(items, id_columns: int = 1):
+        """
+        Converts a NumPy array into a list of rows of Python numbers,
+        the first id_columns columns are converted to integers (node ids) if their values are integers
+        (see integral), other iterables are returned as they are.
+        :param items: iterable, or NumPy array.
+        :param id_columns: number of leading columns that hold node ids.
+        :return: iterable of the items.
+        """
+        if not hasattr(items, 'tolist') or not hasattr(items, 'ndim'):
+            return items
+        if items.ndim == 1:
+            return items.astype('int64').tolist() if DiGraph.integral(items) else items.tolist()
+        columns = [items[:, i].astype('int64').tolist() if i < id_columns and DiGraph.integral(items[:, i])
+                   else items[:, i].tolist() for i in range(items.shape[1])]
+        return zip(*columns)
+
+    @staticmethod
+    def integral(values: np.ndarray) -> bool:
+        """
+        :param values: NumPy array.
+        :return: True if all the values are 64 bit integers, of an integer type or floats without a fraction,
+        so they are converted to int64 as they are (e.g. 1.7 is not, it is not truncated to 1).
+        """
+        if values.dtype.kind == 'i':
+            return True
+        if values.dtype.kind == 'u':
+            return values.size == 0 or int(values.max()) <= np.iinfo(np.int64).max
+        if values.dtype.kind == 'f':
+            return bool(np.all((np.trunc(values) == values) & (np.abs(values) < 2.0 ** 63)))
+        return False
+
+    def to_csr(self) -> CSRGraph:
+        """
+        Returns a frozen, array-backed (CSR) snapshot of this graph.
+        The snapshot is kept and returned again as long as the graph is not changed,
+        once the mode count changes, the next call builds a new one.
+        :return: CSRGraph of the current version of this graph.
+        """
+        csr = self.csr
+        if csr is None or csr.get_mc() != self.mode_count:
+            csr = CSRGraph.from_graph(self)
+            self.csr = csr
+        return csr
+
+    @classmethod
+    def from_csr(cls, csr: CSRGraph, keep: bool = True) -> 'DiGraph':
+        """
+        Builds a mutable graph from a CSR snapshot, with the same nodes, positions, edges and mode count.
+        :param csr: CSRGraph
+        :param keep: if True, the snapshot is kept as the cached snapshot of the new graph (see to_csr),
+        a snapshot of a memory mapped file should not be kept, since it holds the file open.
+        :return: new DiGraph
+        """
+        g = cls()
+        ids = list(csr.ids)
+        pos_x = csr.pos_x.tolist()
+        pos_y = csr.pos_y.tolist()
+        out_offsets = csr.out_offsets.tolist()
+        out_targets = [ids[i] for i in csr.out_targets.tolist()]
+        out_weights = csr.out_weights.tolist()
+        in_offsets = csr.in_offsets.tolist()
+        in_sources = [ids[i] for i in csr.in_sources.tolist()]
+        in_weights = csr.in_weights.tolist()
+        for i, node_id in enumerate(ids):
+            node = DiGraph.NodeData(node_id, None if isnan(pos_x[i]) else (pos_x[i], pos_y[i]))
+            start, end = out_offsets[i], out_offsets[i + 1]
+            if start != end:
+                node.node_out = dict(zip(out_targets[start:end], out_weights[start:end]))
+            start, end = in_offsets[i], in_offsets[i + 1]
+            if start != end:
+                node.node_in = dict(zip(in_sources[start:end], in_weights[start:end]))
+            g.nodes[node_id] = node
+        g.edge_size = csr.e_size()
+        g.mode_count = csr.get_mc()
+        if keep:
+            g.csr = csr
+        return g
+
+    def memory_usage(self) -> dict:
+        """
+        Estimates the memory held by this graph, using sys.getsizeof of the objects it holds
+        (objects shared with other structures, such as small cached integers, are counted too).
+        :return: dictionary of bytes - 'nodes' (the nodes dictionary, NodeData objects and ids),
+        'adjacency' (the node_out and node_in dictionaries and the weights), 'positions' and 'total'.
+        """
+        getsizeof = sys.getsizeof
+        nodes = getsizeof(self.nodes)
+        adjacency = 0
+        positions = 0
+        for node in self.nodes.values():
+            nodes += getsizeof(node) + getsizeof(node.id)
+            if node.node_out is not NO_EDGES:
+                adjacency += getsizeof(node.node_out) + sum(map(getsizeof, node.node_out.values()))
+            if node.node_in is not NO_EDGES:
+                # the weights are the same objects as in node_out of the other end
+                adjacency += getsizeof(node.node_in)
+            if node.position is not None:
+                positions += getsizeof(node.position) + sum(map(getsizeof, node.position))
+        return {'nodes': nodes, 'adjacency': adjacency, 'positions': positions,
+                'total': nodes + adjacency + positions}
+
     def __str__(self):
         node_str = ''
         for i in self.nodes.values():
@@ -156,6 +693,21 @@ class DiGraph(GraphInterface):
     def __eq__(self, other):
         return self.edge_size == other.edge_size and self.nodes == other.nodes
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['listeners'] = []
+        state['journal'] = None
+        # the snapshot is only a cache (rebuilt by to_csr), and may be backed by a memory mapped file
+        state['csr'] = None
+        state['profiler'] = None
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault('listeners', [])
+        state.setdefault('journal', None)
+        state.setdefault('profiler', None)
+        self.__dict__.update(state)
+
     # def __deepcopy__(self, memodict={}):
 
     class NodeData:
@@ -164,24 +716,30 @@ class DiGraph(GraphInterface):
         Every NodeData has unique id, and also 2D position, and 2 dictionary:
         for edges get out from the nodes, and for edges get in to the node.
         This dictionaries node_id as keys and edge weight as values.
+        The attributes are stored in slots (there is no __dict__ per node),
+        and until a node gets its first out (in) edge, its node_out (node_in) is the shared NO_EDGES.
         """
 
+        __slots__ = ('id', 'tag', 'remark', 'node_out', 'node_in', 'position')
+
         def __init__(self, node_id: int, pos: tuple = None):
             self.id = node_id
             self.tag = -1.0
             self.remark = 0
-            self.node_out = dict()
-            self.node_in = dict()
+            self.node_out = NO_EDGES
+            self.node_in = NO_EDGES
             self.position = pos
 
-
         def add_out(self, node_id: int, weight: float):
             """
             Add new edge from this node to node_id, with the given weight.
             :param node_id: The end node of the edge.
             :param weight: The weight of the edge.
             """
-            self.node_out[node_id] = weight
+            if self.node_out is NO_EDGES:
+                self.node_out = {node_id: weight}
+            else:
+                self.node_out[node_id] = weight
 
         def add_in(self, node_id: int, weight: float):
             """
@@ -189,7 +747,10 @@ class DiGraph(GraphInterface):
             :param node_id: The start node of the edge.
             :param weight: The weight of the edge.
             """
-            self.node_in[node_id] = weight
+            if self.node_in is NO_EDGES:
+                self.node_in = {node_id: weight}
+            else:
+                self.node_in[node_id] = weight
 
         def __str__(self):
             return '(' + str(self.id) + ')'
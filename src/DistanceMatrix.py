@@ -0,0 +1,217 @@
+import os
+from heapq import heappush, heappop
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from CSRGraph import CSRGraph
+
+WORKER = {}  # the state of a worker process of the pool, set by init_worker
+MAX_BYTES = 1 << 30  # the default limit of the memory all_pairs may allocate
+BLOCK = 64  # rows per tile of floyd_warshall, a tile and its temporary arrays stay in the CPU cache
+# Floyd-Warshall relaxes V^3 matrix cells in NumPy, repeated Dijkstra relaxes V * (V + E) edges in Python,
+# one cell costs about FW_CELL_COST edge relaxations (measured by benchmarks.all_pairs)
+FW_CELL_COST = 0.005
+
+
+def distance_matrix(csr: CSRGraph, sources, targets, workers: int = 1) -> np.ndarray:
+    """
+    Computes the distances from every source to every target by one run of Dijkstra's Algorithm
+    per source (CSRGraph.distances).
+    With more than one worker, the binary form of csr (see CSRGraph.write_into) and the result matrix
+    are put in shared memory, every worker process wraps the graph once (CSRGraph.from_buffer, no copy)
+    and writes its rows directly into the result, so only lists of row numbers are sent to the workers.
+    :param csr: the graph.
+    :param sources: sequence of source node ids.
+    :param targets: sequence of target node ids.
+    :param workers: the number of worker processes, None for os.cpu_count().
+    :return: NumPy array of shape (len(sources), len(targets)), inf where there is no path or no such node.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    source_index = np.array([csr.index.get(s, -1) for s in sources], dtype=np.int64)
+    target_index = np.array([csr.index.get(t, -1) for t in targets], dtype=np.int64)
+    shape = (len(source_index), len(target_index))
+    rows = [r for r in range(shape[0]) if source_index[r] >= 0]
+    workers = min(workers, len(rows))
+    if workers <= 1 or shape[1] == 0:
+        out = np.full(shape, np.inf)
+        fill_rows(csr, rows, source_index, target_index, out)
+        return out
+
+    if isinstance(csr.ids, list):
+        # the workers only use the indices, and only integer ids have a binary form
+        csr = csr.with_index_ids()
+    graph_memory = SharedMemory(create=True, size=csr.nbytes())
+    out_memory = SharedMemory(create=True, size=8 * shape[0] * shape[1])
+    try:
+        csr.write_into(graph_memory.buf)
+        out = np.ndarray(shape, dtype=np.float64, buffer=out_memory.buf)
+        out.fill(np.inf)
+        # a few chunks per worker, so a worker that got slow sources does not hold up the others
+        size = max(1, len(rows) // (4 * workers))
+        chunks = [rows[i:i + size] for i in range(0, len(rows), size)]
+        with Pool(workers, init_worker,
+                  (graph_memory.name, out_memory.name, shape, source_index, target_index)) as pool:
+            for _ in pool.imap_unordered(worker_rows, chunks):
+                pass
+        return out.copy()
+    finally:
+        out = None  # the view must be released before the memory is closed
+        graph_memory.close()
+        graph_memory.unlink()
+        out_memory.close()
+        out_memory.unlink()
+
+
+def fill_rows(csr: CSRGraph, rows, source_index: np.ndarray, target_index: np.ndarray, out: np.ndarray):
+    """
+    Writes the distances of the given rows into out.
+    :param rows: row numbers, the sources of these rows must be in the graph.
+    :param source_index: the index in csr of the source of every row.
+    :param target_index: the index in csr of the target of every column, -1 for a target that is not in the graph.
+    :param out: the result matrix, the columns of the targets that are not in the graph are left as they are.
+    """
+    known = target_index >= 0
+    columns = target_index[known]
+    for r in rows:
+        dist = np.array(csr.distances(int(source_index[r])))
+        out[r, known] = dist[columns]
+
+
+def init_worker(graph_name: str, out_name: str, shape: tuple, source_index: np.ndarray, target_index: np.ndarray):
+    """
+    Runs once in every worker process: attaches the shared memory of the graph and of the result.
+    """
+    graph_memory = SharedMemory(graph_name)
+    out_memory = SharedMemory(out_name)
+    WORKER['memory'] = (graph_memory, out_memory)
+    WORKER['csr'] = CSRGraph.from_buffer(graph_memory.buf)
+    WORKER['out'] = np.ndarray(shape, dtype=np.float64, buffer=out_memory.buf)
+    WORKER['sources'] = source_index
+    WORKER['targets'] = target_index
+
+
+def worker_rows(rows: list) -> int:
+    """
+    Computes a chunk of rows in a worker process.
+    :return: the number of rows.
+    """
+    fill_rows(WORKER['csr'], rows, WORKER['sources'], WORKER['targets'], WORKER['out'])
+    return len(rows)
+
+
+def all_pairs(csr: CSRGraph, method: str = None, max_bytes: int = MAX_BYTES) -> (np.ndarray, np.ndarray):
+    """
+    Computes the distances and the next hops between all the pairs of nodes.
+    :param csr: the graph.
+    :param method: 'floyd_warshall', 'dijkstra', or None to pick the one that should be faster:
+    Floyd-Warshall for dense graphs, where its V^3 cheap vectorized steps cost less than
+    V * (V + E) Dijkstra steps in Python, and repeated Dijkstra for sparse graphs.
+    :param max_bytes: the largest number of bytes the matrices may take.
+    :return: (dist, next_hop), arrays of shape (V, V) in the order of the indices of csr:
+    dist[i][j] is the distance from i to j (inf if there is no path), next_hop[i][j] is the index of the node
+    after i on a shortest path from i to j (j if i == j, -1 if there is no path).
+    :raise MemoryError: if the matrices need more than max_bytes, checked before anything is allocated.
+    :raise ValueError: if method is not one of the above.
+    """
+    n, m = csr.v_size(), csr.e_size()
+    if method is None:
+        method = 'floyd_warshall' if n * n * FW_CELL_COST < n + m else 'dijkstra'
+    if method not in ('floyd_warshall', 'dijkstra'):
+        raise ValueError('Unknown all pairs method: ' + str(method))
+    # float64 distances and int32 next hops, and the temporary arrays of a tile
+    need = 12 * n * n + (9 * BLOCK * n if method == 'floyd_warshall' else 0)
+    if need > max_bytes:
+        raise MemoryError('all pairs of ' + str(n) + ' nodes need about ' + str(need) +
+                          ' bytes, more than max_bytes = ' + str(max_bytes))
+    if method == 'floyd_warshall':
+        return floyd_warshall(csr)
+    return repeated_dijkstra(csr)
+
+
+def repeated_dijkstra(csr: CSRGraph) -> (np.ndarray, np.ndarray):
+    """
+    All pairs by one run of Dijkstra's Algorithm per node (see first_hops).
+    :return: (dist, next_hop) as returned by all_pairs.
+    """
+    n = csr.v_size()
+    dist = np.empty((n, n))
+    next_hop = np.empty((n, n), dtype=np.int32)
+    for i in range(n):
+        dist[i], next_hop[i] = first_hops(csr, i)
+    return dist, next_hop
+
+
+def first_hops(csr: CSRGraph, src: int) -> (list, list):
+    """
+    Dijkstra's Algorithm over indices, from src to all the nodes (see CSRGraph.distances),
+    that also keeps for every node the first node after src on its shortest path.
+    :param src: the start index
+    :return: (dist, hop) lists over the indices, inf and -1 for the nodes that can not be reached.
+    """
+    offsets, targets, weights = csr.out_offsets, csr.out_targets, csr.out_weights
+    n = csr.v_size()
+    dist = [float("inf")] * n
+    hop = [-1] * n
+    dist[src] = 0
+    hop[src] = src
+    heap = [(0, src)]
+    while heap:
+        d, v = heappop(heap)
+        if d > dist[v]:
+            continue
+        h = hop[v]
+        for e in range(offsets[v], offsets[v + 1]):
+            u = targets[e]
+            nd = d + weights[e]
+            if nd < dist[u]:
+                dist[u] = nd
+                hop[u] = u if v == src else h
+                heappush(heap, (nd, u))
+    return dist, hop
+
+
+def floyd_warshall(csr: CSRGraph) -> (np.ndarray, np.ndarray):
+    """
+    Blocked Floyd-Warshall in NumPy.
+    The intermediate nodes are taken BLOCK at a time: first the rows of the block are closed over it
+    (they only depend on each other), then every other tile of BLOCK rows is relaxed through the nodes
+    of the block, one vectorized step per node, on the tile only, so its temporary arrays stay in the cache
+    instead of streaming the whole V x V matrix for every node.
+    When i -> k -> j improves i -> j, the next hop of i -> j becomes the next hop of i -> k.
+    :return: (dist, next_hop) as returned by all_pairs.
+    """
+    n = csr.v_size()
+    offsets = np.frombuffer(csr.out_offsets, dtype=np.int64)
+    targets = np.frombuffer(csr.out_targets, dtype=np.int64)
+    sources = np.repeat(np.arange(n), np.diff(offsets))
+    dist = np.full((n, n), np.inf)
+    dist[sources, targets] = np.frombuffer(csr.out_weights, dtype=np.float64)
+    next_hop = np.full((n, n), -1, dtype=np.int32)
+    next_hop[sources, targets] = targets
+    diagonal = np.arange(n)
+    dist[diagonal, diagonal] = 0
+    next_hop[diagonal, diagonal] = diagonal
+
+    cand = np.empty((BLOCK, n))
+    better = np.empty((BLOCK, n), dtype=bool)
+
+    def relax(rows: slice, block: range):
+        d, h = dist[rows], next_hop[rows]
+        c, b = cand[:len(d)], better[:len(d)]
+        for k in block:
+            np.add(d[:, k, None], dist[k], out=c)
+            np.less(c, d, out=b)
+            np.copyto(d, c, where=b)
+            np.copyto(h, h[:, k, None], where=b)
+
+    tiles = [slice(start, min(start + BLOCK, n)) for start in range(0, n, BLOCK)]
+    for tile in tiles:
+        block = range(tile.start, tile.stop)
+        relax(tile, block)
+        for other in tiles:
+            if other is not tile:
+                relax(other, block)
+    return dist, next_hop
@@ -0,0 +1,172 @@
+from heapq import heappush, heappop
+
+
+class DynamicSSSP:
+    """
+    This class keeps the shortest path tree of one source node up to date while the graph changes
+    (Dynamic Single Source Shortest Paths).
+    It starts from (dist, prev) as returned by GraphAlgo.shortest_path_tree, registers itself as a listener of
+    the graph (see DiGraph.add_listener), and repairs only the part of the tree that a change affects:
+    - a new (or lighter) edge u -> v that makes v closer: Dijkstra's Algorithm from v, which goes on only through
+      the nodes whose distance decreases.
+    - a removed (or heavier) edge u -> v of the tree: every node in the subtree of v loses its distance, each one gets
+      the best distance through an edge from a node outside the subtree, and Dijkstra's Algorithm
+      from those distances settles the subtree again. Removing (or making heavier) an edge that is not in the tree
+      changes nothing.
+    children[v] holds the nodes whose prev is v, so the subtree of a node is found without a search.
+    settled counts the nodes settled by all the repairs, to compare with |V| per change of a full recompute.
+    """
+
+    def __init__(self, g, src: int, tree: tuple = None):
+        """
+        :param g: DiGraph
+        :param src: the source node id
+        :param tree: (dist, prev) of GraphAlgo.shortest_path_tree(src) for the current graph (they are copied),
+        if None, it is computed here.
+        """
+        self.graph = g
+        self.src = src
+        self.dist = {}
+        self.prev = {}
+        self.children = {}
+        self.settled = 0
+        if tree is not None:
+            self.dist = dict(tree[0])
+            for node_id, parent in tree[1].items():
+                self.set_prev(node_id, parent)
+        else:
+            self.reset()
+        g.add_listener(self.apply)
+
+    def close(self):
+        """
+        Stops following the changes of the graph.
+        """
+        self.graph.remove_listener(self.apply)
+
+    def reset(self):
+        """
+        Computes the tree from the start.
+        """
+        self.dist, self.prev, self.children = {}, {}, {}
+        if self.src in self.graph.get_all_v():
+            self.dist[self.src] = 0
+            self.set_prev(self.src, None)
+            self.propagate([(0, self.src)])
+
+    def set_prev(self, node_id: int, parent):
+        """
+        Makes parent the previous node of node_id in the tree (None for the source).
+        """
+        old = self.prev.get(node_id)
+        if old is not None:
+            self.children[old].discard(node_id)
+        self.prev[node_id] = parent
+        if parent is not None:
+            self.children.setdefault(parent, set()).add(node_id)
+
+    def propagate(self, heap: list):
+        """
+        Dijkstra's Algorithm from the (distance, node id) entries of heap, whose distances are already in dist,
+        every node whose distance decreases gets a new prev and is pushed.
+        """
+        nodes = self.graph.get_all_v()
+        dist = self.dist
+        while heap:
+            d, v = heappop(heap)
+            if d > dist[v]:
+                continue
+            self.settled += 1
+            for n, w in nodes[v].node_out.items():
+                nd = d + w
+                if n not in dist or nd < dist[n]:
+                    dist[n] = nd
+                    self.set_prev(n, v)
+                    heappush(heap, (nd, n))
+
+    def apply(self, event: tuple):
+        """
+        Repairs the tree after one change of the graph (the listener, see DiGraph.add_listener).
+        :param event: the event tuple.
+        """
+        kind = event[0]
+        if kind == 'add_edge':
+            self.edge_decreased(event[1], event[2], event[3])
+        elif kind == 'remove_edge':
+            self.edge_increased(event[1], event[2])
+        elif kind == 'update_edge':
+            if event[4] < event[3]:
+                self.edge_decreased(event[1], event[2], event[4])
+            else:
+                self.edge_increased(event[1], event[2])
+        elif kind == 'add_node':
+            if event[1] == self.src:
+                self.reset()
+        elif kind == 'remove_node':
+            if event[1] == self.src:
+                self.dist, self.prev, self.children = {}, {}, {}
+            self.children.pop(event[1], None)
+
+    def edge_decreased(self, src: int, dest: int, weight: float):
+        """
+        The edge src -> dest was added (or got lighter): if it makes dest closer, the improvement is propagated.
+        """
+        dist = self.dist
+        if src not in dist:
+            return
+        nd = dist[src] + weight
+        if dest in dist and nd >= dist[dest]:
+            return
+        dist[dest] = nd
+        self.set_prev(dest, src)
+        self.propagate([(nd, dest)])
+
+    def edge_increased(self, src: int, dest: int):
+        """
+        The edge src -> dest was removed (or got heavier): if it is in the tree, the subtree of dest is settled again.
+        """
+        if self.prev.get(dest) != src or src not in self.dist:
+            return
+        dist, prev, children = self.dist, self.prev, self.children
+        subtree = [dest]
+        for v in subtree:
+            subtree.extend(children.pop(v, ()))
+        children[src].discard(dest)
+        for v in subtree:
+            del dist[v]
+            del prev[v]
+
+        nodes = self.graph.get_all_v()
+        heap = []
+        for v in subtree:
+            best, parent = None, None
+            for n, w in nodes[v].node_in.items():
+                if n in dist and (best is None or dist[n] + w < best):
+                    best, parent = dist[n] + w, n
+            if parent is not None:
+                dist[v] = best
+                self.set_prev(v, parent)
+                heap.append((best, v))
+        heap.sort()
+        self.propagate(heap)
+
+    def distance(self, node_id: int) -> float:
+        """
+        :param node_id: The node id
+        :return: the distance from the source to the node, inf if it can not be reached.
+        """
+        return self.dist.get(node_id, float("inf"))
+
+    def path(self, node_id: int) -> list:
+        """
+        :param node_id: The node id
+        :return: the shortest path from the source to the node as a list, None if it can not be reached.
+        """
+        if node_id not in self.dist:
+            return None
+        path = []
+        while node_id is not None:
+            path.append(node_id)
+            node_id = self.prev[node_id]
+        path.reverse()
+        return path
@@ -1,23 +1,57 @@
+import gzip
+import io
 import json
+from array import array
+from contextlib import contextmanager
 from heapq import heappush, heappop
-from queue import PriorityQueue
+from math import hypot
 
+from CSRGraph import CSRGraph
+from ContractionHierarchy import ContractionHierarchy
 from DiGraph import *
+from DistanceMatrix import MAX_BYTES, all_pairs, distance_matrix
+from DynamicSSSP import DynamicSSSP
 from GraphAlgoInterface import *
+from GraphJson import JsonArrayReader, parse_pos, write_graph_json
 from Gui import Gui
+from IncrementalSCC import IncrementalSCC
+from Landmarks import LandmarkIndex
+from Layout import force_layout, random_layout
+from LRUCache import LRUCache
+from Profiler import Profiler
 
 
 class GraphAlgo(GraphAlgoInterface):
-    """This class represents an algorithms class for the class Digraph."""
+    """
+    This class represents an algorithms class for the class Digraph.
+    The algorithms keep their working state in local structures of every call
+    (they never write the tag or remark of the nodes), so as long as the graph is not changed,
+    any number of threads may run queries on the same graph and the same GraphAlgo concurrently.
+    """
 
-    mark_tag = 0  # used for the algorithms Scc
+    LOAD_BATCH = 1 << 16  # number of edges load_from_json keeps before adding them to the graph
+    GZIP_LEVEL = 6  # compression level of save_to_json, 9 is about twice slower for a few percent
+    SHORTEST_PATH_METHODS = ('dijkstra', 'bidirectional', 'astar', 'alt', 'ch')
+    BIDIRECTIONAL_MIN_NODES = 10000  # graphs of at least this size use bidirectional search by default
+    PROFILED = ('load_from_json', 'save_to_json', 'load_binary', 'save_binary', 'shortest_path', 'shortest_paths',
+                'shortest_path_tree', 'distance_matrix', 'all_pairs_shortest_paths', 'connected_component',
+                'connected_components', 'build_landmarks', 'build_contraction_hierarchy')  # see enable_profiling
 
-    def __init__(self, g: DiGraph = None):
+    def __init__(self, g: DiGraph = None, cache_size: int = 0):
         """
         Initialize the graph that this class work on.
         :param g: graph DiGraph
+        :param cache_size: the number of shortest path and SCC results to keep (see cached), 0 for no cache.
         """
         self.graph = g
+        self.cache = LRUCache(cache_size)
+        self.cache_version = None  # (graph, mode count) of the results in the cache
+        self.scale_cache = None  # (graph, mode count, scale) of the last position_scale call
+        self.landmarks = None  # (graph, LandmarkIndex) of build_landmarks or load_landmarks
+        self.hierarchy = None  # (graph, ContractionHierarchy) of build_contraction_hierarchy
+        self.scc_tracker = None  # IncrementalSCC of track_components
+        self.profiler = None  # Profiler of the last enable_profiling, kept after disable_profiling for stats
+        self.profiling = False
 
     def get_graph(self) -> GraphInterface:
         """
@@ -28,113 +62,754 @@ class GraphAlgo(GraphAlgoInterface):
     def load_from_json(self, file_name: str) -> bool:
         """
         Loads a graph from a json file.
+        The file is parsed incrementally (see GraphJson), the nodes and edges are added to the graph
+        in batches while the file is read, so the parsed document is never held in memory as a whole.
+        The edges can be added only once the nodes are known: if the file lists the edges before the nodes
+        (as all the files of data/ do), the file is read twice: the first pass skips the edges without decoding
+        them (see JsonArrayReader.skip_array) and adds the nodes, the second adds the edges,
+        so the memory is bounded by the batches in either order. A file that can not be read
+        again (not seekable) keeps all its edges until the end, in compact arrays (see buffer_edges).
+        Gzip compressed files (see save_to_json) are recognized by their content and decompressed while read.
 
         :param: file_name: The path to the json file.
         :return: True if the loading was successful, False o.w.
         """
         try:
-            with open(file_name, 'r') as file:
-                data = json.load(file)
+            with GraphAlgo.open_json(file_name) as file:
                 g = DiGraph()
-                for i in data['Nodes']:
-                    if 'pos' in i.keys():
-                        str_lst = i['pos'].split(',')
-                        pos = (float(str_lst[0]), float(str_lst[1]))
-                        g.add_node(i['id'], pos)
-                    else:
-                        g.add_node(i['id'])
-                for i in data['Edges']:
-                    g.add_edge(i['src'], i['dest'], i['w'])
-                self.graph = g
+                buffer = [array('q'), array('q'), array('d')]
+                two_pass = file.seekable()
+                # the edges that come before the nodes are skipped in the first pass
+                skip = {'Edges'} if two_pass else set()
+                reader = JsonArrayReader(file)
+                for key, batch in reader.batches(skip):
+                    if key == 'Nodes':
+                        skip.clear()
+                        g.add_nodes_from([(i['id'], parse_pos(i['pos']) if 'pos' in i else None) for i in batch])
+                    elif key == 'Edges':
+                        GraphAlgo.buffer_edges(g, buffer, batch, 'Nodes' in reader.keys)
+                if 'Nodes' not in reader.keys or 'Edges' not in reader.keys:
+                    raise KeyError('Nodes' if 'Nodes' not in reader.keys else 'Edges')
+                if two_pass and reader.keys.index('Edges') < reader.keys.index('Nodes'):
+                    # the edges were skipped, they are read now that the nodes are known
+                    file.seek(0)
+                    for key, batch in JsonArrayReader(file).batches():
+                        if key == 'Nodes':
+                            break
+                        if key == 'Edges':
+                            GraphAlgo.buffer_edges(g, buffer, batch, True)
+                g.add_edges_from(zip(*buffer))
+                self.set_graph(g)
         except Exception as e:
             print(e)
             return False
 
         return True
 
-    def save_to_json(self, file_name: str) -> bool:
+    @staticmethod
+    def buffer_edges(g: DiGraph, buffer: list, batch: list, flush: bool):
+        """
+        Adds a batch of the parsed edges of load_from_json to the buffer, and the buffer to the graph once it is full.
+        The ids are kept in arrays of 64 bit integers and the weights in an array of floats (24 bytes per edge),
+        a column is replaced by a list once it gets a value of another type (e.g. string ids or integer weights),
+        so the values are loaded exactly as they are in the file.
+        :param g: the graph that is loaded.
+        :param buffer: [srcs, dests, weights], its columns are replaced in place.
+        :param batch: list of edge dictionaries.
+        :param flush: True if the nodes are known, then a full buffer (LOAD_BATCH edges) is added to g and emptied.
+        """
+        columns = ([i['src'] for i in batch], [i['dest'] for i in batch], [i['w'] for i in batch])
+        for k, column in enumerate(columns):
+            values = buffer[k]
+            if type(values) is array:
+                size = len(values)
+                if set(map(type, column)) <= {int if values.typecode == 'q' else float}:
+                    try:
+                        values.extend(column)
+                        continue
+                    except OverflowError:
+                        pass  # integers that do not fit in 64 bits
+                buffer[k] = values = list(values[:size])  # the array may have been extended in part
+            values.extend(column)
+        if flush and len(buffer[0]) >= GraphAlgo.LOAD_BATCH:
+            g.add_edges_from(zip(*buffer))
+            buffer[:] = [values[:0] for values in buffer]
+
+    def set_graph(self, g: DiGraph):
+        """
+        Replaces the graph that this class works on, moving the profiling of its changes to the new graph.
+
+        :param self: getting the self of this class
+        :param g: graph DiGraph
+        """
+        if self.profiling:
+            if self.graph is not None:
+                self.graph.disable_profiling()
+            g.enable_profiling(self.profiler)
+        self.graph = g
+
+    def enable_profiling(self, profiler: Profiler = None) -> Profiler:
+        """
+        Starts measuring the operations of PROFILED and the searches of shortest_path (as 'search',
+        the calls that were not answered by the cache, with the nodes settled, edges relaxed and heap pushes
+        of every query, see add_stats), and counting the changes of the graph (see DiGraph.enable_profiling).
+        The operations are measured by wrappers set on this instance (see Profiler.wrap),
+        so while profiling is disabled the methods run as they are, with no cost.
+
+        :param self: getting the self of this class
+        :param profiler: the Profiler to record in, a new one if not given.
+        :return: the profiler
+        """
+        self.disable_profiling()
+        profiler = self.profiler = Profiler() if profiler is None else profiler
+        for name in GraphAlgo.PROFILED:
+            profiler.wrap(self, name)
+        profiler.wrap(self, 'search', counters=True)
+        if self.graph is not None:
+            self.graph.enable_profiling(profiler)
+        self.profiling = True
+        return profiler
+
+    def disable_profiling(self):
+        """
+        Stops the profiling of enable_profiling, the counters are still returned by stats.
+
+        :param self: getting the self of this class
+        """
+        if not self.profiling:
+            return
+        for name in GraphAlgo.PROFILED + ('search',):
+            Profiler.unwrap(self, name)
+        if self.graph is not None:
+            self.graph.disable_profiling()
+        self.profiling = False
+
+    @contextmanager
+    def profile(self, profiler: Profiler = None):
+        """
+        Context manager that profiles the operations of its block:
+        with ga.profile() as profiler: ... then profiler.stats() (or ga.stats()).
+        The profiling that was enabled before the block is restored after it.
+
+        :param self: getting the self of this class
+        :param profiler: the Profiler to record in, a new one if not given.
+        """
+        previous = self.profiler if self.profiling else None
+        try:
+            yield self.enable_profiling(profiler)
+        finally:
+            self.disable_profiling()
+            if previous is not None:
+                self.enable_profiling(previous)
+
+    def stats(self) -> dict:
+        """
+        :param self: getting the self of this class
+        :return: a snapshot of the counters of the last profiler (see Profiler.stats), empty if never profiled.
+        """
+        return {} if self.profiler is None else self.profiler.stats()
+
+    def save_to_json(self, file_name: str, compact: bool = False, sort: bool = False, compress: bool = None) -> bool:
         """
         Saves the graph in JSON format to a file
+        The nodes and edges are formatted and written a chunk at a time (see GraphJson.write_graph_json),
+        with the default options the text is the same as json.dump of the whole document.
 
         :param self: getting the self of this class
-        :param file_name: The path to the out file
+        :param file_name: The path to the out file, or a file object opened for writing
+        (text, or binary if compressed), which is left open
+        :param compact: if True, no white space is written
+        :param sort: if True, the nodes and edges are written in order of id, so equal graphs give equal files
+        :param compress: if True, the file is gzip compressed, by default paths that end with '.gz' are
         :return: True if the save was successful, False o.w.
         """
-        j = dict()
-        j["Edges"] = list()
-        j["Nodes"] = list()
-        for i in self.graph.nodes.values():
-            if i.position is None:
-                pos = '0.0,0.0,0.0'
-            else:
-                pos = str(str(i.position[0]) + ',' + str(i.position[1]) + ',0.0')
-            j["Nodes"].append({"pos": pos, "id": i.id})
-            for key, weight in i.node_out.items():
-                j["Edges"].append({"src": i.id, "w": weight, "dest": key})
+        is_path = not hasattr(file_name, 'write')
+        if compress is None:
+            compress = is_path and str(file_name).endswith('.gz')
         try:
-            with open(file_name, 'w') as json_f:
-                json.dump(j, json_f)
-                return True
+            if is_path and compress:
+                with gzip.open(file_name, 'wt', GraphAlgo.GZIP_LEVEL, encoding='utf-8') as json_f:
+                    write_graph_json(self.graph, json_f, compact, sort)
+            elif is_path:
+                with open(file_name, 'w') as json_f:
+                    write_graph_json(self.graph, json_f, compact, sort)
+            elif compress:
+                # closing the wrappers does not close file_name
+                with io.TextIOWrapper(gzip.GzipFile(fileobj=file_name, mode='wb',
+                                                    compresslevel=GraphAlgo.GZIP_LEVEL), encoding='utf-8') as json_f:
+                    write_graph_json(self.graph, json_f, compact, sort)
+            else:
+                write_graph_json(self.graph, file_name, compact, sort)
         except IOError:
             return False
+        return True
+
+    @staticmethod
+    def open_json(file_name: str):
+        """
+        Opens a json file for reading as text, decompressing it if it starts with the gzip magic number.
+        :param file_name: The path to the file
+        :return: text file object
+        """
+        with open(file_name, 'rb') as f:
+            magic = f.read(2)
+        if magic == b'\x1f\x8b':
+            return gzip.open(file_name, 'rt', encoding='utf-8')
+        return open(file_name, 'r')
+
+    def save_binary(self, file_name: str) -> bool:
+        """
+        Saves the graph in the binary CSR format (see CSRGraph.write) to a file.
+        The file can be loaded back by load_binary, or opened read only by CSRGraph.load.
+
+        :param self: getting the self of this class
+        :param file_name: The path to the out file
+        :return: True if the save was successful, False o.w. (also if the node ids are not all integers,
+        only such graphs have a binary form)
+        """
+        try:
+            self.graph.to_csr().save(file_name)
+        except (IOError, ValueError):
+            return False
+        return True
+
+    def load_binary(self, file_name: str) -> bool:
+        """
+        Loads a graph saved by save_binary.
+        The file is memory mapped while the graph is built, and the mapping is closed after,
+        so the file is not held open (and may be overwritten) while the graph is used.
+
+        :param self: getting the self of this class
+        :param file_name: The path to the binary file
+        :return: True if the loading was successful, False o.w.
+        """
+        try:
+            with CSRGraph.load(file_name) as csr:
+                g = DiGraph.from_csr(csr, keep=False)
+            self.set_graph(g)
+        except Exception as e:
+            print(e)
+            return False
+        return True
 
-    def shortest_path(self, id1: int, id2: int) -> (float, list):
+    def shortest_path(self, id1: int, id2: int, method: str = None) -> (float, list):
         """
         Returns the shortest path from node id1 to node id2 using Dijkstra's Algorithm
 
         :param self: getting the self of this class
         :param id1: The start node id
         :param id2: The end node id
+        :param method: 'dijkstra' - one search from id1 (see dijkstra),
+        'bidirectional' - searches from both ends that meet in the middle (see bidirectional_dijkstra),
+        'astar' - A* guided by the positions of the nodes (see astar),
+        'alt' - A* guided by the landmarks of build_landmarks or load_landmarks (see alt),
+        'ch' - a query of the contraction hierarchy of build_contraction_hierarchy (see ch).
+        by default, bidirectional is used for graphs of at least BIDIRECTIONAL_MIN_NODES nodes.
+        if the cache is enabled, the result is kept until the graph is changed (see cached).
+        :return: The distance of the path, the path as a list
+        """
+        if method is None:
+            method = 'bidirectional' if self.graph.v_size() >= GraphAlgo.BIDIRECTIONAL_MIN_NODES else 'dijkstra'
+        if method not in GraphAlgo.SHORTEST_PATH_METHODS:
+            raise ValueError('Unknown shortest path method: ' + str(method))
+        if self.cache.maxsize == 0:
+            return self.search(id1, id2, method)
+
+        dist, path = self.cached(('path', id1, id2, method), lambda: self.search(id1, id2, method))
+        return dist, None if path is None else list(path)
+
+    def search(self, id1: int, id2: int, method: str, stats: dict = None) -> (float, list):
+        """
+        Finds the shortest path from node id1 to node id2 by the given method, without the cache.
+
+        :param self: getting the self of this class
+        :param id1: The start node id
+        :param id2: The end node id
+        :param method: one of SHORTEST_PATH_METHODS (see shortest_path)
+        :param stats: if given, the counters of the search are added to it (see add_stats)
         :return: The distance of the path, the path as a list
         """
         if id1 not in self.graph.nodes.keys() or id2 not in self.graph.nodes.keys():
             return float("inf"), None
-        src = self.graph.nodes[id1]
-        dest = self.graph.nodes[id2]
 
         if id1 == id2:
-            return 0, [src.id]
+            return 0, [id1]
+
+        if method == 'bidirectional':
+            return self.bidirectional_dijkstra(id1, id2, stats)
+        if method == 'astar':
+            return self.astar(id1, id2, stats)
+        if method == 'alt':
+            return self.alt(id1, id2, stats)
+        if method == 'ch':
+            return self.ch(id1, id2, stats)
+
+        dist, prev = self.dijkstra(id1, (id2,), stats)
+        if id2 not in dist:
+            return float("inf"), None
+
+        return dist[id2], GraphAlgo.path_to(prev, id2)
+
+    def bidirectional_dijkstra(self, id1: int, id2: int, stats: dict = None) -> (float, list):
+        """
+        Bidirectional Dijkstra's Algorithm: a forward search from id1 over node_out,
+        and a backward search from id2 over node_in (the transpose graph, without building it),
+        every step expands the side whose queue has the smaller distance.
+        mu holds the shortest id1 -> id2 path seen so far, it is updated whenever an edge connects
+        a node reached by one side to a node reached by the other side. Once the sum of the smallest
+        distances in the two queues is at least mu, no shorter path exists and the search stops.
+        On sparse graphs each side explores about a ball of half the radius, much fewer nodes than one search.
+        The distance is summed again along the path from id1, in the same order dijkstra sums it.
+
+        :param self: getting the self of this class
+        :param id1: The start node id, must be in the graph
+        :param id2: The end node id, must be in the graph
+        :param stats: if given, 'settled', 'relaxed' and 'pushes' of this dictionary are increased by the number
+        of nodes settled, edges relaxed and heap pushes (see add_stats)
+        :return: The distance of the path, the path as a list
+        """
+        nodes = self.graph.nodes
+        inf = float("inf")
+        dist_f, dist_b = {id1: 0}, {id2: 0}
+        prev_f, prev_b = {id1: None}, {id2: None}
+        settled_f, settled_b = set(), set()
+        queue_f, queue_b = [(0, 0, id1)], [(0, 0, id2)]
+        counter = 0
+        mu = inf
+        meet = None  # the edge (u, v) of the best path, u reached forward and v reached backward
+        while queue_f and queue_b:
+            if queue_f[0][0] + queue_b[0][0] >= mu:
+                break
+            forward = queue_f[0][0] <= queue_b[0][0]
+            if forward:
+                d, _, curr = heappop(queue_f)
+                if curr in settled_f:
+                    continue
+                settled_f.add(curr)
+                edges, queue, dist, prev, other = nodes[curr].node_out, queue_f, dist_f, prev_f, dist_b
+            else:
+                d, _, curr = heappop(queue_b)
+                if curr in settled_b:
+                    continue
+                settled_b.add(curr)
+                edges, queue, dist, prev, other = nodes[curr].node_in, queue_b, dist_b, prev_b, dist_f
+            for n, w in edges.items():
+                nd = d + w
+                if n not in dist or nd < dist[n]:
+                    dist[n] = nd
+                    prev[n] = curr
+                    counter += 1
+                    heappush(queue, (nd, counter, n))
+                if n in other and nd + other[n] < mu:
+                    mu = nd + other[n]
+                    meet = (curr, n) if forward else (n, curr)
+
+        if stats is not None:
+            GraphAlgo.add_stats(stats, len(settled_f) + len(settled_b),
+                                sum(len(nodes[v].node_out) for v in settled_f)
+                                + sum(len(nodes[v].node_in) for v in settled_b), counter)
+        if meet is None:
+            return inf, None
+
+        path = GraphAlgo.path_to(prev_f, meet[0])
+        curr = meet[1]
+        while curr is not None:
+            path.append(curr)
+            curr = prev_b[curr]
+        dist = 0
+        for i in range(1, len(path)):
+            dist += nodes[path[i - 1]].node_out[path[i]]
+        return dist, path
+
+    def astar(self, id1: int, id2: int, stats: dict = None, heuristic=None) -> (float, list):
+        """
+        A* search from id1 to id2, guided by the positions of the nodes, or by the given heuristic.
+        The queue is ordered by dist + h, where h(v) = scale * (euclidean distance from v to id2),
+        and scale is the smallest weight / euclidean length ratio over all the edges (see position_scale).
+        Every edge is then at least as heavy as the change of h along it, so h never overestimates
+        (it is admissible and consistent), the first time id2 is popped its distance is the shortest,
+        and nodes far from the straight line to id2 are never expanded.
+        If some node has no position, the search falls back to dijkstra.
+
+        :param self: getting the self of this class
+        :param id1: The start node id, must be in the graph
+        :param id2: The end node id, must be in the graph
+        :param stats: if given, 'settled', 'relaxed' and 'pushes' of this dictionary are increased by the number
+        of nodes settled, edges relaxed and heap pushes (see add_stats)
+        :param heuristic: if given, a consistent lower bound function h(node id) on the distance to id2,
+        used instead of the positions (see alt).
+        :return: The distance of the path, the path as a list
+        """
+        nodes = self.graph.nodes
+        if heuristic is None:
+            scale = self.position_scale()
+            if scale is None:
+                dist, prev = self.dijkstra(id1, (id2,), stats)
+                if id2 not in dist:
+                    return float("inf"), None
+                return dist[id2], GraphAlgo.path_to(prev, id2)
+            tx, ty = nodes[id2].position[0], nodes[id2].position[1]
+
+            def heuristic(node_id):
+                pos = nodes[node_id].position
+                return scale * hypot(pos[0] - tx, pos[1] - ty)
+
+        dist = {id1: 0}
+        prev = {id1: None}
+        settled = set()
+        counter = 0
+        p_queue = [(heuristic(id1), counter, id1)]
+        while p_queue:
+            _, _, curr = heappop(p_queue)
+            if curr in settled:
+                continue
+            settled.add(curr)
+            if curr == id2:
+                break
+            d = dist[curr]
+            for n, w in nodes[curr].node_out.items():
+                nd = d + w
+                if n not in dist or nd < dist[n]:
+                    dist[n] = nd
+                    prev[n] = curr
+                    counter += 1
+                    heappush(p_queue, (nd + heuristic(n), counter, n))
 
-        path = self.set_tag_dist(id1, id2)
-        if dest.tag == -1:
+        if stats is not None:
+            # the search stops when id2 is settled, before its edges are relaxed
+            relaxed = sum(len(nodes[v].node_out) for v in settled if v != id2)
+            GraphAlgo.add_stats(stats, len(settled), relaxed, counter)
+        if id2 not in settled:
             return float("inf"), None
-        curr = id2
-        lst = [id2]
-        while curr != id1:
-            temp = path[curr]
-            lst.insert(0, temp)
-            curr = temp
-
-        return dest.tag, lst
-
-    def set_tag_dist(self, id1, id2):
-        """
-        set the distance from id to all the nodes that can be reached from id1 until we reach id2
-        :param self: getting the self of this class
-        :param id1: the source id
-        :param id2: the destination id
-        """
-        p_queue = PriorityQueue()
-        path = {id1: None}
-        self.init_tags()
-        curr = self.graph.nodes[id1]
-        curr.tag = 0
-        p_queue.put((curr.tag, curr))
-        while not p_queue.empty():
-            curr = p_queue.get()[1]
-            if curr.id == id2:
-                return path
-            if self.graph.nodes[id2].tag != -1:
-                if curr.tag >= self.graph.nodes[id2].tag:
+        return dist[id2], GraphAlgo.path_to(prev, id2)
+
+    def alt(self, id1: int, id2: int, stats: dict = None) -> (float, list):
+        """
+        ALT search: A* from id1 to id2 guided by the lower bounds of the landmark index
+        (see LandmarkIndex.heuristic), which needs no positions and is usually much tighter
+        than the euclidean bound on road like graphs.
+        If there is no index for the current version of the graph, the search falls back to dijkstra.
+
+        :param self: getting the self of this class
+        :param id1: The start node id, must be in the graph
+        :param id2: The end node id, must be in the graph
+        :param stats: if given, 'settled', 'relaxed' and 'pushes' of this dictionary are increased by the number
+        of nodes settled, edges relaxed and heap pushes (see add_stats)
+        :return: The distance of the path, the path as a list
+        """
+        index = self.landmark_index()
+        if index is None:
+            dist, prev = self.dijkstra(id1, (id2,), stats)
+            if id2 not in dist:
+                return float("inf"), None
+            return dist[id2], GraphAlgo.path_to(prev, id2)
+        return self.astar(id1, id2, stats, index.heuristic(id1, id2))
+
+    def build_landmarks(self, k: int = 8) -> LandmarkIndex:
+        """
+        Builds the landmark index of ALT for the current graph (see LandmarkIndex.build),
+        it is used by alt until the graph is changed.
+
+        :param self: getting the self of this class
+        :param k: the number of landmarks, more landmarks give tighter bounds and take more memory (2 * k * |V| floats)
+        :return: the new index
+        """
+        index = LandmarkIndex.build(self.graph.to_csr(), k)
+        self.landmarks = (self.graph, index)
+        return index
+
+    def save_landmarks(self, file_name: str) -> bool:
+        """
+        Saves the landmark index of the graph to a file, so it can be loaded later instead of built again.
+
+        :param self: getting the self of this class
+        :param file_name: The path to the out file
+        :return: True if the save was successful, False o.w. (also if there is no index for the current graph)
+        """
+        index = self.landmark_index()
+        if index is None:
+            return False
+        try:
+            index.save(file_name)
+        except (IOError, TypeError):
+            return False
+        return True
+
+    def load_landmarks(self, file_name: str) -> bool:
+        """
+        Loads a landmark index saved by save_landmarks.
+        The index is accepted only if it was built for the current version of the graph
+        (the same nodes and the same mode count).
+
+        :param self: getting the self of this class
+        :param file_name: The path to the file
+        :return: True if the loading was successful, False o.w.
+        """
+        try:
+            index = LandmarkIndex.load(file_name)
+        except Exception as e:
+            print(e)
+            return False
+        if not index.matches(self.graph):
+            return False
+        self.landmarks = (self.graph, index)
+        return True
+
+    def landmark_index(self):
+        """
+        :param self: getting the self of this class
+        :return: the landmark index, or None if there is none or the graph was changed since it was built.
+        """
+        landmarks = self.landmarks
+        if landmarks is None:
+            return None
+        if landmarks[0] is not self.graph or landmarks[1].mc != self.graph.get_mc():
+            self.landmarks = None
+            return None
+        return landmarks[1]
+
+    def ch(self, id1: int, id2: int, stats: dict = None) -> (float, list):
+        """
+        Shortest path query of the contraction hierarchy (see ContractionHierarchy.shortest_path).
+        If there is no hierarchy for the current version of the graph, the search falls back to dijkstra.
+
+        :param self: getting the self of this class
+        :param id1: The start node id, must be in the graph
+        :param id2: The end node id, must be in the graph
+        :param stats: if given, 'settled', 'relaxed' and 'pushes' of this dictionary are increased by the number
+        of nodes settled, edges relaxed and heap pushes (see add_stats)
+        :return: The distance of the path, the path as a list
+        """
+        hierarchy = self.contraction_hierarchy()
+        if hierarchy is None:
+            dist, prev = self.dijkstra(id1, (id2,), stats)
+            if id2 not in dist:
+                return float("inf"), None
+            return dist[id2], GraphAlgo.path_to(prev, id2)
+        return hierarchy.shortest_path(id1, id2, stats)
+
+    def build_contraction_hierarchy(self) -> ContractionHierarchy:
+        """
+        Builds the contraction hierarchy of the current graph (see ContractionHierarchy.build),
+        it is used by ch until the graph is changed.
+
+        :param self: getting the self of this class
+        :return: the new hierarchy
+        """
+        hierarchy = ContractionHierarchy.build(self.graph.to_csr())
+        self.hierarchy = (self.graph, hierarchy)
+        return hierarchy
+
+    def contraction_hierarchy(self):
+        """
+        :param self: getting the self of this class
+        :return: the contraction hierarchy, or None if there is none or the graph was changed since it was built.
+        """
+        hierarchy = self.hierarchy
+        if hierarchy is None:
+            return None
+        if hierarchy[0] is not self.graph or hierarchy[1].mc != self.graph.get_mc():
+            self.hierarchy = None
+            return None
+        return hierarchy[1]
+
+    def position_scale(self):
+        """
+        Finds the largest scale for which scale * (euclidean distance between the positions of u and v)
+        is at most the weight of the edge (u, v), for every edge of the graph,
+        this is the smallest weight / length ratio over the edges, reduced by a tiny margin against rounding.
+        The result is kept until the graph changes.
+
+        :param self: getting the self of this class
+        :return: the scale, or None if some node has no position or no edge has a positive length.
+        """
+        g = self.graph
+        cached = self.scale_cache
+        if cached is not None and cached[0] is g and cached[1] == g.get_mc():
+            return cached[2]
+
+        mc = g.get_mc()
+        nodes = g.nodes
+        scale = None
+        if all(n.position is not None for n in nodes.values()):
+            ratio = float("inf")
+            for node in nodes.values():
+                x, y = node.position[0], node.position[1]
+                for n, w in node.node_out.items():
+                    pos = nodes[n].position
+                    length = hypot(pos[0] - x, pos[1] - y)
+                    if length > 0 and w < ratio * length:
+                        ratio = w / length
+            if ratio != float("inf"):
+                scale = ratio * (1 - 1e-9)
+        self.scale_cache = (g, mc, scale)
+        return scale
+
+    def shortest_path_tree(self, src: int) -> (dict, dict):
+        """
+        Runs Dijkstra's Algorithm once from src over all the nodes that can be reached from it,
+        the result can serve any number of destinations (see path_to).
+
+        :param self: getting the self of this class
+        :param src: The start node id
+        :return: (dist, prev) - dictionary of node id -> distance from src,
+        and dictionary of node id -> the previous node on the shortest path (None for src),
+        both contain only the nodes reachable from src. ({}, {}) if src is not in the graph.
+        """
+        if src not in self.graph.nodes:
+            return {}, {}
+        return self.dijkstra(src)
+
+    def track_distances(self, src: int) -> DynamicSSSP:
+        """
+        Computes the shortest path tree of src (see shortest_path_tree) and keeps it up to date
+        while the graph changes, repairing only the part of the tree a change affects (see DynamicSSSP).
+        The returned object follows the graph until its close method is called.
+
+        :param self: getting the self of this class
+        :param src: The start node id
+        :return: DynamicSSSP of src
+        """
+        return DynamicSSSP(self.graph, src, self.shortest_path_tree(src))
+
+    def shortest_paths(self, src: int, targets) -> dict:
+        """
+        Returns the shortest paths from src to every node in targets, using a single run of Dijkstra's Algorithm
+        that stops as soon as all the targets are settled.
+
+        :param self: getting the self of this class
+        :param src: The start node id
+        :param targets: iterable of the end nodes ids
+        :return: dictionary of target id -> (distance, path as a list), as returned by shortest_path,
+        (inf, None) for targets that can not be reached or are not in the graph.
+        """
+        targets = set(targets)
+        res = {}
+        if src not in self.graph.nodes:
+            for t in targets:
+                res[t] = (float("inf"), None)
+            return res
+
+        dist, prev = self.dijkstra(src, targets)
+        for t in targets:
+            if t in dist:
+                res[t] = (dist[t], GraphAlgo.path_to(prev, t))
+            else:
+                res[t] = (float("inf"), None)
+        return res
+
+    def distance_matrix(self, sources, targets=None, workers: int = 1):
+        """
+        Returns the distances from every node in sources to every node in targets,
+        by one run of Dijkstra's Algorithm per source over the CSR snapshot of the graph.
+        With workers > 1 the sources are split among worker processes that share the snapshot
+        through shared memory (see DistanceMatrix), the graph is not pickled per task.
+
+        :param self: getting the self of this class
+        :param sources: sequence of the start nodes ids
+        :param targets: sequence of the end nodes ids, None for the same nodes as sources
+        :param workers: the number of worker processes, None for one per CPU
+        :return: NumPy array of shape (len(sources), len(targets)), where [i][j] is the distance
+        from sources[i] to targets[j], inf if there is no path or no such node.
+        """
+        sources = list(sources)
+        targets = sources if targets is None else list(targets)
+        return distance_matrix(self.graph.to_csr(), sources, targets, workers)
+
+    def all_pairs_shortest_paths(self, method: str = None, max_bytes: int = None) -> (list, object, object):
+        """
+        Computes the shortest paths between all the pairs of nodes, as a distance matrix and a next hop matrix.
+        By default the method is picked by the density of the graph (see DistanceMatrix.all_pairs):
+        a blocked Floyd-Warshall in NumPy for dense graphs, and one run of Dijkstra's Algorithm per node
+        for sparse ones. The size of the V x V matrices is checked before they are allocated.
+        The path from ids[i] to ids[j] is i, next_hop[i][j], next_hop[next_hop[i][j]][j], ... up to j.
+
+        :param self: getting the self of this class
+        :param method: 'floyd_warshall', 'dijkstra' or None to pick by density
+        :param max_bytes: the largest number of bytes the matrices may take, None for DistanceMatrix.MAX_BYTES
+        :return: (ids, dist, next_hop): ids is the list of the node ids, the order of the rows and the columns,
+        dist[i][j] is the distance from ids[i] to ids[j] (inf if there is no path), and next_hop[i][j] is
+        the index of the node after ids[i] on a shortest path to ids[j] (-1 if there is no path).
+        :raise MemoryError: if the matrices need more than max_bytes.
+        """
+        csr = self.graph.to_csr()
+        dist, next_hop = all_pairs(csr, method, MAX_BYTES if max_bytes is None else max_bytes)
+        return list(csr.ids), dist, next_hop
+
+    def dijkstra(self, src: int, targets: set = None, stats: dict = None) -> (dict, dict):
+        """
+        Dijkstra's Algorithm from src, the working state is kept in local dictionaries
+        (the tags of the nodes are not used).
+        The priority queue holds (distance, counter, node id) tuples, the counter breaks ties
+        so node ids are never compared, and entries that became stale when a shorter distance
+        was found are skipped when popped (lazy deletion).
+
+        :param self: getting the self of this class
+        :param src: The start node id, must be in the graph
+        :param targets: if given, the search stops as soon as all of these nodes are settled
+        :param stats: if given, 'settled', 'relaxed' and 'pushes' of this dictionary are increased by the number
+        of nodes settled, edges relaxed and heap pushes (see add_stats)
+        :return: (dist, prev) - dictionary of node id -> distance from src
+        and dictionary of node id -> the previous node on the shortest path (None for src).
+        if targets is given, the distances of nodes that were not settled may be larger than the shortest.
+        """
+        nodes = self.graph.nodes
+        dist = {src: 0}
+        prev = {src: None}
+        settled = set()
+        remaining = None if targets is None else len(set(targets) & nodes.keys())
+        counter = 0
+        p_queue = [(0, counter, src)]
+        while p_queue:
+            d, _, curr = heappop(p_queue)
+            if curr in settled:
+                continue
+            settled.add(curr)
+            if remaining is not None and curr in targets:
+                remaining -= 1
+                if remaining == 0:
                     break
+            for n, w in nodes[curr].node_out.items():
+                nd = d + w
+                if n not in dist or nd < dist[n]:
+                    dist[n] = nd
+                    prev[n] = curr
+                    counter += 1
+                    heappush(p_queue, (nd, counter, n))
 
-            for nodeIn_id, w in curr.node_out.items():
-                n = self.graph.nodes[nodeIn_id]
-                if n.tag == -1 or n.tag > curr.tag + w:
-                    n.tag = curr.tag + w
-                    p_queue.put((n.tag, n))
-                    path[n.id] = curr.id
+        if stats is not None:
+            relaxed = sum(len(nodes[v].node_out) for v in settled)
+            if remaining == 0:
+                # the search stopped at the last target, before its edges were relaxed
+                relaxed -= len(nodes[curr].node_out)
+            GraphAlgo.add_stats(stats, len(settled), relaxed, counter)
+        return dist, prev
 
+    @staticmethod
+    def add_stats(stats: dict, settled: int, relaxed: int, pushes: int):
+        """
+        Adds the work of one search to a stats dictionary of the search methods:
+        'settled' - nodes whose distance became final, 'relaxed' - edges checked from them,
+        'pushes' - entries pushed to the priority queue by the edges (the entries of the start nodes are not counted).
+        """
+        stats['settled'] = stats.get('settled', 0) + settled
+        stats['relaxed'] = stats.get('relaxed', 0) + relaxed
+        stats['pushes'] = stats.get('pushes', 0) + pushes
+
+    @staticmethod
+    def path_to(prev: dict, dest: int) -> list:
+        """
+        Rebuilds a path from the prev dictionary of a shortest path tree, in linear time.
+        :param prev: dictionary of node id -> previous node id (None for the source)
+        :param dest: The end node id, must be in prev
+        :return: the path from the source to dest as a list
+        """
+        path = [dest]
+        curr = prev[dest]
+        while curr is not None:
+            path.append(curr)
+            curr = prev[curr]
+        path.reverse()
         return path
 
     def connected_component(self, id1: int) -> list:
@@ -154,94 +829,231 @@ class GraphAlgo(GraphAlgoInterface):
         """
         if id1 not in self.graph.nodes.keys():
             return None
-        self.m_t_init()
-        self.init_tags()
-        tag = self.m_t()
-        self.dfs_mark(id1, tag)
-        res = self.dfs_collect(id1, tag)
+        tracker = self.components_tracker()
+        if tracker is not None:
+            return tracker.connected_component(id1)
+        if self.cache.maxsize > 0:
+            return list(self.cached(('component', id1), lambda: self.dfs_collect(id1, self.dfs_mark(id1))))
+        marked = self.dfs_mark(id1)
+        res = self.dfs_collect(id1, marked)
         return list(res)
 
-    def connected_components(self) -> List[list]:
+    def connected_components(self, as_map: bool = False):
         """
         Finds all the Strongly Connected Component(SCC) in the graph.
-        To find the well-linked component that contains the vertex v, we need to construct a group of
-        vertices accessible from vertex v lets call this group A. Then a new graph G-transpose** is built
-        then we will find all the vertices accessible from vertex v in the graph G-transpose lets call this group B
-        Group B ∩ A is a group of vertices that consist the well-linked component of Graph G containing the
-        Vertex v. The complexity of an algorithm in the worst case is (| V | * | E |)  because each vertex passes
-        On all sides of the graph.
-        ** instead of creating a new graph G-transpose we use DFS to the IN_NODE vertices
+        The components are found in one pass over the graph by an iterative version of Tarjan's algorithm
+        (see scc_map), so the complexity is O(|V| + |E|), the graph is never copied and the tag and remark
+        of the nodes are left untouched.
+        The components are returned in the order Tarjan's algorithm completes them,
+        that is, every component appears before any component that can reach it.
 
         :param self: getting the self of this class
-        :return: The list all SCC
+        :param as_map: if True, returns a dictionary of node id -> component id instead of a list of lists,
+        where the component id is the index of the component in the list that would be returned otherwise.
+        :return: The list all SCC, or a dictionary of node id -> component id if as_map is True
         """
-        gt = GraphAlgo(self.transpose_graph())
-        lst = list()
-        lst_node_id = list()
+        tracker = self.components_tracker()
+        if tracker is not None:
+            return tracker.connected_components(as_map)
+        if self.cache.maxsize > 0:
+            comp_of = dict(self.cached(('components',), self.scc_map))
+        else:
+            comp_of = self.scc_map()
+        if as_map:
+            return comp_of
+        components = [set() for _ in range(max(comp_of.values(), default=-1) + 1)]
+        for node_id, comp_id in comp_of.items():
+            components[comp_id].add(node_id)
+        return [list(c) for c in components]
 
-        for i in self.graph.nodes.keys():
-            lst_node_id.append(i)
+    def cached(self, key: tuple, compute):
+        """
+        Returns the result of compute() for key from the cache, or computes and keeps it.
+        The keys are stored together with the mode count of the graph, and the cache is cleared
+        as soon as the graph (or its mode count) is found to have changed, so a result is never
+        served for another version of the graph. The cached values are shared, callers should return copies.
 
-        while len(lst_node_id) > 0:
-            temp_node = lst_node_id.pop()
+        :param self: getting the self of this class
+        :param key: tuple that identifies the query
+        :param compute: function with no arguments that computes the result
+        :return: the result
+        """
+        cache = self.cache
+        g = self.graph
+        mc = g.get_mc()
+        version = self.cache_version
+        if version is None or version[0] is not g or version[1] != mc:
+            cache.clear()
+            self.cache_version = (g, mc)
+        key = key + (mc,)
+        value = cache.get(key)
+        if value is LRUCache.MISSING:
+            value = compute()
+            cache.put(key, value)
+        return value
 
-            if temp_node in gt.graph.nodes:
-                tag = self.m_t()
-                gt.dfs_mark(temp_node, tag)
-                connected_component = gt.dfs_collect(temp_node, tag)
+    def set_cache_size(self, cache_size: int):
+        """
+        Replaces the cache by an empty one of the given size, 0 disables it.
 
-                # here we remove from the graph the vertices that already belong to SCC
-                for i in connected_component:
-                    gt.graph.remove_node(i)
+        :param self: getting the self of this class
+        :param cache_size: the number of results to keep
+        """
+        self.cache = LRUCache(cache_size)
+        self.cache_version = None
 
-                lst.append(list(connected_component))
+    def cache_stats(self) -> dict:
+        """
+        :param self: getting the self of this class
+        :return: the counters of the cache: hits, misses, evictions, invalidations, size and maxsize (see LRUCache).
+        """
+        return self.cache.stats()
 
-        return lst
+    def track_components(self) -> IncrementalSCC:
+        """
+        Starts keeping the SCC of the graph up to date while it changes (see IncrementalSCC),
+        from now on connected_component and connected_components are answered from it
+        instead of searching the graph.
 
-    def dfs_mark(self, src_id, tag):
+        :param self: getting the self of this class
+        :return: the IncrementalSCC that follows the graph
+        """
+        tracker = self.components_tracker()
+        if tracker is None:
+            tracker = IncrementalSCC(self.graph)
+            self.scc_tracker = tracker
+        return tracker
+
+    def components_tracker(self):
+        """
+        :param self: getting the self of this class
+        :return: the IncrementalSCC of track_components, or None if there is none for the current graph.
+        """
+        tracker = self.scc_tracker
+        if tracker is not None and tracker.graph is not self.graph:
+            tracker.close()
+            self.scc_tracker = tracker = None
+        return tracker
+
+    def scc_map(self) -> dict:
+        """
+        Tarjan's algorithm for Strongly Connected Components, written without recursion.
+        Every node gets an index in DFS discovery order, and low[v] holds the smallest index reachable
+        from the DFS subtree of v through at most one back edge to a node that is still on the stack.
+        When low[v] == index[v], v is the root of a component, and the component is popped from the stack.
+        The DFS keeps an explicit stack of (node id, iterator of its out edges), so deep graphs
+        do not hit the recursion limit.
+        Complexity: O(|V| + |E|), every node is pushed once and every edge is scanned once.
+        for more information visit https://en.wikipedia.org/wiki/Tarjan%27s_strongly_connected_components_algorithm
+
+        :param self: getting the self of this class
+        :return: dictionary of node id -> component id, components numbered from 0 in completion order
+        """
+        nodes = self.graph.nodes
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        comp_of = {}
+        comp_count = 0
+
+        # the roots are taken from the last node added, as the former implementation did
+        for root in reversed(nodes):
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(nodes[root].node_out))]
+            while work:
+                v, edges = work[-1]
+                for w in edges:
+                    if w not in index:
+                        index[w] = low[w] = len(index)
+                        stack.append(w)
+                        on_stack.add(w)
+                        work.append((w, iter(nodes[w].node_out)))
+                        break
+                    if w in on_stack and index[w] < low[v]:
+                        low[v] = index[w]
+                else:
+                    # all the out edges of v were scanned
+                    work.pop()
+                    if work:
+                        u = work[-1][0]
+                        if low[v] < low[u]:
+                            low[u] = low[v]
+                    if low[v] == index[v]:
+                        while True:
+                            w = stack.pop()
+                            on_stack.discard(w)
+                            comp_of[w] = comp_count
+                            if w == v:
+                                break
+                        comp_count += 1
+
+        return comp_of
+
+    def dfs_mark(self, src_id) -> set:
         """
         using DFS we mark every node that can be reached from the src node
-        we mark the nodes by changing their tag (node.tag) to the given tag
-        :param src_id:
-        :param tag:
-        """
-        src = self.graph.nodes[src_id]
-        pq = []
-        src.tag = tag
-        heappush(pq, src)
-        while len(pq) > 0:
-            temp = heappop(pq)
-            for i in temp.node_out.keys():
-                t_node = self.graph.nodes[i]
-                if t_node.tag != tag:
-                    t_node.tag = tag
-                    heappush(pq, t_node)
-
-    def dfs_collect(self, src_id, tag) -> set:
-        """
-        using DFS we collect every node that marked by the function dfs_cc
+        the marks are kept in a set of this call, the nodes themselves are not changed
+        :param src_id: the start node id
+        :return: set of the ids of the nodes that can be reached from src_id
+        """
+        nodes = self.graph.nodes
+        marked = {src_id}
+        stack = [src_id]
+        while stack:
+            temp = stack.pop()
+            for i in nodes[temp].node_out:
+                if i not in marked:
+                    marked.add(i)
+                    stack.append(i)
+        return marked
+
+    def dfs_collect(self, src_id, marked: set) -> set:
+        """
+        using DFS we collect every node that marked by the function dfs_mark
         we use reverse DFS that mean instead of going throw the OUT_NODE vertices we going throw IN_NODE vertices
         we treat the graph as a transpose graph
-        :param src_id:
-        :param tag:
-        """
-        src = self.graph.nodes[src_id]
-        pq = []
-        src.tag = tag
-        heappush(pq, src)
-        set_of_connected_nodes = set()
-        set_of_connected_nodes.add(src.id)
-        while len(pq) > 0:
-            temp = heappop(pq)
-            for i in temp.node_in.keys():
-                t_node = self.graph.nodes[i]
-                if t_node.tag == tag:
-                    if t_node.id not in set_of_connected_nodes:
-                        set_of_connected_nodes.add(t_node.id)
-                        heappush(pq, t_node)
+        :param src_id: the start node id
+        :param marked: set of node ids returned by dfs_mark(src_id)
+        :return: set of the ids of the marked nodes that can reach src_id
+        """
+        nodes = self.graph.nodes
+        set_of_connected_nodes = {src_id}
+        stack = [src_id]
+        while stack:
+            temp = stack.pop()
+            for i in nodes[temp].node_in:
+                if i in marked and i not in set_of_connected_nodes:
+                    set_of_connected_nodes.add(i)
+                    stack.append(i)
 
         return set_of_connected_nodes
 
+    def layout(self, method: str = 'random', seed: int = 1, iterations: int = 50) -> int:
+        """
+        Gives a position to every node without position, the positions are kept in the graph,
+        so save_to_json writes them and the next load (or plot) does not compute them again.
+        'random' scatters the nodes with no two sharing an x or a y (see Layout.random_layout), in O(V),
+        'force' is a force directed layout that places connected nodes close to each other (see Layout.force_layout).
+
+        :param self: getting the self of this class
+        :param method: 'random' or 'force'
+        :param seed: the seed of the random positions
+        :param iterations: the number of steps of 'force'
+        :return: the number of nodes that got a position
+        """
+        if method == 'random':
+            positions = random_layout(self.graph, seed)
+        elif method == 'force':
+            positions = force_layout(self.graph, iterations, seed)
+        else:
+            raise ValueError('Unknown layout: ' + str(method))
+        return self.graph.set_positions(positions)
+
     def plot_graph(self) -> None:
         """
         Plots the graph.
@@ -291,22 +1103,6 @@ class GraphAlgo(GraphAlgoInterface):
         for i in self.graph.nodes.values():
             i.tag = -1
 
-    def m_t(self) -> int:
-        """
-        changing GraphAlgo.mark_tag to GraphAlgo.mark_tag + 1
-        :return: GraphAlgo.mark_tag + 1
-        """
-        GraphAlgo.mark_tag = GraphAlgo.mark_tag + 1
-        return GraphAlgo.mark_tag
-
-    def m_t_init(self) -> int:
-        """
-        Initialize mark_tag in the GraphAlgo to 0 (mark_tag = 0).
-        :return:GraphAlgo.mark_tag
-        """
-        GraphAlgo.mark_tag = 0
-        return GraphAlgo.mark_tag
-
     @staticmethod
     def list_equals(lst1, lst2):
         """
@@ -0,0 +1,321 @@
+"""
+This file contains an incremental reader and a streaming writer for the graph json files,
+{"Edges": [{"src": 0, "w": 1.5, "dest": 1}, ...], "Nodes": [{"pos": "1.0,2.0,0.0", "id": 0}, ...]}
+The file is read in chunks, and every element of the top level arrays is decoded on its own,
+so only one chunk and one element are held in memory at a time, instead of the whole parsed document.
+The writer formats the elements a chunk at a time, without building the document either.
+"""
+
+import json
+
+CHUNK_SIZE = 1 << 16
+WRITE_CHUNK = 1 << 14  # number of nodes or edges write_graph_json formats at a time
+
+
+class JsonArrayReader:
+    """
+    Reads a json object from a text file, and yields the elements of its top level arrays one by one.
+    Top level values that are not arrays are decoded and skipped.
+    """
+
+    def __init__(self, file, chunk_size: int = CHUNK_SIZE):
+        """
+        :param file: text file object, opened for reading.
+        :param chunk_size: number of characters read from the file at a time.
+        """
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        self.keys = []  # the top level keys read so far
+        self.fills = 0  # the number of chunks read so far
+
+    def items(self):
+        """
+        Generator of (key, element) for every element of every top level array, in file order.
+        :raise ValueError: if the file is not a json object.
+        """
+        for key, batch in self.batches():
+            for val in batch:
+                yield key, val
+
+    def batches(self, skip: set = frozenset()):
+        """
+        Generator of (key, list of elements) for the elements of the top level arrays, in file order.
+        The lists are consecutive parts of the arrays, every list holds at most about one chunk of the file.
+        :param skip: the keys of the arrays that are consumed without decoding them (see skip_array),
+        checked when an array starts, so the set may be changed while the batches are read.
+        :raise ValueError: if the file is not a json object.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            return
+        while True:
+            key = self.value()
+            self.keys.append(key)
+            self.expect(':')
+            if self.peek() == '[':
+                self.pos += 1
+                if self.peek() == ']':
+                    self.pos += 1
+                elif key in skip:
+                    self.skip_array()
+                else:
+                    yield from self.array_batches(key)
+            else:
+                self.value()
+            if self.expect(',}') == '}':
+                return
+
+    def array_batches(self, key: str):
+        """
+        Generator of (key, list of elements) for the array that starts at the current position
+        (after the '['), consumes the array up to and including the ']'.
+        When the elements are objects, all the elements that are fully inside the buffer
+        (up to the last "}," in it) are decoded by one json call, wrapped as an array,
+        since the brackets must balance, this decode succeeds only when the cut is between two elements.
+        Otherwise, and for the element that crosses the end of the buffer, the elements are decoded one by one.
+        :param key: the key of the array.
+        """
+        decode = self.decoder.decode
+        failed_fill = -1  # the fill count of the buffer on which a batch decode failed
+        while True:
+            if self.fills != failed_fill:
+                buf = self.buf
+                cut = buf.rfind('},', self.pos)
+                if cut != -1:
+                    try:
+                        batch = decode('[' + buf[self.pos:cut + 1] + ']')
+                    except json.JSONDecodeError:
+                        batch = None
+                        failed_fill = self.fills
+                    if batch is not None:
+                        self.pos = cut + 2
+                        yield key, batch
+                        continue
+            yield key, [self.value()]
+            if self.expect(',]') == ']':
+                return
+
+    def skip_array(self):
+        """
+        Consumes the array that starts at the current position (after the '['), up to and including the ']',
+        without decoding its elements.
+        While the text holds no '[' and no escapes, the array ends at the first ']' that follows an even number
+        of quotes (outside of strings), so the buffer is scanned by str methods only, many times faster than
+        decoding it. A buffer that holds nested arrays, escapes or a ']' inside a string is scanned one character
+        at a time.
+        :raise ValueError: if the file ends inside the array.
+        """
+        depth, quoted, escaped = 1, False, False
+        while True:
+            buf, pos = self.buf, self.pos
+            if depth == 1 and not quoted:
+                end = buf.find(']', pos)
+                stop = len(buf) if end == -1 else end
+                if buf.find('[', pos, stop) == -1 and buf.find('\\', pos, stop) == -1:
+                    if buf.count('"', pos, stop) % 2 == 0:
+                        if end != -1:
+                            self.pos = end + 1
+                            return
+                        self.pos = stop
+                    elif end == -1:
+                        # a string is cut by the end of the buffer, it is scanned again with the next chunk
+                        self.pos = buf.rfind('"', pos, stop)
+                    if end == -1:
+                        if not self.fill():
+                            raise ValueError('Unterminated array at the end of the file')
+                        continue
+            for i in range(pos, len(buf)):
+                c = buf[i]
+                if escaped:
+                    escaped = False
+                elif quoted:
+                    if c == '\\':
+                        escaped = True
+                    elif c == '"':
+                        quoted = False
+                elif c == '"':
+                    quoted = True
+                elif c == '[':
+                    depth += 1
+                elif c == ']':
+                    depth -= 1
+                    if depth == 0:
+                        self.pos = i + 1
+                        return
+            self.pos = len(buf)
+            if not self.fill():
+                raise ValueError('Unterminated array at the end of the file')
+
+    def fill(self) -> bool:
+        """
+        Reads the next chunk of the file into the buffer, dropping the part that was already consumed.
+        :return: False if the end of the file was reached, True o.w.
+        """
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.fills += 1
+        return True
+
+    def peek(self) -> str:
+        """
+        Skips white spaces.
+        :return: the next character, '' at the end of the file.
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\n\r':
+                self.pos += 1
+            if self.pos < len(self.buf) or not self.fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, chars: str) -> str:
+        """
+        Consumes the next character, that must be one of chars.
+        :param chars: the allowed characters.
+        :return: the character.
+        :raise ValueError: if the next character is not one of chars.
+        """
+        c = self.peek()
+        if c == '' or c not in chars:
+            raise ValueError('Expecting one of ' + repr(chars) + ' at char ' + str(self.pos) + ', found ' + repr(c))
+        self.pos += 1
+        return c
+
+    def value(self):
+        """
+        Decodes the next json value.
+        A value is accepted only when the character following it is already in the buffer
+        (or the file ended), so a number cut by the end of a chunk is never decoded partially.
+        :return: the decoded value.
+        """
+        self.peek()
+        while True:
+            try:
+                val, end = self.decoder.raw_decode(self.buf, self.pos)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return val
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+
+def iter_graph_json(file, chunk_size: int = CHUNK_SIZE):
+    """
+    Generator of the ('Nodes', node dict) and ('Edges', edge dict) elements of a graph json file.
+    :param file: text file object, opened for reading.
+    :param chunk_size: number of characters read from the file at a time.
+    """
+    for key, item in JsonArrayReader(file, chunk_size).items():
+        if key == 'Nodes' or key == 'Edges':
+            yield key, item
+
+
+def parse_pos(pos: str) -> tuple:
+    """
+    Parses the "x,y,z" position string of a node.
+    :param pos: position string.
+    :return: (x, y)
+    """
+    str_lst = pos.split(',')
+    return float(str_lst[0]), float(str_lst[1])
+
+
+def format_pos(pos: tuple) -> str:
+    """
+    Formats the position of a node as the "x,y,z" position string, the reverse of parse_pos.
+    :param pos: (x, y), or None for a node without a position.
+    :return: position string, "0.0,0.0,0.0" for None.
+    """
+    if pos is None:
+        return '0.0,0.0,0.0'
+    return str(pos[0]) + ',' + str(pos[1]) + ',0.0'
+
+
+def id_key(node_id) -> tuple:
+    """
+    Sort key of node ids of different types (e.g. integers and strings, which can not be compared):
+    the ids are ordered by the name of their type, then by value.
+    :param node_id: node id.
+    :return: (type name, node_id)
+    """
+    return type(node_id).__name__, node_id
+
+
+def write_graph_json(g, file, compact: bool = False, sort: bool = False, chunk_size: int = WRITE_CHUNK):
+    """
+    Writes a graph to a text file in the graph json format, the edges in the order of their source nodes.
+    By default the text is exactly the text of json.dump of the whole document,
+    but it is written chunk_size elements at a time: the numbers of every chunk are formatted by one json call
+    and put into the element templates, so no dictionary is built for a node or an edge.
+    :param g: DiGraph, ids that are not all integers (e.g. strings) are formatted by a json call each.
+    :param file: text file object, opened for writing.
+    :param compact: if True, no white space is written (the separators of json.dump are ',' and ':').
+    :param sort: if True, the nodes are written in order of id, and the edges in order of (src, dest),
+    so equal graphs give equal files (ids that are not all integers are ordered by id_key).
+    :param chunk_size: number of nodes or edges formatted at a time.
+    """
+    item_sep, key_sep = (',', ':') if compact else (', ', ': ')
+    dumps = json.JSONEncoder(separators=(item_sep, key_sep)).encode
+    nodes = g.nodes
+    ints = all(type(i) is int for i in nodes)
+    id_format = '%d' if ints else '%s'
+    edge = '{"src"' + key_sep + id_format + item_sep + '"w"' + key_sep + '%s' + item_sep + '"dest"' + key_sep \
+           + id_format + '}'
+    node = '{"pos"' + key_sep + '"%s"' + item_sep + '"id"' + key_sep + id_format + '}'
+    key = None if ints else id_key
+    ids = sorted(nodes, key=key) if sort else list(nodes)
+
+    def write_chunks(key: str, rows, template: str):
+        # rows yields lists of tuples, each list one chunk
+        file.write('"' + key + '"' + key_sep + '[')
+        first = True
+        for chunk in rows:
+            if chunk:
+                file.write(('' if first else item_sep) + item_sep.join([template % t for t in chunk]))
+                first = False
+        file.write(']')
+
+    def edge_chunks():
+        srcs, weights, dests = [], [], []
+        for i in ids:
+            out = nodes[i].node_out
+            if not out:
+                continue
+            keys = sorted(out, key=key) if sort else out.keys()
+            srcs.extend([i] * len(out))
+            dests.extend(keys)
+            weights.extend([out[k] for k in keys] if sort else out.values())
+            if len(srcs) >= chunk_size:
+                yield edge_rows(srcs, weights, dests)
+                srcs, weights, dests = [], [], []
+        yield edge_rows(srcs, weights, dests)
+
+    def edge_rows(srcs: list, weights: list, dests: list) -> list:
+        if not srcs:
+            return []
+        # the weights are formatted as json.dump formats them (repr, NaN, Infinity), by one call per chunk
+        weights = dumps(weights)[1:-1].split(item_sep)
+        if not ints:
+            srcs, dests = map(dumps, srcs), map(dumps, dests)
+        return list(zip(srcs, weights, dests))
+
+    def node_chunks():
+        for start in range(0, len(ids), chunk_size):
+            yield [(format_pos(nodes[i].position), i if ints else dumps(i)) for i in ids[start:start + chunk_size]]
+
+    file.write('{')
+    write_chunks('Edges', edge_chunks(), edge)
+    file.write(item_sep)
+    write_chunks('Nodes', node_chunks(), node)
+    file.write('}')
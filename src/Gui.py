@@ -1,53 +1,127 @@
-from random import choice, seed
-
 import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
 
+from Layout import force_layout, random_layout
+
+HEAD_WIDTH = 0.28  # the width of an arrowhead, in frame units (see w2fx)
+HEAD_LENGTH = 1.5 * HEAD_WIDTH
 
-class Gui:
 
-    def __init__(self, g):
+class Gui:
+    """
+    Draws a graph with matplotlib.
+    All the edges are drawn as one LineCollection and all the arrowheads as one PolyCollection,
+    with their coordinates computed by NumPy at once, so drawing costs a few artists instead of a patch per edge.
+    Large graphs can be drawn with less detail: max_edges draws a random sample of the edges,
+    and the node ids are not written when there are more than label_limit nodes.
+    """
+
+    LABEL_LIMIT = 200  # the default largest number of nodes whose ids are written
+
+    def __init__(self, g, show: bool = True, max_edges: int = None, label_limit: int = LABEL_LIMIT,
+                 layout: str = 'random'):
+        """
+        :param g: the graph, nodes without position get one (see set_pos).
+        :param layout: how the nodes without position are placed, 'random' or 'force' (see set_pos).
+        :param show: if True, the graph is drawn and shown at once.
+        :param max_edges: the largest number of edges to draw (a random sample of them), None for all.
+        :param label_limit: the ids of the nodes are written only if there are at most this many nodes.
+        """
         self.graph = g
-        self.set_pos()
+        self.max_edges = max_edges
+        self.label_limit = label_limit
+        self.set_pos(layout)
         self.x_range, self.y_range = self.graph_range()
-        self.draw()
+        if show:
+            self.draw()
 
-    def draw(self):
+    def draw(self, file_name: str = None):
         """
         Draw and show the graph, nodes and edges.
+        :param file_name: if given, the figure is saved to this file (e.g. a png) and closed instead of shown.
+        """
+        fig = self.render()
+        if file_name is None:
+            plt.show()
+        else:
+            fig.savefig(file_name)
+            plt.close(fig)
+
+    def render(self):
+        """
+        Draws the graph on a new figure.
+        :return: the matplotlib Figure
         """
         fig, ax = plt.subplots()
         fig.tight_layout()
         fig.set_size_inches(10, 5)
 
-        xs = []
-        ys = []
-        labels = []
-
-        for i in self.graph.nodes.values():
-            x_src = self.w2fx(i.position[0])
-            y_src = self.w2fy(i.position[1])
-            xs.append(x_src)
-            ys.append(y_src)
-            labels.append(i.id)
-
-            for node_out in i.node_out.keys():
-                n = self.graph.nodes[node_out]
-                x_dest = self.w2fx(n.position[0])
-                y_dest = self.w2fy(n.position[1])
+        ids, xy = self.frame_positions()
+        src, dest = self.edge_indices({node_id: i for i, node_id in enumerate(ids)})
+        lines, heads = Gui.arrows(xy[src], xy[dest])
+        ax.add_collection(LineCollection(lines, colors='k', linewidths=0.8))
+        ax.add_collection(PolyCollection(heads, facecolors='k', edgecolors='k', linewidths=0.5))
 
+        ax.plot(xy[:, 0], xy[:, 1], 'ro', markersize=10)
 
+        if len(ids) <= self.label_limit:
+            for node_id, (x, y) in zip(ids, xy):
+                ax.annotate(node_id, (x - .2, y - .1), fontsize=8)
 
-                plt.arrow(x_src, y_src, -(x_src - x_dest), -(y_src - y_dest), head_width=0.28,
-                          length_includes_head=True)
+        ax.axis('equal')
+        return fig
 
-        plt.plot(xs, ys, 'ro', markersize=10)
-
-        for i, txt in enumerate(labels):
-            ax.annotate(txt, (xs[i] - .2, ys[i] - .1), fontsize=8)
-
-        plt.axis('equal')
-
-        plt.show()
+    def frame_positions(self) -> (list, np.ndarray):
+        """
+        Converts the positions of all the nodes to frame positions at once (see w2fx and w2fy).
+        :return: (ids, xy): the node ids, and an array of shape (V, 2) of their frame positions.
+        """
+        nodes = self.graph.nodes
+        xy = np.array([node.position[:2] for node in nodes.values()], dtype=float).reshape(-1, 2)
+        low = np.array([self.x_range[0], self.y_range[0]])
+        span = np.array([self.x_range[1], self.y_range[1]]) - low
+        # a graph whose nodes all share an x (or y) has nothing to stretch in that direction
+        span[span <= 0] = 1
+        return list(nodes), (xy - low) / span * (20, 10)
+
+    def edge_indices(self, index: dict) -> (np.ndarray, np.ndarray):
+        """
+        :param index: dictionary of node id -> row of the node in the frame positions.
+        :return: (src, dest) arrays of the rows of the ends of the edges to draw,
+        a random sample of max_edges of them if the graph has more.
+        """
+        nodes = self.graph.nodes
+        m = self.graph.e_size()
+        src = np.fromiter((index[node_id] for node_id, node in nodes.items() for _ in node.node_out),
+                          dtype=np.int64, count=m)
+        dest = np.fromiter((index[n] for node in nodes.values() for n in node.node_out), dtype=np.int64, count=m)
+        if self.max_edges is not None and m > self.max_edges:
+            sample = np.random.default_rng(1).choice(m, self.max_edges, replace=False)
+            src, dest = src[sample], dest[sample]
+        return src, dest
+
+    @staticmethod
+    def arrows(start: np.ndarray, end: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Computes the shafts and the heads of arrows from start to end, all at once,
+        with the head ending at end (as plt.arrow with length_includes_head=True).
+        :param start: array of shape (k, 2) of the starts.
+        :param end: array of shape (k, 2) of the ends.
+        :return: (lines, heads): array of shape (k, 2, 2) of shaft segments,
+        and array of shape (k', 3, 2) of head triangles, for the k' arrows that are not of zero length.
+        """
+        vec = end - start
+        length = np.hypot(vec[:, 0], vec[:, 1])
+        keep = length > 0
+        unit = vec[keep] / length[keep, None]
+        normal = unit[:, ::-1] * (-1, 1) * (HEAD_WIDTH / 2)
+        # a head longer than its arrow fills the whole arrow
+        base = end[keep] - unit * np.minimum(length[keep], HEAD_LENGTH)[:, None]
+        lines = np.stack([start, end], axis=1)
+        lines[keep, 1] = base
+        heads = np.stack([end[keep], base + normal, base - normal], axis=1)
+        return lines, heads
 
     def w2fx(self, position):
         """
@@ -62,7 +136,8 @@ class Gui:
         :param position: x node coordinate.
         :return: normalized x location.
         """
-        return (position - self.x_range[0]) / (self.x_range[1] - self.x_range[0]) * 20
+        span = self.x_range[1] - self.x_range[0]
+        return (position - self.x_range[0]) / (span if span > 0 else 1) * 20
 
     def w2fy(self, position):
         """
@@ -77,7 +152,8 @@ class Gui:
         :param position: y node coordinate.
         :return: normalized y location.
         """
-        return (position - self.y_range[0]) / (self.y_range[1] - self.y_range[0]) * 10
+        span = self.y_range[1] - self.y_range[0]
+        return (position - self.y_range[0]) / (span if span > 0 else 1) * 10
 
     def graph_range(self) -> tuple:
         """
@@ -99,18 +175,18 @@ class Gui:
 
         return x_range, y_range
 
-    def set_pos(self):
+    def set_pos(self, layout: str = 'random'):
         """
-        Sets random position for every node without position.
-        This method scatters the positions of the nodes on the screen in a balanced way.
+        Sets a position for every node without position, the positions are kept in the graph
+        (so saving it keeps them).
+        'random' scatters the positions of the nodes on the screen in a balanced way (see Layout.random_layout),
+        'force' places them by a force directed layout, connected nodes close to each other (see Layout.force_layout).
+        :param layout: 'random' or 'force'.
         """
-        v = self.graph.v_size()
-        seed(1)
-        curr_range = [i for i in range(2 * v)]
-        for i in self.graph.nodes.values():
-            if i.position is None:
-                x = choice(curr_range)
-                curr_range.remove(x)
-                y = choice(curr_range)
-                curr_range.remove(y)
-                i.position = (x, y)
+        if layout == 'random':
+            positions = random_layout(self.graph)
+        elif layout == 'force':
+            positions = force_layout(self.graph)
+        else:
+            raise ValueError('Unknown layout: ' + str(layout))
+        self.graph.set_positions(positions)
@@ -0,0 +1,271 @@
+class IncrementalSCC:
+    """
+    This class keeps the Strongly Connected Components (SCC) of a DiGraph up to date while the graph changes.
+    It registers itself as a listener of the graph (see DiGraph.add_listener) and updates on every change:
+    - a new node is a new component.
+    - a new edge between two components may close cycles: the components keep a topological order
+      (pos, every edge between components goes from a smaller to a larger pos), and the edge is handled by
+      the algorithm of Pearce and Kelly: if the edge agrees with the order, nothing changes, otherwise only the
+      components whose pos lies between its ends are searched, those on a cycle through the edge are merged,
+      and the others of the searched region are reordered.
+    - a removed edge inside a component may split it: the component is marked dirty and checked
+      the next time a query needs it. If the source of every removed edge still reaches its destination
+      inside the component, it is still strongly connected, otherwise it is recomputed by Tarjan's algorithm
+      over its own nodes only. A dirty component is a union of true components, with no cycle through
+      other components, so the order stays valid meanwhile.
+    Removing an edge between components, adding an edge inside a component, or changing a weight changes nothing.
+    comp_of[node_id] is the component id of a node, so the component of a node is found in O(1).
+    The positions are tuples: a component that splits into k parts gives them its pos extended by 0..k-1,
+    which keeps them between the neighbours of the old component without renumbering the others.
+    """
+
+    REACH_CHECKS = 8  # a dirty component with more removed edges is recomputed at once
+
+    def __init__(self, g):
+        """
+        Computes the components of g and starts following its changes.
+        :param g: DiGraph
+        """
+        self.graph = g
+        self.comp_of = {}  # node id -> component id
+        self.members = {}  # component id -> set of node ids
+        self.pos = {}  # component id -> position in the topological order
+        self.dirty = {}  # component that may have split -> the edges removed inside it
+        self.next_comp = 0
+        self.next_pos = 0
+        for part in reversed(self.tarjan(g.get_all_v().keys())):
+            self.add_component(part, (self.new_pos(),))
+        g.add_listener(self.apply)
+
+    def close(self):
+        """
+        Stops following the changes of the graph.
+        """
+        self.graph.remove_listener(self.apply)
+
+    def new_pos(self) -> int:
+        """
+        :return: a position after all the positions given so far.
+        """
+        self.next_pos += 1
+        return self.next_pos
+
+    def add_component(self, nodes: set, pos: tuple) -> int:
+        """
+        Adds a component of the given nodes at pos.
+        :return: the new component id
+        """
+        comp = self.next_comp
+        self.next_comp += 1
+        self.members[comp] = nodes
+        self.pos[comp] = pos
+        for node_id in nodes:
+            self.comp_of[node_id] = comp
+        return comp
+
+    def drop_component(self, comp: int) -> set:
+        """
+        Removes a component (not its nodes' entries in comp_of).
+        :return: its nodes
+        """
+        del self.pos[comp]
+        self.dirty.pop(comp, None)
+        return self.members.pop(comp)
+
+    def apply(self, event: tuple):
+        """
+        Updates the components after one change of the graph (the listener, see DiGraph.add_listener).
+        :param event: the event tuple.
+        """
+        kind = event[0]
+        if kind == 'add_edge':
+            self.edge_added(event[1], event[2])
+        elif kind == 'remove_edge':
+            comp = self.comp_of[event[1]]
+            if comp == self.comp_of[event[2]]:
+                self.dirty.setdefault(comp, []).append((event[1], event[2]))
+        elif kind == 'add_node':
+            self.add_component({event[1]}, (self.new_pos(),))
+        elif kind == 'remove_node':
+            comp = self.comp_of.pop(event[1])
+            nodes = self.members[comp]
+            nodes.discard(event[1])
+            if not nodes:
+                self.drop_component(comp)
+
+    def edge_added(self, src: int, dest: int):
+        """
+        Pearce and Kelly: with x = comp(src), y = comp(dest) and pos[y] < pos[x],
+        forward = the components reachable from y with pos <= pos[x],
+        backward = the components that reach x with pos >= pos[y].
+        The components found by both searches lie on a cycle through the new edge and are merged,
+        then the positions of both sets are given again in sorted order: the lowest to the backward only components,
+        the highest to the forward only ones, each group in its old order, and the next one up to the merged one.
+        """
+        x, y = self.comp_of[src], self.comp_of[dest]
+        pos = self.pos
+        if x == y or pos[x] < pos[y]:
+            return
+        upper, lower = pos[x], pos[y]
+        forward = self.search(y, lambda c: pos[c] <= upper, True)
+        backward = self.search(x, lambda c: pos[c] >= lower, False)
+        cycle = forward & backward
+        slots = sorted(pos[c] for c in forward | backward)
+        before = sorted(backward - cycle, key=pos.get)
+        after = sorted(forward - cycle, key=pos.get)
+        if cycle:
+            merged = set()
+            removed = []
+            for c in cycle:
+                removed += self.dirty.get(c, ())
+                merged |= self.drop_component(c)
+            comp = self.add_component(merged, slots[len(before)])
+            if removed:
+                self.dirty[comp] = removed
+        # the backward components only move down and the forward ones only move up
+        for c, p in zip(before, slots):
+            pos[c] = p
+        for c, p in zip(after, slots[len(slots) - len(after):]):
+            pos[c] = p
+
+    def search(self, start: int, inside, forward: bool) -> set:
+        """
+        DFS over the components, from start, over the out edges (in edges if not forward) of their nodes,
+        entering only components for which inside(component) is True.
+        :return: the set of components found, with start.
+        """
+        graph_nodes = self.graph.get_all_v()
+        comp_of, members = self.comp_of, self.members
+        found = {start}
+        stack = [start]
+        while stack:
+            comp = stack.pop()
+            for node_id in members[comp]:
+                node = graph_nodes[node_id]
+                for n in (node.node_out if forward else node.node_in):
+                    c = comp_of[n]
+                    if c not in found and inside(c):
+                        found.add(c)
+                        stack.append(c)
+        return found
+
+    def flush(self):
+        """
+        Checks the dirty components, a component that splits is replaced by its parts, in topological order.
+        """
+        while self.dirty:
+            comp, removed = self.dirty.popitem()
+            nodes = self.members[comp]
+            if len(removed) <= IncrementalSCC.REACH_CHECKS \
+                    and all(self.reaches(src, dest, nodes) for src, dest in removed):
+                continue
+            parts = self.tarjan(nodes)
+            if len(parts) == 1:
+                continue
+            pos = self.pos[comp]
+            self.drop_component(comp)
+            # Tarjan completes a component after all the components it reaches
+            for i, part in enumerate(reversed(parts)):
+                self.add_component(part, pos + (i,))
+
+    def reaches(self, src: int, dest: int, nodes: set) -> bool:
+        """
+        BFS from src over the subgraph of the given nodes, until dest is found.
+        :return: True if dest can be reached from src inside nodes, False o.w.
+        """
+        if src not in nodes or dest not in nodes:
+            return False
+        graph_nodes = self.graph.get_all_v()
+        seen = {src}
+        queue = [src]
+        for v in queue:
+            for n in graph_nodes[v].node_out:
+                if n == dest:
+                    return True
+                if n not in seen and n in nodes:
+                    seen.add(n)
+                    queue.append(n)
+        return False
+
+    def tarjan(self, nodes) -> list:
+        """
+        Iterative Tarjan's algorithm over the subgraph of the given nodes (see GraphAlgo.scc_map).
+        :param nodes: set (or keys view) of node ids.
+        :return: list of the components as sets, every component after all the components it reaches.
+        """
+        graph_nodes = self.graph.get_all_v()
+        index = {}
+        low = {}
+        on_stack = set()
+        stack = []
+        parts = []
+        counter = 0
+        for root in nodes:
+            if root in index:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(graph_nodes[root].node_out))]
+            while work:
+                v, it = work[-1]
+                for n in it:
+                    if n not in nodes:
+                        continue
+                    if n not in index:
+                        index[n] = low[n] = counter
+                        counter += 1
+                        stack.append(n)
+                        on_stack.add(n)
+                        work.append((n, iter(graph_nodes[n].node_out)))
+                        break
+                    if n in on_stack and index[n] < low[v]:
+                        low[v] = index[n]
+                else:
+                    work.pop()
+                    if work and low[v] < low[work[-1][0]]:
+                        low[work[-1][0]] = low[v]
+                    if low[v] == index[v]:
+                        part = set()
+                        while True:
+                            n = stack.pop()
+                            on_stack.discard(n)
+                            part.add(n)
+                            if n == v:
+                                break
+                        parts.append(part)
+        return parts
+
+    def component_id(self, node_id: int) -> int:
+        """
+        :param node_id: The node id
+        :return: the id of the component of the node, O(1) (after dirty components are recomputed)
+        """
+        self.flush()
+        return self.comp_of[node_id]
+
+    def connected_component(self, node_id: int) -> list:
+        """
+        :param node_id: The node id
+        :return: The list of nodes in the SCC of the node, None if there is no such node
+        """
+        if node_id not in self.comp_of:
+            return None
+        self.flush()
+        return list(self.members[self.comp_of[node_id]])
+
+    def connected_components(self, as_map: bool = False):
+        """
+        Returns all the components, in the same form and order as GraphAlgo.connected_components:
+        every component appears before any component that can reach it.
+        :param as_map: if True, returns a dictionary of node id -> component id instead of a list of lists,
+        where the component id is the index of the component in the list that would be returned otherwise.
+        :return: The list all SCC, or a dictionary of node id -> component id if as_map is True
+        """
+        self.flush()
+        order = sorted(self.members, key=self.pos.get, reverse=True)
+        if as_map:
+            index = {comp: i for i, comp in enumerate(order)}
+            return {node_id: index[comp] for node_id, comp in self.comp_of.items()}
+        return [list(self.members[comp]) for comp in order]
@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache:
+    """
+    This class represents a bounded Least Recently Used cache: a dictionary that keeps at most maxsize entries,
+    and when a new entry does not fit, drops the entry that was used least recently.
+    The entries are kept in an OrderedDict in order of use, so every operation is O(1).
+    All the operations hold a lock, so one cache may be shared by several threads.
+    The cache counts hits, misses, evictions (entries dropped for room) and invalidations (calls of clear).
+    """
+
+    MISSING = object()  # returned by get for a key that is not in the cache
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        :param maxsize: the largest number of entries, 0 disables the cache (nothing is stored).
+        """
+        if maxsize < 0:
+            raise ValueError('maxsize must be at least 0, got ' + str(maxsize))
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """
+        Returns the value of key and marks it as the most recently used.
+        :param key: hashable key
+        :return: the value, or LRUCache.MISSING if key is not in the cache
+        """
+        with self.lock:
+            value = self.entries.get(key, LRUCache.MISSING)
+            if value is LRUCache.MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """
+        Stores value under key as the most recently used entry,
+        dropping the least recently used entries while there are more than maxsize.
+        :param key: hashable key
+        :param value: any value
+        """
+        with self.lock:
+            if self.maxsize == 0:
+                return
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drops all the entries (the counters are kept).
+        """
+        with self.lock:
+            if self.entries:
+                self.entries.clear()
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        """
+        :return: dictionary of the counters: hits, misses, evictions, invalidations, size and maxsize.
+        """
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'invalidations': self.invalidations, 'size': len(self.entries), 'maxsize': self.maxsize}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
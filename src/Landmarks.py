@@ -0,0 +1,158 @@
+import json
+import random
+
+import numpy as np
+
+from CSRGraph import CSRGraph
+
+UNREACHABLE = 1e300  # stored in the distance tables instead of inf, so differences of two of them are 0, not nan
+
+
+class LandmarkIndex:
+    """
+    This class represents the preprocessing of ALT (A*, Landmarks and Triangle inequality).
+    For a few landmark nodes L, the distances d(L, v) from L and d(v, L) to L of every node v are stored,
+    and by the triangle inequality, for any nodes v and t:
+    d(v, t) >= d(L, t) - d(L, v) and d(v, t) >= d(v, L) - d(t, L).
+    The largest of these bounds over the landmarks is a lower bound that A* uses as heuristic (see heuristic).
+    The tables are NumPy arrays of shape (number of landmarks, |V|), the columns are in the order of ids.
+    """
+
+    def __init__(self, ids, landmarks: list, dist_from, dist_to, mc: int):
+        """
+        :param ids: the node id of every column, NumPy array of integer ids or list of any ids.
+        :param landmarks: the indices (columns) of the landmarks.
+        :param dist_from: dist_from[i, v] = d(landmarks[i], v), UNREACHABLE if there is no path.
+        :param dist_to: dist_to[i, v] = d(v, landmarks[i]), UNREACHABLE if there is no path.
+        :param mc: the mode count of the graph the index was built for.
+        """
+        self.ids = ids
+        self.landmarks = landmarks
+        self.dist_from = dist_from
+        self.dist_to = dist_to
+        self.mc = mc
+        self.index = {node_id: i for i, node_id in enumerate(ids)}
+
+    @classmethod
+    def build(cls, csr: CSRGraph, k: int = 8, seed: int = 1) -> 'LandmarkIndex':
+        """
+        Selects k landmarks by the farthest heuristic and computes their distance tables.
+        The first landmark is the node farthest from a random node, every next one is the node that is farthest
+        (by d(L, v) + d(v, L)) from its closest landmark chosen so far, so the landmarks spread to the
+        borders of the graph, where they give the tightest bounds. Nodes that can not reach or be reached from
+        the chosen landmarks are the farthest of all, so every strongly connected part gets a landmark.
+        Every landmark costs two Dijkstra runs over the CSR snapshot.
+        :param csr: the graph snapshot.
+        :param k: the number of landmarks (at most |V|).
+        :param seed: seed of the random first node.
+        :return: new LandmarkIndex
+        """
+        n = csr.v_size()
+        k = min(k, n)
+        dist_from = np.empty((k, n))
+        dist_to = np.empty((k, n))
+        landmarks = []
+        if k > 0:
+            start = random.Random(seed).randrange(n)
+            around = np.array(csr.distances(start)) + np.array(csr.distances(start, True))
+            closest = np.where(np.isinf(around), UNREACHABLE, around)
+        for i in range(k):
+            closest[landmarks] = -1
+            landmark = int(np.argmax(closest))
+            landmarks.append(landmark)
+            dist_from[i] = csr.distances(landmark)
+            dist_to[i] = csr.distances(landmark, True)
+            around = dist_from[i] + dist_to[i]
+            closest = around if i == 0 else np.minimum(closest, around)
+            closest[np.isinf(closest)] = UNREACHABLE
+        dist_from[np.isinf(dist_from)] = UNREACHABLE
+        dist_to[np.isinf(dist_to)] = UNREACHABLE
+        ids = np.frombuffer(csr.ids, dtype=np.int64).copy() if not isinstance(csr.ids, list) else list(csr.ids)
+        return cls(ids, landmarks, dist_from, dist_to, csr.get_mc())
+
+    def save(self, file_name: str):
+        """
+        Saves the index to a file (NumPy .npz format).
+        Ids that are not integers are stored as a JSON array, so they are loaded as JSON values.
+        :param file_name: The path to the out file.
+        :raise OSError: if the file can not be written.
+        :raise TypeError: if the ids are not integers and can not be written as JSON.
+        """
+        if isinstance(self.ids, np.ndarray):
+            ids = {'ids': self.ids}
+        else:
+            ids = {'ids_json': np.array(json.dumps(self.ids))}
+        with open(file_name, 'wb') as file:
+            np.savez(file, **ids, landmarks=np.array(self.landmarks, dtype=np.int64),
+                     dist_from=self.dist_from, dist_to=self.dist_to, mc=np.int64(self.mc))
+
+    @classmethod
+    def load(cls, file_name: str) -> 'LandmarkIndex':
+        """
+        Loads an index saved by save.
+        :param file_name: The path to the file.
+        :return: new LandmarkIndex
+        :raise OSError: if the file can not be read.
+        :raise ValueError: if the file is not a saved index.
+        """
+        try:
+            with np.load(file_name) as data:
+                ids = json.loads(data['ids_json'].item()) if 'ids_json' in data else data['ids']
+                return cls(ids, data['landmarks'].tolist(), data['dist_from'], data['dist_to'],
+                           int(data['mc']))
+        except KeyError as e:
+            raise ValueError('Not a landmark index: missing ' + str(e))
+
+    def matches(self, g) -> bool:
+        """
+        Checks that this index was built for the current version of g:
+        the same mode count, and the same nodes in the same order.
+        :param g: DiGraph
+        :return: True if the index can be used for g, False o.w.
+        """
+        return self.mc == g.get_mc() and len(self.ids) == g.v_size() \
+            and all(a == b for a, b in zip(self.ids.tolist() if isinstance(self.ids, np.ndarray) else self.ids,
+                                           g.get_all_v()))
+
+    def lower_bound(self, id1: int, id2: int) -> float:
+        """
+        :param id1: node id
+        :param id2: node id
+        :return: lower bound on the distance from id1 to id2 (at least 0).
+        """
+        s, t = self.index[id1], self.index[id2]
+        if len(self.landmarks) == 0:
+            return 0.0
+        return max(0.0, float(np.max(self.dist_from[:, t] - self.dist_from[:, s])),
+                   float(np.max(self.dist_to[:, s] - self.dist_to[:, t])))
+
+    def heuristic(self, id1: int, id2: int, active: int = 4):
+        """
+        Builds the A* heuristic for a query from id1 to id2.
+        Only the active landmarks that give the best bounds for (id1, id2) are used,
+        which keeps the cost of every evaluation low while the bounds stay almost as tight.
+        :param id1: the start node id
+        :param id2: the end node id
+        :param active: the number of landmarks to use.
+        :return: function of node id -> lower bound on the distance from the node to id2.
+        """
+        index = self.index
+        s, t = index[id1], index[id2]
+        bounds = np.maximum(self.dist_from[:, t] - self.dist_from[:, s], self.dist_to[:, s] - self.dist_to[:, t])
+        best = np.argsort(-bounds)[:active].tolist()
+        terms = [(float(self.dist_from[i, t]), memoryview(self.dist_from[i]), memoryview(self.dist_to[i]),
+                  float(self.dist_to[i, t])) for i in best]
+
+        def h(node_id):
+            v = index[node_id]
+            res = 0.0
+            for from_t, dist_from, dist_to, to_t in terms:
+                x = from_t - dist_from[v]
+                if x > res:
+                    res = x
+                x = dist_to[v] - to_t
+                if x > res:
+                    res = x
+            return res
+
+        return h
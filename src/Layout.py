@@ -0,0 +1,126 @@
+import math
+import random
+
+import numpy as np
+
+GRAVITY = 1.0  # of force_layout, the pull of a node toward the center per unit of distance
+CHUNK = 4096  # of repulsion, the number of nodes whose forces are computed at a time
+
+
+def random_layout(g, seed: int = 1) -> dict:
+    """
+    Random positions for the nodes without position, scattered in a balanced way:
+    the k nodes get 2k different integers of range(2V) as their x and y coordinates,
+    so no two of them share an x or a y, and no two collide. O(V).
+    :param g: DiGraph
+    :param seed: the seed of the random choices, the same seed gives the same positions.
+    :return: dictionary of node id -> (x, y), for the nodes without position only.
+    """
+    free = [node_id for node_id, node in g.get_all_v().items() if node.position is None]
+    values = random.Random(seed).sample(range(2 * g.v_size()), 2 * len(free))
+    return {node_id: (values[2 * i], values[2 * i + 1]) for i, node_id in enumerate(free)}
+
+
+def force_layout(g, iterations: int = 50, seed: int = 1) -> dict:
+    """
+    Force directed positions for the nodes without position (Fruchterman and Reingold),
+    vectorized with NumPy: every edge pulls its ends together by d^2 / k and every pair of nodes pushes
+    apart by k^2 / d, where k is the ideal edge length, and every step moves a node at most by a temperature
+    that cools down to 0.
+    The repulsion is approximated on a grid of about sqrt(V) cells: the nodes of the same cell push each other
+    exactly, and every other cell pushes as one body of its count of nodes at its centroid,
+    so a step costs O(V^1.5) instead of O(V^2).
+    The nodes that have a position stay fixed and pull their neighbours, k is then taken from the area they span,
+    otherwise the nodes are laid out in a sqrt(V) x sqrt(V) square.
+    :param g: DiGraph
+    :param iterations: the number of steps.
+    :param seed: the seed of the start positions.
+    :return: dictionary of node id -> (x, y), for the nodes without position only.
+    """
+    nodes = g.get_all_v()
+    n = len(nodes)
+    ids = list(nodes)
+    free = np.array([node.position is None for node in nodes.values()], dtype=bool)
+    if not free.any():
+        return {}
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    src = np.fromiter((index[node_id] for node_id, node in nodes.items() for _ in node.node_out), dtype=np.int64)
+    dest = np.fromiter((index[d] for node in nodes.values() for d in node.node_out), dtype=np.int64)
+
+    pos = np.zeros((n, 2))
+    if free.all():
+        low, side = np.zeros(2), np.full(2, math.sqrt(n))
+    else:
+        pos[~free] = [node.position[:2] for node in nodes.values() if node.position is not None]
+        low, side = pos[~free].min(axis=0), np.ptp(pos[~free], axis=0)
+        side[side <= 0] = max(side.max(), 1)
+    rnd = np.random.default_rng(seed)
+    pos[free] = low + rnd.random((int(free.sum()), 2)) * side
+    k = math.sqrt(side[0] * side[1] / n)
+    cells = max(1, int(round(n ** 0.25)))  # cells per side, cells^2 ~ sqrt(V)
+    temperature = side.max() / 10
+    center = low + side / 2
+
+    for step in range(iterations):
+        disp = repulsion(pos, k, cells)
+        # attraction along the edges, in both directions
+        delta = pos[src] - pos[dest]
+        length = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1e-9)
+        pull = delta * (length / k)[:, None]
+        for axis in (0, 1):
+            disp[:, axis] -= np.bincount(src, pull[:, axis], minlength=n)
+            disp[:, axis] += np.bincount(dest, pull[:, axis], minlength=n)
+        # a weak pull to the center, that keeps the parts of a disconnected graph from drifting apart
+        disp -= (pos - center) * GRAVITY
+        # move the free nodes, by at most the temperature
+        size = np.maximum(np.hypot(disp[:, 0], disp[:, 1]), 1e-9)
+        move = disp * (np.minimum(size, temperature * (1 - step / iterations)) / size)[:, None]
+        pos[free] += move[free]
+
+    return {ids[i]: (float(pos[i, 0]), float(pos[i, 1])) for i in np.flatnonzero(free)}
+
+
+def repulsion(pos: np.ndarray, k: float, cells: int, chunk: int = CHUNK) -> np.ndarray:
+    """
+    The repulsive forces of force_layout, on a grid of cells x cells over the area the nodes span.
+    The forces are computed for chunk nodes at a time, so the temporary arrays hold chunk x cells^2
+    (and chunk x the nodes of a cell) numbers, and the memory is O(V + chunk * (cells^2 + largest cell)).
+    :return: array of shape (V, 2) of the force on every node.
+    """
+    n = len(pos)
+    low = pos.min(axis=0)
+    side = np.maximum(np.ptp(pos, axis=0), 1e-9)
+    cell_xy = np.minimum(((pos - low) / side * cells).astype(np.int64), cells - 1)
+    cell = cell_xy[:, 0] * cells + cell_xy[:, 1]
+    count = np.bincount(cell, minlength=cells * cells)
+    centroid = np.stack([np.bincount(cell, pos[:, axis], minlength=cells * cells) for axis in (0, 1)], axis=1)
+    used = np.flatnonzero(count)
+    centroid = centroid[used] / count[used, None]
+
+    # far: every other cell as one body at its centroid
+    disp = np.empty((n, 2))
+    own = np.searchsorted(used, cell)
+    for start in range(0, n, chunk):
+        rows = slice(start, min(start + chunk, n))
+        dx = pos[rows, 0, None] - centroid[None, :, 0]
+        dy = pos[rows, 1, None] - centroid[None, :, 1]
+        weight = count[used] * (k * k) / np.maximum(dx * dx + dy * dy, 1e-9)
+        weight[np.arange(rows.stop - start), own[rows]] = 0
+        disp[rows, 0] = (dx * weight).sum(axis=1)
+        disp[rows, 1] = (dy * weight).sum(axis=1)
+
+    # near: every pair of nodes of the same cell
+    order = np.argsort(cell, kind='stable')
+    bounds = np.cumsum(count[used])
+    for members in np.split(order, bounds[:-1]):
+        if len(members) < 2:
+            continue
+        x, y = pos[members, 0], pos[members, 1]
+        for start in range(0, len(members), chunk):
+            part = members[start:start + chunk]
+            dx = pos[part, 0, None] - x[None, :]
+            dy = pos[part, 1, None] - y[None, :]
+            weight = (k * k) / np.maximum(dx * dx + dy * dy, 1e-9)
+            disp[part, 0] += (dx * weight).sum(axis=1)
+            disp[part, 1] += (dy * weight).sum(axis=1)
+    return disp
@@ -1,9 +1,16 @@
+import inspect
+import os
+import tempfile
 import threading
-import time
 import unittest
 import networkx as nx
 import GuiNetworkX as gnx
 from GraphAlgo import *
+from benchmarks.generator import circle_graph_file
+from benchmarks.suite import DATA_DIR
+from benchmarks.timing import measure
+
+REPEATS = 5  # timed runs of every function, after one warm-up run
 
 
 class MyTestCase(unittest.TestCase):
@@ -12,9 +19,17 @@ class MyTestCase(unittest.TestCase):
     between our implementation of directed weighted graph, to networkx module implementation.
     The tests checks:
     1. Comparing results- to check correctness.
-    2. Comparison of running times - to test efficiency.
+    2. Comparison of running times - to test efficiency, the median of REPEATS runs (see benchmarks.timing).
+    The graphs are the circle graphs G_{V}_{E}_{seed}, generated on the first run (see benchmarks.generator).
     """
 
+    @staticmethod
+    def circle(v: int, e: int) -> str:
+        """
+        :return: the path of the json file of the circle graph G_{v}_{e}_1, generated if it is not there yet.
+        """
+        return circle_graph_file(DATA_DIR, v, e)
+
     def init(self, data_file_js: str):
         """
         init networkX graph, and our DiGraph from the given json file.
@@ -32,16 +47,17 @@ class MyTestCase(unittest.TestCase):
         :param gf: our function.
         :param args: arguments.
         """
-        start_time = time.time()
+        def nx_call():
+            res = nxf(self.gx, *args)
+            # strongly_connected_components returns a generator, the work is done while it is consumed
+            return list(res) if inspect.isgenerator(res) else res
+
         nx_res = nxf(self.gx, *args)
-        end_time = time.time()
-        nx_time = end_time - start_time
+        nx_time = measure(nx_call, REPEATS, memory=False)['median']
         print('NX:', nxf.__name__ + str(args), ':\t', nx_time)
 
-        start_time = time.time()
         g_res = gf(*args)
-        end_time = time.time()
-        g_time = end_time - start_time
+        g_time = measure(lambda: gf(*args), REPEATS, memory=False)['median']
         print('Our:', gf.__name__ + str(args), ':\t', g_time)
 
         print('Faster:', 'NX' if nx_time < g_time else 'Our')
@@ -51,40 +67,38 @@ class MyTestCase(unittest.TestCase):
         """
         This test compare building of big graph, and measures running times.
         """
-        start_time = time.time()
-        graph = GraphAlgo()
-        graph.load_from_json("../data/10kG.json")
-        end_time = time.time()
-        print('Our:', "test_built_times" + "(10kG.json)", ':', end_time - start_time)
+        file = self.circle(10000, 80000)
+        our_time = measure(lambda: GraphAlgo().load_from_json(file), REPEATS, memory=False)['median']
+        print('Our:', "test_built_times" + "(G_10000_80000_1.json)", ':', our_time)
 
-        start_time = time.time()
-        self.load_nx_from_json("../data/10kG.json")
-        end_time = time.time()
-        print('NX:', "test_built_times" + "(10kG.json)", ':', end_time - start_time)
+        nx_time = measure(lambda: self.load_nx_from_json(file), REPEATS, memory=False)['median']
+        print('NX:', "test_built_times" + "(G_10000_80000_1.json)", ':', nx_time)
 
     def test_save(self):
         """
         This test compare saving of big graph to Json file, and measures running times.
         """
-        self.init("../data/10kG.json")
-        start_time = time.time()
-        dict_jx = nx.node_link_data(self.gx, dict(source='src', target='dest', name='id', key='key', link='links'))
-        with open('../data/gX_saveTestTime.json', 'w') as f:
-            json.dump(dict_jx, f)
-        end_time = time.time()
-        print('NX:', "save_test_time" + "(10kG.json)", ':', end_time - start_time)
+        self.init(self.circle(10000, 80000))
+        with tempfile.TemporaryDirectory() as tmp:
+            def nx_save():
+                dict_jx = nx.node_link_data(self.gx, dict(source='src', target='dest', name='id', key='key',
+                                                          link='links'))
+                with open(os.path.join(tmp, 'gX_saveTestTime.json'), 'w') as f:
+                    json.dump(dict_jx, f)
+
+            nx_time = measure(nx_save, REPEATS, memory=False)['median']
+            print('NX:', "save_test_time" + "(G_10000_80000_1.json)", ':', nx_time)
 
-        start_time = time.time()
-        self.ga.save_to_json("../data/g_saveTestTime.json")
-        end_time = time.time()
-        print('Our:', "save_test_time" + "(10kG.json)", ':', end_time - start_time)
+            file = os.path.join(tmp, 'g_saveTestTime.json')
+            our_time = measure(lambda: self.ga.save_to_json(file), REPEATS, memory=False)['median']
+            print('Our:', "save_test_time" + "(G_10000_80000_1.json)", ':', our_time)
 
     def test_shortest_path(self):
         """
         This test compare calculation of the shortest path between 2 nodes
         on big graph, compares the results and measures running times.
         """
-        self.init('../data/Graphs_on_circle/G_10_80_1.json')
+        self.init(self.circle(10, 80))
         nx_res, g_res = self.compare_times(nx.dijkstra_path_length, self.ga.shortest_path, (0, 9))
         self.assertEqual(g_res[0], nx_res)
         nx_res, g_res = self.compare_times(nx.dijkstra_path_length, self.ga.shortest_path, (0, 8))
@@ -98,7 +112,7 @@ class MyTestCase(unittest.TestCase):
         This test compare calculation of the connected component of node,
         compares the results and measures running times.
         """
-        self.init('../data/Graphs_on_circle/G_30000_240000_1.json')
+        self.init(self.circle(30000, 240000))
         nx_res, g_res = self.compare_times(self.get_strongly_cc, self.ga.connected_component, (1000,))
         self.assertEqual(nx_res, set(g_res))
 
@@ -117,27 +131,27 @@ class MyTestCase(unittest.TestCase):
         compares the results and measures running times.
         """
 
-        self.init('../data/Graphs_on_circle/G_10_80_1.json')
+        self.init(self.circle(10, 80))
         print("G_10_80_1.json")
         nx_res, g_res = self.compare_times(nx.strongly_connected_components, self.ga.connected_components)
 
-        self.init('../data/Graphs_on_circle/G_100_800_1.json')
+        self.init(self.circle(100, 800))
         print("G_100_800_1.json")
         nx_res, g_res = self.compare_times(nx.strongly_connected_components, self.ga.connected_components)
 
-        self.init('../data/Graphs_on_circle/G_1000_8000_1.json')
+        self.init(self.circle(1000, 8000))
         print("G_1000_8000_1.json")
         nx_res, g_res = self.compare_times(nx.strongly_connected_components, self.ga.connected_components)
 
-        self.init('../data/Graphs_on_circle/G_10000_80000_1.json')
+        self.init(self.circle(10000, 80000))
         print("G_10000_80000_1.json")
         nx_res, g_res = self.compare_times(nx.strongly_connected_components, self.ga.connected_components)
 
-        self.init('../data/Graphs_on_circle/G_20000_160000_1.json')
+        self.init(self.circle(20000, 160000))
         print("G_20000_160000_1.json")
         nx_res, g_res = self.compare_times(nx.strongly_connected_components, self.ga.connected_components)
 
-        self.init('../data/Graphs_on_circle/G_30000_240000_1.json')
+        self.init(self.circle(30000, 240000))
         print("G_30000_240000_1.json")
         nx_res, g_res = self.compare_times(nx.strongly_connected_components, self.ga.connected_components)
 
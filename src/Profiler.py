@@ -0,0 +1,149 @@
+from collections import deque
+from threading import Lock
+from time import perf_counter
+
+
+class Profiler:
+    """
+    This class represents the counters of the operations of a GraphAlgo and its DiGraph (see
+    GraphAlgo.enable_profiling): per operation, the number of calls, the total, mean and max time and
+    the percentiles of the recent times, and the sums of the counters of the searches
+    (nodes settled, edges relaxed and heap pushes, see GraphAlgo.add_stats).
+    The operations are measured by wrappers set on the instance (see wrap), and the changes of the graph
+    by a listener (see event), so an object that is not profiled runs its methods as they are, with no cost.
+    All the updates hold a lock, so one profiler may be shared by several threads.
+    """
+
+    SAMPLES = 10000  # the number of recent times of every operation kept for the percentiles
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, samples: int = SAMPLES):
+        """
+        :param samples: the number of recent times of every operation kept for the percentiles.
+        """
+        if samples < 1:
+            raise ValueError('samples must be at least 1, got ' + str(samples))
+        self.samples = samples
+        self.lock = Lock()
+        self.operations = {}  # name -> {'calls', 'total', 'max', 'times', 'counters'}
+
+    def entry(self, name: str) -> dict:
+        """
+        :return: the counters of the operation name, created empty on first use (call with the lock held).
+        """
+        op = self.operations.get(name)
+        if op is None:
+            op = self.operations[name] = {'calls': 0, 'total': 0.0, 'max': 0.0,
+                                          'times': deque(maxlen=self.samples), 'counters': {}}
+        return op
+
+    def record(self, name: str, seconds: float, counters: dict = None):
+        """
+        Adds one call of an operation.
+        :param name: the name of the operation.
+        :param seconds: the time of the call.
+        :param counters: dictionary of name -> number, added to the counters of the operation.
+        """
+        with self.lock:
+            op = self.entry(name)
+            op['calls'] += 1
+            op['total'] += seconds
+            if seconds > op['max']:
+                op['max'] = seconds
+            op['times'].append(seconds)
+            if counters:
+                sums = op['counters']
+                for key, value in counters.items():
+                    total, high = sums.get(key, (0, 0))
+                    sums[key] = (total + value, value if value > high else high)
+
+    def event(self, event: tuple):
+        """
+        Counts one change of a graph, as 'graph.' + its kind (the listener, see DiGraph.add_listener).
+        :param event: the event tuple.
+        """
+        with self.lock:
+            self.entry('graph.' + event[0])['calls'] += 1
+
+    def wrap(self, obj, name: str, counters: bool = False):
+        """
+        Sets a wrapper of the method name on obj (an instance attribute, which hides the method of the class)
+        that records the time of every call, until unwrap.
+        :param obj: the object.
+        :param name: the name of the method.
+        :param counters: if True, the wrapper passes a new dictionary as the stats argument of the method,
+        and records its counters with the call.
+        """
+        func = getattr(type(obj), name).__get__(obj)
+        record = self.record
+        if counters:
+            def call(*args, **kwargs):
+                stats = {}
+                start = perf_counter()
+                try:
+                    return func(*args, stats=stats, **kwargs)
+                finally:
+                    record(name, perf_counter() - start, stats)
+        else:
+            def call(*args, **kwargs):
+                start = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    record(name, perf_counter() - start)
+        call.__name__ = name
+        call.__doc__ = func.__doc__
+        setattr(obj, name, call)
+
+    @staticmethod
+    def unwrap(obj, name: str):
+        """
+        Removes the wrapper set by wrap, the method of the class is used again.
+        """
+        obj.__dict__.pop(name, None)
+
+    def stats(self) -> dict:
+        """
+        :return: a snapshot of the counters: dictionary of operation name -> dictionary of
+        'calls', and for the timed operations 'total', 'mean' and 'max' time in seconds and 'p50', 'p90', 'p99'
+        of the recent times (see SAMPLES), and for the searches 'counters': name -> {'total', 'mean', 'max'}
+        per call, such as the nodes settled by a query.
+        """
+        with self.lock:
+            snapshot = {}
+            for name, op in self.operations.items():
+                calls = op['calls']
+                res = {'calls': calls}
+                times = sorted(op['times'])
+                if times:
+                    res.update(total=op['total'], mean=op['total'] / calls, max=op['max'])
+                    for p in Profiler.PERCENTILES:
+                        # nearest rank
+                        res['p' + str(p)] = times[max(0, -(-len(times) * p // 100) - 1)]
+                if op['counters']:
+                    res['counters'] = {key: {'total': total, 'mean': total / calls, 'max': high}
+                                       for key, (total, high) in op['counters'].items()}
+                snapshot[name] = res
+            return snapshot
+
+    def reset(self):
+        """
+        Clears all the counters.
+        """
+        with self.lock:
+            self.operations = {}
+
+    def report(self) -> str:
+        """
+        :return: the snapshot as a text table, one operation per line, the slowest in total first.
+        """
+        lines = []
+        for name, op in sorted(self.stats().items(), key=lambda item: -item[1].get('total', 0)):
+            line = name.ljust(28) + str(op['calls']).rjust(9) + ' calls'
+            if 'total' in op:
+                line += ''.join('  ' + key + ' ' + format(op[key] * 1000, '.3f') + ' ms'
+                                for key in ('total', 'mean', 'p50', 'p90', 'p99', 'max'))
+            for key, c in op.get('counters', {}).items():
+                line += '  ' + key + '/call ' + format(c['mean'], '.1f')
+            lines.append(line)
+        return '\n'.join(lines)
@@ -0,0 +1,232 @@
+import copy
+import io
+import os
+import pickle
+import random
+import struct
+import sys
+import tempfile
+from array import array
+from unittest import TestCase
+
+from CSRGraph import FIELDS, MAGIC
+from GraphAlgo import *
+from TestDiGraph import TestDiGraph as tdg
+
+
+class TestCSRGraph(TestCase):
+    def test_to_csr(self):
+        g = tdg.simple_graph_generate()
+        csr = g.to_csr()
+        self.assertEqual(g.v_size(), csr.v_size())
+        self.assertEqual(g.e_size(), csr.e_size())
+        self.assertEqual(g.get_mc(), csr.get_mc())
+        self.assertIs(csr, g.to_csr())
+
+        g.remove_edge(3, 7)
+        csr1 = g.to_csr()
+        self.assertIsNot(csr, csr1)
+        self.assertEqual(g.e_size(), csr1.e_size())
+        self.assertEqual(g.e_size() + 1, csr.e_size())
+
+    def test_edges(self):
+        g = tdg.simple_graph_generate()
+        csr = g.to_csr()
+        for i in g.get_all_v():
+            self.assertEqual(g.all_out_edges_of_node(i), csr.all_out_edges_of_node(i))
+            self.assertEqual(g.all_in_edges_of_node(i), csr.all_in_edges_of_node(i))
+
+    def test_non_contiguous_ids(self):
+        g = DiGraph()
+        g.add_node(100, (1.5, 2.5))
+        g.add_node(-7)
+        g.add_node(42, (0.0, 1.0))
+        g.add_edge(100, -7, 2)
+        g.add_edge(-7, 42, 3)
+        g.add_edge(42, 100, 4)
+        csr = g.to_csr()
+        self.assertEqual([100, -7, 42], list(csr.ids))
+        self.assertEqual(1, csr.index[-7])
+        self.assertEqual((1.5, 2.5), csr.get_pos(100))
+        self.assertIsNone(csr.get_pos(-7))
+        self.assertEqual((5, [100, -7, 42]), csr.shortest_path(100, 42))
+        self.assertEqual({100, -7, 42}, set(csr.connected_component(-7)))
+
+    def test_string_ids(self):
+        g = tdg.string_graph_generate()
+        csr = g.to_csr()
+        self.assertEqual(list(g.get_all_v()), csr.ids)
+        self.assertEqual((3.0, ['n1', 'n2', 'n3', 'n7']), csr.shortest_path('n1', 'n7'))
+        for i in g.get_all_v():
+            self.assertEqual(g.all_out_edges_of_node(i), csr.all_out_edges_of_node(i))
+        self.assertEqual(g, DiGraph.from_csr(csr))
+        index = csr.with_index_ids()
+        self.assertEqual(array('q', range(10)), index.ids)
+        self.assertEqual((3.0, [1, 2, 3, 7]), index.shortest_path(1, 7))
+        # only integer ids are stored as array
+        self.assertIsInstance(tdg.simple_graph_generate().to_csr().ids, array)
+        g.add_node(5)
+        self.assertEqual(list(g.get_all_v()), g.to_csr().ids)
+
+    def test_bfs(self):
+        g = tdg.simple_graph_generate()
+        csr = g.to_csr()
+        self.assertEqual([0], csr.bfs(0))
+        self.assertEqual(set(range(1, 10)), set(csr.bfs(1)))
+        self.assertEqual(1, csr.bfs(1)[0])
+        self.assertEqual(set(range(1, 10)), set(csr.bfs(5, reverse=True)))
+        self.assertIsNone(csr.bfs(88))
+
+    def test_shortest_path(self):
+        for file in ['../data/A0', '../data/A3', '../data/A5']:
+            ga = GraphAlgo()
+            self.assertTrue(ga.load_from_json(file))
+            csr = ga.get_graph().to_csr()
+            random.seed(2)
+            nodes = list(ga.get_graph().get_all_v())
+            for _ in range(50):
+                id1, id2 = random.choice(nodes), random.choice(nodes)
+                dist, path = csr.shortest_path(id1, id2)
+                self.assertAlmostEqual(ga.shortest_path(id1, id2)[0], dist)
+                self.assertEqual(id1, path[0])
+                self.assertEqual(id2, path[-1])
+        csr = tdg.simple_graph_generate().to_csr()
+        self.assertEqual((3.0, [1, 2, 3, 7]), csr.shortest_path(1, 7))
+        self.assertEqual((float("inf"), None), csr.shortest_path(1, 88))
+        self.assertEqual((float("inf"), None), csr.shortest_path(1, 0))
+        self.assertEqual((0, [4]), csr.shortest_path(4, 4))
+
+    def test_connected_components(self):
+        random.seed(5)
+        for _ in range(20):
+            g = DiGraph()
+            for i in range(40):
+                g.add_node(i * 3)
+            for _ in range(random.randint(0, 120)):
+                g.add_edge(3 * random.randint(0, 39), 3 * random.randint(0, 39), 1)
+            ga = GraphAlgo(g)
+            csr = g.to_csr()
+            expected = {frozenset(c) for c in ga.connected_components()}
+            self.assertEqual(expected, {frozenset(c) for c in csr.connected_components()})
+            self.assertEqual(ga.connected_components(as_map=True), csr.connected_components(as_map=True))
+            for c in expected:
+                for n in c:
+                    self.assertEqual(c, set(csr.connected_component(n)))
+
+    def test_binary_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for file in ['../data/A0', '../data/A5', '../data/A5_edited', '../data/T0.json', '../data/1kG.json']:
+                ga = GraphAlgo()
+                self.assertTrue(ga.load_from_json(file))
+                g = ga.get_graph()
+                bin_file = os.path.join(tmp, os.path.basename(file) + '.bin')
+                self.assertTrue(ga.save_binary(bin_file))
+                self.assertEqual(g.to_csr().nbytes(), os.path.getsize(bin_file))
+
+                ga1 = GraphAlgo()
+                self.assertTrue(ga1.load_binary(bin_file))
+                g1 = ga1.get_graph()
+                self.assertEqual(g, g1)
+                self.assertEqual(g.e_size(), g1.e_size())
+                self.assertEqual(g.get_mc(), g1.get_mc())
+                for i in g.get_all_v():
+                    self.assertEqual(g.all_in_edges_of_node(i), g1.all_in_edges_of_node(i))
+                csr = g1.to_csr()
+                self.assertIs(csr, g1.to_csr())
+                for name, _ in FIELDS:
+                    self.assertEqual(bytes(getattr(g.to_csr(), name)), bytes(getattr(csr, name)), name)
+                self.assertEqual(ga.shortest_path(0, 3), ga1.shortest_path(0, 3))
+
+                g1.add_node(-1)
+                self.assertIsNot(csr, g1.to_csr())
+                self.assertEqual(g.v_size(), CSRGraph.load(bin_file).v_size())
+
+    def test_copy_binary_loaded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            bin_file = os.path.join(tmp, 'A1.bin')
+            ga = GraphAlgo()
+            self.assertTrue(ga.load_from_json('../data/A1'))
+            self.assertTrue(ga.save_binary(bin_file))
+            self.assertTrue(ga.load_binary(bin_file))
+            g = ga.get_graph()
+            # the file is not held open, so it can be written again
+            self.assertTrue(ga.save_binary(bin_file))
+            # a graph that keeps a memory mapped snapshot is copied without it
+            kept = DiGraph.from_csr(CSRGraph.load(bin_file))
+            for h in [g, kept]:
+                h.to_csr()
+                for c in [copy.deepcopy(h), pickle.loads(pickle.dumps(h))]:
+                    self.assertEqual(h, c)
+                    self.assertIsNone(c.csr)
+                    self.assertEqual(h.to_csr().nbytes(), c.to_csr().nbytes())
+                h.add_node(-1)
+                self.assertEqual(h, copy.deepcopy(h))
+                self.assertEqual(h, pickle.loads(pickle.dumps(h)))
+
+    def test_close(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            bin_file = os.path.join(tmp, 'g.bin')
+            tdg.simple_graph_generate().to_csr().save(bin_file)
+            with CSRGraph.load(bin_file) as csr:
+                self.assertIsNotNone(csr.mapping)
+                g = DiGraph.from_csr(csr, keep=False)
+            self.assertIsNone(csr.mapping)
+            self.assertRaises(ValueError, len, csr.out_targets)
+            self.assertEqual(tdg.simple_graph_generate(), g)
+            # a view that is still held keeps the mapping open
+            csr = CSRGraph.load(bin_file)
+            view = csr.ids[1:]
+            self.assertRaises(BufferError, csr.close)
+            view.release()
+            csr.close()
+            csr.close()
+            # closing a snapshot that is not a view does nothing
+            tdg.simple_graph_generate().to_csr().close()
+
+    def test_binary_string_ids(self):
+        csr = tdg.string_graph_generate().to_csr()
+        self.assertRaises(ValueError, csr.write, io.BytesIO())
+        self.assertRaises(ValueError, csr.write_into, bytearray(csr.nbytes()))
+        with tempfile.TemporaryDirectory() as tmp:
+            bin_file = os.path.join(tmp, 'g.bin')
+            self.assertFalse(GraphAlgo(tdg.string_graph_generate()).save_binary(bin_file))
+            self.assertFalse(os.path.exists(bin_file))
+
+    def test_binary_other_byte_order(self):
+        csr = tdg.simple_graph_generate().to_csr()
+        other = '>' if sys.byteorder == 'little' else '<'
+        buf = io.BytesIO()
+        buf.write(struct.pack(other + '8sqqqq', MAGIC, 1, csr.v_size(), csr.e_size(), csr.get_mc()))
+        for name, typecode in FIELDS:
+            arr = array(typecode, getattr(csr, name))
+            arr.byteswap()
+            buf.write(arr.tobytes())
+        csr1 = CSRGraph.from_buffer(buf.getvalue())
+        for name, _ in FIELDS:
+            self.assertEqual(bytes(getattr(csr, name)), bytes(getattr(csr1, name)), name)
+        self.assertEqual(csr.shortest_path(1, 7), csr1.shortest_path(1, 7))
+
+    def test_write_into(self):
+        csr = tdg.simple_graph_generate().to_csr()
+        buf = io.BytesIO()
+        csr.write(buf)
+        mem = bytearray(csr.nbytes() + 16)
+        self.assertEqual(csr.nbytes(), csr.write_into(mem))
+        self.assertEqual(buf.getvalue(), bytes(mem[:csr.nbytes()]))
+        csr1 = CSRGraph.from_buffer(mem)
+        self.assertEqual(csr.shortest_path(1, 7), csr1.shortest_path(1, 7))
+        # into a snapshot that is itself a view of a buffer
+        mem1 = bytearray(csr.nbytes())
+        csr1.write_into(mem1)
+        self.assertEqual(buf.getvalue(), bytes(mem1))
+
+    def test_binary_invalid(self):
+        with self.assertRaises(ValueError):
+            CSRGraph.from_buffer(b'DWGCSR01')
+        with self.assertRaises(ValueError):
+            CSRGraph.from_buffer(b'x' * 100)
+        buf = io.BytesIO()
+        tdg.simple_graph_generate().to_csr().write(buf)
+        with self.assertRaises(ValueError):
+            CSRGraph.from_buffer(buf.getvalue()[:-8])
+        self.assertFalse(GraphAlgo().load_binary('../data/A0'))
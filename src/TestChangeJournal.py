@@ -0,0 +1,88 @@
+import copy
+import pickle
+from random import randint, uniform, seed
+from unittest import TestCase
+
+from ChangeJournal import ChangeJournal
+from DiGraph import DiGraph
+from TestDiGraph import TestDiGraph as tdg
+
+
+class TestChangeJournal(TestCase):
+    def test_versions(self):
+        g = DiGraph()
+        journal = g.enable_journal()
+        g.add_node(0, (1.0, 2.0))
+        g.add_nodes_from([1, 2])
+        g.add_edge(0, 1, 2.5)
+        g.add_edges_from([(1, 2, 1), (2, 0, 4)])
+        g.update_edge_weight(0, 1, 1)
+        g.remove_node(0)
+        self.assertEqual([(1, ('add_node', 0, (1.0, 2.0))), (2, ('add_node', 1, None)), (3, ('add_node', 2, None)),
+                          (4, ('add_edge', 0, 1, 2.5)), (5, ('add_edge', 1, 2, 1)), (6, ('add_edge', 2, 0, 4)),
+                          (7, ('update_edge', 0, 1, 2.5, 1)),
+                          (8, ('remove_edge', 2, 0, 4)), (8, ('remove_edge', 0, 1, 1)), (8, ('remove_node', 0))],
+                         g.changes_since(0))
+        self.assertEqual(8, g.get_mc())
+        self.assertEqual(10, len(journal))
+        self.assertEqual([], g.changes_since(8))
+        self.assertEqual(3, len(g.changes_since(7)))
+        self.assertIsNone(g.changes_since(9))
+        self.assertEqual([(5, ('add_edge', 1, 2, 1)), (6, ('add_edge', 2, 0, 4))], g.changes_since(4)[:2])
+
+    def test_bounded(self):
+        g = tdg.simple_graph_generate()
+        mc = g.get_mc()
+        self.assertIsNone(g.changes_since(mc))
+        g.enable_journal(maxlen=3)
+        self.assertEqual([], g.changes_since(mc))
+        for i in range(5):
+            g.add_node(100 + i)
+        self.assertIsNone(g.changes_since(mc))
+        self.assertIsNone(g.changes_since(mc + 1))
+        self.assertEqual([(mc + 3, ('add_node', 102, None)), (mc + 4, ('add_node', 103, None)),
+                          (mc + 5, ('add_node', 104, None))], g.changes_since(mc + 2))
+        self.assertRaises(ValueError, ChangeJournal, g, 0)
+        g.disable_journal()
+        self.assertEqual([], g.listeners)
+        self.assertIsNone(g.changes_since(g.get_mc()))
+
+    def test_replica(self):
+        seed(3)
+        g = DiGraph()
+        g.add_nodes_from(range(60))
+        g.add_edges_from((randint(0, 59), randint(0, 59), uniform(0.1, 5)) for _ in range(200))
+        g.enable_journal(maxlen=1000)
+        replica = copy.deepcopy(g)
+        self.assertIsNone(replica.journal)
+        version = g.get_mc()
+        for _ in range(5):
+            for _ in range(40):
+                op = randint(0, 5)
+                if op == 0:
+                    g.add_node(randint(0, 70))
+                elif op == 1:
+                    g.remove_node(randint(0, 70))
+                elif op == 2:
+                    g.remove_edge(randint(0, 70), randint(0, 70))
+                elif op == 3:
+                    g.update_edge_weights([(randint(0, 70), randint(0, 70), uniform(0.1, 5)) for _ in range(30)])
+                else:
+                    g.add_edge(randint(0, 70), randint(0, 70), uniform(0.1, 5))
+            changes = g.changes_since(version)
+            self.assertEqual(g.get_mc(), replica.apply_changes(changes) if changes else version)
+            version = g.get_mc()
+            self.assertEqual(g, replica)
+            self.assertEqual(g.e_size(), replica.e_size())
+        self.assertIsNone(replica.apply_changes([]))
+        self.assertRaises(ValueError, replica.apply_changes, [(1, ('bad', 0))])
+
+    def test_pickle(self):
+        g = tdg.simple_graph_generate()
+        g.enable_journal()
+        g.add_node(100)
+        g1 = pickle.loads(pickle.dumps(g))
+        self.assertIsNone(g1.journal)
+        self.assertEqual([], g1.listeners)
+        self.assertIsNone(g1.changes_since(0))
+        self.assertEqual(1, len(g.changes_since(g.get_mc() - 1)))
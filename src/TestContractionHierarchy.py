@@ -0,0 +1,109 @@
+import random
+from random import randint, uniform
+from unittest import TestCase
+
+from ContractionHierarchy import ContractionHierarchy
+from GraphAlgo import *
+from TestDiGraph import TestDiGraph as tdg
+
+
+class TestContractionHierarchy(TestCase):
+    def assert_same_path(self, ga: GraphAlgo, res, id1: int, id2: int):
+        expected = ga.shortest_path(id1, id2, 'dijkstra')
+        if expected[1] is None:
+            self.assertEqual((float("inf"), None), res)
+            return
+        self.assertAlmostEqual(expected[0], res[0])
+        path = res[1]
+        self.assertEqual([id1, id2], [path[0], path[-1]])
+        g = ga.get_graph()
+        self.assertAlmostEqual(res[0], sum(g.all_out_edges_of_node(path[i - 1])[path[i]] for i in range(1, len(path))))
+
+    def test_build(self):
+        g = tdg.simple_graph_generate()
+        ch = ContractionHierarchy.build(g.to_csr())
+        self.assertEqual(list(range(g.v_size())), sorted(ch.rank))
+        self.assertEqual(g.get_mc(), ch.get_mc())
+        for v in range(g.v_size()):
+            for e in range(ch.up_offsets[v], ch.up_offsets[v + 1]):
+                self.assertLess(ch.rank[v], ch.rank[ch.up_targets[e]])
+            for e in range(ch.down_offsets[v], ch.down_offsets[v + 1]):
+                self.assertLess(ch.rank[v], ch.rank[ch.down_sources[e]])
+        self.assertEqual((3.0, [1, 2, 3, 7]), ch.shortest_path(1, 7))
+        self.assertEqual((9, [3, 7, 8, 9]), ch.shortest_path(3, 9))
+        self.assertEqual((float("inf"), None), ch.shortest_path(1, 88))
+        self.assertEqual((float("inf"), None), ch.shortest_path(1, 0))
+        self.assertEqual((0, [4]), ch.shortest_path(4, 4))
+        self.assertEqual((float("inf"), None), ContractionHierarchy.build(DiGraph().to_csr()).shortest_path(0, 1))
+
+    def test_string_ids(self):
+        ga = GraphAlgo(tdg.string_graph_generate())
+        ch = ga.build_contraction_hierarchy()
+        self.assertEqual((3.0, ['n1', 'n2', 'n3', 'n7']), ch.shortest_path('n1', 'n7'))
+        for id1 in ga.get_graph().get_all_v():
+            for id2 in ga.get_graph().get_all_v():
+                self.assert_same_path(ga, ga.shortest_path(id1, id2, 'ch'), id1, id2)
+
+    def test_data_graphs(self):
+        for file in ['../data/A0', '../data/A1', '../data/A2', '../data/A3', '../data/A4', '../data/A5',
+                     '../data/A5_edited', '../data/T0.json']:
+            ga = GraphAlgo()
+            self.assertTrue(ga.load_from_json(file))
+            ga.build_contraction_hierarchy()
+            nodes = list(ga.get_graph().get_all_v())
+            for id1 in nodes:
+                for id2 in nodes:
+                    self.assert_same_path(ga, ga.shortest_path(id1, id2, 'ch'), id1, id2)
+
+    def test_shortcuts(self):
+        # a path 0 - 1 - ... - 19 in both directions, with a long edge 0 -> 19:
+        # contracting the inner nodes needs shortcuts, and the long edge must not be used
+        g = DiGraph()
+        g.add_nodes_from(range(20))
+        for i in range(19):
+            g.add_edge(i, i + 1, 1)
+            g.add_edge(i + 1, i, 1)
+        g.add_edge(0, 19, 100)
+        ga = GraphAlgo(g)
+        ch = ga.build_contraction_hierarchy()
+        self.assertGreater(ch.shortcut_count(), 0)
+        self.assertEqual((19, list(range(20))), ga.shortest_path(0, 19, 'ch'))
+        self.assertEqual((19, list(range(19, -1, -1))), ga.shortest_path(19, 0, 'ch'))
+
+    def test_random_graphs(self):
+        random.seed(10)
+        for _ in range(30):
+            g = DiGraph()
+            v = random.randint(2, 60)
+            g.add_nodes_from(range(v))
+            g.add_edges_from((randint(0, v - 1), randint(0, v - 1), random.choice([1, 2, uniform(0.1, 5)]))
+                             for _ in range(randint(0, 4 * v)))
+            ga = GraphAlgo(g)
+            ga.build_contraction_hierarchy()
+            for _ in range(30):
+                id1, id2 = randint(0, v - 1), randint(0, v - 1)
+                self.assert_same_path(ga, ga.shortest_path(id1, id2, 'ch'), id1, id2)
+
+    def test_search_space(self):
+        ga = GraphAlgo()
+        self.assertTrue(ga.load_from_json('../data/1kG.json'))
+        ga.build_contraction_hierarchy()
+        nodes = list(ga.get_graph().get_all_v())
+        random.seed(11)
+        stats_d, stats_c = {}, {}
+        for _ in range(30):
+            id1, id2 = random.choice(nodes), random.choice(nodes)
+            ga.dijkstra(id1, (id2,), stats_d)
+            self.assert_same_path(ga, ga.ch(id1, id2, stats_c), id1, id2)
+        self.assertLess(stats_c['settled'], stats_d['settled'])
+
+    def test_invalidation(self):
+        g = tdg.simple_graph_generate()
+        ga = GraphAlgo(g)
+        ga.build_contraction_hierarchy()
+        self.assertIsNotNone(ga.contraction_hierarchy())
+        g.remove_edge(3, 7)
+        self.assertIsNone(ga.contraction_hierarchy())
+        self.assertEqual(ga.shortest_path(1, 7, 'dijkstra'), ga.shortest_path(1, 7, 'ch'))
+        ga.build_contraction_hierarchy()
+        self.assertEqual(ga.shortest_path(1, 7, 'dijkstra'), ga.shortest_path(1, 7, 'ch'))
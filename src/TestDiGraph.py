@@ -1,7 +1,11 @@
+import copy
+import pickle
 import random
 from time import time
 from unittest import TestCase
 
+import numpy as np
+
 import GraphAlgo
 from DiGraph import *
 
@@ -103,6 +107,211 @@ class TestDiGraph(TestCase):
         self.assertTrue(g.remove_edge(3, 7))
         self.assertEqual(edges_size - 1, g.e_size())
 
+    def test_add_nodes_from(self):
+        g = DiGraph()
+        mc = g.get_mc()
+        self.assertEqual(3, g.add_nodes_from([0, 1, (2, (1.5, 2.5)), 1]))
+        self.assertEqual(mc + 3, g.get_mc())
+        self.assertEqual((1.5, 2.5), g.get_all_v()[2].position)
+        self.assertEqual(bytearray([0, 1, 1]), g.add_nodes_from(range(2, 5), mask=True))
+        self.assertEqual(2, g.add_nodes_from(np.array([5, 6, 6])))
+        self.assertEqual([0, 1, 2, 3, 4, 5, 6], list(g.get_all_v().keys()))
+        self.assertIs(int, type(list(g.get_all_v().keys())[-1]))
+
+    def test_add_edges_from(self):
+        g = DiGraph()
+        g.add_nodes_from(range(10))
+        mc = g.get_mc()
+        edges = [(0, 1, 1.5), (1, 2, 2), (0, 1, 3), (3, 3, 1), (4, 88, 1), (5, 6, 0), (6, 5, -1), (2, 0, 0.5)]
+        self.assertEqual(bytearray([1, 1, 0, 0, 0, 0, 0, 1]), g.add_edges_from(edges, mask=True))
+        self.assertEqual(3, g.e_size())
+        self.assertEqual(mc + 3, g.get_mc())
+        self.assertEqual({1: 1.5}, g.all_out_edges_of_node(0))
+        self.assertEqual({0: 1.5}, g.all_in_edges_of_node(1))
+        self.assertEqual(0, g.add_edges_from(edges))
+
+        arr = np.array([[7, 8, 1.25], [8, 9, 2.5], [9, 7, 0.75], [7, 8, 1]])
+        self.assertEqual(3, g.add_edges_from(arr))
+        self.assertEqual({8: 1.25}, g.all_out_edges_of_node(7))
+        self.assertIs(int, type(list(g.all_out_edges_of_node(7).keys())[0]))
+        self.assertEqual(6, g.e_size())
+
+        g1 = DiGraph()
+        for i in range(10):
+            g1.add_node(i)
+        for e in edges + arr.tolist():
+            g1.add_edge(int(e[0]), int(e[1]), e[2])
+        self.assertEqual(g1, g)
+
+    def test_add_edges_from_array(self):
+        # the NumPy path must give the same graph, mask and dictionary order as the edges of a list, one by one
+        rnd = np.random.default_rng(4)
+        for ids in [np.arange(50), np.arange(0, 100, 2), np.arange(-20, 30) * 1000,
+                    rnd.choice(10 ** 9, 50, replace=False)]:
+            edges = np.column_stack([rnd.choice(ids, 600), rnd.choice(ids, 600), rnd.choice([-1, 0, 0.5, 2, 3], 600)])
+            edges[:30, 0] = 7  # not a node of the sparse ids
+            edges[:5, 1] = -5
+            edges[30:40, 2] = np.nan
+            for existing in [0, 100]:
+                g = DiGraph()
+                g1 = DiGraph()
+                for h in [g, g1]:
+                    h.add_nodes_from(ids)
+                    for a, b, w in edges[-existing:].tolist() if existing else []:
+                        h.add_edge(int(a), int(b), w + 1)
+                expected = g1.add_edges_from([(int(a), int(b), w) for a, b, w in edges.tolist()], mask=True)
+                mc = g.get_mc()
+                self.assertEqual(expected, g.add_edges_from(edges, mask=True))
+                self.assertEqual(mc + expected.count(1), g.get_mc())
+                self.assertEqual(g1, g)
+                self.assertEqual(g1.e_size(), g.e_size())
+                for i in g.get_all_v():
+                    self.assertEqual(list(g1.all_out_edges_of_node(i).items()),
+                                     list(g.all_out_edges_of_node(i).items()))
+                    self.assertEqual(list(g1.all_in_edges_of_node(i).items()),
+                                     list(g.all_in_edges_of_node(i).items()))
+        self.assertEqual(0, DiGraph().add_edges_from(np.array([[0, 1, 1.0]])))
+
+        # graphs with ids that are not integers are checked one by one
+        g = DiGraph()
+        g.add_nodes_from(['a', 1, 2])
+        self.assertEqual(1, g.add_edges_from(np.array([[1, 2, 1.0], [2, 1, 0]])))
+        self.assertEqual({2: 1.0}, g.all_out_edges_of_node(1))
+
+    def test_non_integral_arrays(self):
+        # floats with a fraction are node ids as they are, never truncated to integers
+        g = DiGraph()
+        self.assertEqual(2, g.add_nodes_from(np.array([1.7, 2.2])))
+        self.assertEqual([1.7, 2.2], list(g.get_all_v()))
+        self.assertEqual(2, g.add_nodes_from(np.array([1.0, 2.0])))
+        self.assertEqual([int, int], [type(i) for i in list(g.get_all_v())[2:]])
+        self.assertEqual(bytearray([1, 0, 1]),
+                         g.add_edges_from(np.array([[1.7, 2.2, 1.0], [1.5, 2.0, 1.0], [1.0, 2.0, 3.0]]), mask=True))
+        self.assertEqual({2.2: 1.0}, g.all_out_edges_of_node(1.7))
+        self.assertEqual({2: 3.0}, g.all_out_edges_of_node(1))
+        self.assertEqual(1, g.add_edges_from(np.array([[2, 1, 3.0], [1.5, 2.0, 1.0]])))
+        self.assertEqual({1: 3.0}, g.all_out_edges_of_node(2))
+        self.assertEqual(1, g.remove_edges_from(np.array([[1.7, 2.2], [1.9, 2.0]])))
+        self.assertEqual(0, DiGraph().add_nodes_from(np.array([np.nan, np.inf])[:0]))
+        self.assertTrue(DiGraph.integral(np.array([2 ** 62], dtype=np.uint64)))
+        self.assertFalse(DiGraph.integral(np.array([2 ** 63], dtype=np.uint64)))
+        self.assertFalse(DiGraph.integral(np.array([1.0, np.nan])))
+        self.assertFalse(DiGraph.integral(np.array([1e19])))
+
+    def test_remove_edges_from(self):
+        g = self.simple_graph_generate()
+        edges_size = g.e_size()
+        mc = g.get_mc()
+        self.assertEqual(bytearray([1, 0, 1, 0]), g.remove_edges_from([(3, 7), (3, 7), (1, 2, 0.5), (0, 88)], mask=True))
+        self.assertEqual(edges_size - 2, g.e_size())
+        self.assertEqual(mc + 2, g.get_mc())
+        self.assertNotIn(7, g.all_out_edges_of_node(3))
+        self.assertNotIn(3, g.all_in_edges_of_node(7))
+        self.assertEqual(1, g.remove_edges_from(np.array([[2, 8], [2, 8]])))
+        self.assertEqual(edges_size - 3, g.e_size())
+
+    def test_node_data_slots(self):
+        g = DiGraph()
+        g.add_node(0)
+        g.add_node(1)
+        n0 = g.get_all_v()[0]
+        self.assertFalse(hasattr(n0, '__dict__'))
+        self.assertIs(NO_EDGES, n0.node_out)
+        with self.assertRaises(TypeError):
+            n0.node_out[1] = 1
+        # the getters return a dictionary of the same type for nodes with and without edges
+        for edges in [g.all_in_edges_of_node(1), g.all_out_edges_of_node(1)]:
+            self.assertIsNot(NO_EDGES, edges)
+            self.assertIs(dict, type(edges))
+            self.assertEqual({}, edges)
+            edges[0] = 1
+        self.assertIs(NO_EDGES, g.get_all_v()[1].node_out)
+        self.assertEqual({}, g.all_out_edges_of_node(1))
+
+        g.add_edge(0, 1, 2.5)
+        self.assertEqual({1: 2.5}, n0.node_out)
+        self.assertIs(NO_EDGES, n0.node_in)
+        self.assertIs(NO_EDGES, g.get_all_v()[1].node_out)
+        self.assertTrue(g.remove_node(1))
+        self.assertEqual({}, n0.node_out)
+        self.assertTrue(g.add_node(1))
+        self.assertTrue(g.add_edge(1, 0, 1.5))
+        self.assertEqual(1, g.e_size())
+
+    def test_copy_and_pickle(self):
+        g = self.simple_graph_generate()
+        for g1 in [copy.deepcopy(g), pickle.loads(pickle.dumps(g))]:
+            self.assertEqual(g, g1)
+            self.assertIs(NO_EDGES, g1.get_all_v()[0].node_in)
+            self.assertTrue(g1.add_edge(1, 0, 1.0))
+            self.assertEqual({1: 1.0}, g1.all_in_edges_of_node(0))
+        self.assertIs(NO_EDGES, g.get_all_v()[0].node_in)
+
+    def test_update_edge_weight(self):
+        g = self.simple_graph_generate()
+        mc, e = g.get_mc(), g.e_size()
+        self.assertTrue(g.update_edge_weight(1, 2, 7))
+        self.assertEqual(7, g.all_out_edges_of_node(1)[2])
+        self.assertEqual(7, g.all_in_edges_of_node(2)[1])
+        self.assertEqual((mc + 1, e), (g.get_mc(), g.e_size()))
+        self.assertFalse(g.update_edge_weight(1, 2, 7))
+        self.assertFalse(g.update_edge_weight(2, 1, 3))
+        self.assertFalse(g.update_edge_weight(1, 2, -1))
+        self.assertFalse(g.update_edge_weight(88, 2, 1))
+        self.assertEqual(mc + 1, g.get_mc())
+
+        events = []
+        g.add_listener(events.append)
+        log = g.update_edge_weights([(1, 2, 8), (2, 3, 2), (2, 3, 2), (3, 2, 1), (4, 5, 0)])
+        self.assertEqual([(1, 2, 7, 8), (2, 3, 1.0, 2)], log)
+        self.assertEqual([('update_edge',) + change for change in log], events)
+        self.assertEqual(mc + 2, g.get_mc())
+        self.assertEqual([], g.update_edge_weights([]))
+        self.assertEqual([(3, 4, 1.5, 2.0)], g.update_edge_weights(np.array([[3, 4, 2]])))
+        self.assertEqual(mc + 3, g.get_mc())
+        self.assertEqual(e, g.e_size())
+
+    def test_listeners(self):
+        g = DiGraph()
+        events = []
+        g.add_listener(events.append)
+        g.add_node(0, (1.0, 2.0))
+        g.add_nodes_from([1, 2, 2])
+        g.add_edge(0, 1, 2.5)
+        g.add_edge(0, 1, 3)
+        g.add_edges_from([(1, 2, 1), (2, 0, 4), (2, 2, 1)])
+        g.remove_edges_from([(1, 2), (1, 2)])
+        g.remove_node(0)
+        g.remove_edge(0, 1)
+        self.assertEqual([('add_node', 0, (1.0, 2.0)), ('add_node', 1, None), ('add_node', 2, None),
+                          ('add_edge', 0, 1, 2.5), ('add_edge', 1, 2, 1), ('add_edge', 2, 0, 4),
+                          ('remove_edge', 1, 2, 1), ('remove_edge', 2, 0, 4), ('remove_edge', 0, 1, 2.5),
+                          ('remove_node', 0)], events)
+        g1 = pickle.loads(pickle.dumps(g))
+        self.assertEqual([], g1.listeners)
+        self.assertEqual([], copy.deepcopy(g).listeners)
+        self.assertTrue(g.remove_listener(events.append))
+        self.assertFalse(g.remove_listener(events.append))
+        g.add_node(5)
+        self.assertEqual(10, len(events))
+
+    def test_memory_usage(self):
+        g = DiGraph()
+        usage = g.memory_usage()
+        self.assertEqual(usage['nodes'] + usage['adjacency'] + usage['positions'], usage['total'])
+        self.assertEqual(0, usage['adjacency'])
+        g.add_nodes_from(range(1000))
+        usage1 = g.memory_usage()
+        self.assertGreater(usage1['nodes'], usage['nodes'])
+        self.assertEqual(0, usage1['adjacency'])
+        self.assertEqual(0, usage1['positions'])
+        g.add_edges_from((i, (i + 1) % 1000, 1.5) for i in range(1000))
+        g.add_node(1000, (1.0, 2.0))
+        usage2 = g.memory_usage()
+        self.assertGreater(usage2['adjacency'], 0)
+        self.assertGreater(usage2['positions'], 0)
+        self.assertEqual(usage2['nodes'] + usage2['adjacency'] + usage2['positions'], usage2['total'])
+
     def test_100k_nodes(self):
         start = time()
         g = DiGraph()
@@ -141,3 +350,17 @@ class TestDiGraph(TestCase):
             g.add_edge(i, 10 - i, i * 0.5)
             g.add_edge(i, i + 1, i * 0.5)
         return g
+
+    @staticmethod
+    def string_graph_generate():
+        """
+        The graph of simple_graph_generate with the ids 'n0'..'n9' instead of 0..9.
+        """
+        g = TestDiGraph.simple_graph_generate()
+        s = DiGraph()
+        for i in g.get_all_v():
+            s.add_node('n' + str(i))
+        for i in g.get_all_v():
+            for j, w in g.all_out_edges_of_node(i).items():
+                s.add_edge('n' + str(i), 'n' + str(j), w)
+        return s
@@ -0,0 +1,101 @@
+import random
+from random import randint, uniform
+from unittest import TestCase
+
+from DynamicSSSP import DynamicSSSP
+from GraphAlgo import *
+from TestDiGraph import TestDiGraph as tdg
+
+
+class TestDynamicSSSP(TestCase):
+    def assert_tree(self, g: DiGraph, sssp: DynamicSSSP):
+        dist, _ = GraphAlgo(g).shortest_path_tree(sssp.src)
+        self.assertEqual(set(dist), set(sssp.dist))
+        for n, d in dist.items():
+            self.assertAlmostEqual(d, sssp.distance(n))
+            path = sssp.path(n)
+            self.assertEqual([sssp.src, n], [path[0], path[-1]])
+            self.assertAlmostEqual(d, sum(g.all_out_edges_of_node(path[i - 1])[path[i]] for i in range(1, len(path))))
+            for c in sssp.children.get(n, ()):
+                self.assertEqual(n, sssp.prev[c])
+
+    def test_simple_graph(self):
+        g = tdg.simple_graph_generate()
+        sssp = GraphAlgo(g).track_distances(1)
+        self.assertEqual(3, sssp.distance(7))
+        self.assertEqual([1, 2, 3, 7], sssp.path(7))
+        self.assertEqual(float("inf"), sssp.distance(0))
+        self.assertIsNone(sssp.path(0))
+        g.remove_edge(3, 7)
+        self.assert_tree(g, sssp)
+        g.add_edge(1, 7, 0.5)
+        self.assertEqual([1, 7], sssp.path(7))
+        self.assert_tree(g, sssp)
+        g.add_edge(2, 0, 1)
+        self.assertEqual(1.5, sssp.distance(0))
+        g.remove_node(2)
+        self.assert_tree(g, sssp)
+        g.remove_node(1)
+        self.assertEqual({}, sssp.dist)
+        g.add_node(1)
+        self.assertEqual({1: 0}, sssp.dist)
+        sssp.close()
+        self.assertEqual([], g.listeners)
+
+    def test_seed(self):
+        ga = GraphAlgo()
+        self.assertTrue(ga.load_from_json('../data/A5'))
+        tree = ga.shortest_path_tree(0)
+        self.assertEqual(tree[0], DynamicSSSP(ga.get_graph(), 0, tree).dist)
+        self.assertEqual(tree[0], DynamicSSSP(ga.get_graph(), 0).dist)
+        self.assertEqual({}, DynamicSSSP(ga.get_graph(), 88).dist)
+
+    def test_random_changes(self):
+        random.seed(13)
+        for _ in range(20):
+            g = DiGraph()
+            v = randint(2, 50)
+            g.add_nodes_from(range(v))
+            g.add_edges_from((randint(0, v - 1), randint(0, v - 1), uniform(0.1, 5)) for _ in range(randint(0, 4 * v)))
+            sssp = GraphAlgo(g).track_distances(0)
+            for _ in range(80):
+                r = random.random()
+                n = randint(0, v - 1)
+                if r < 0.4:
+                    g.add_edge(n, randint(0, v - 1), uniform(0.1, 5))
+                elif r < 0.8:
+                    if n in g.get_all_v() and g.all_out_edges_of_node(n):
+                        m = random.choice(list(g.all_out_edges_of_node(n)))
+                        r = random.random()
+                        if r < 0.4:
+                            g.remove_edge(n, m)
+                        elif r < 0.7:
+                            w = g.all_out_edges_of_node(n)[m]
+                            g.remove_edge(n, m)
+                            g.add_edge(n, m, w * uniform(0.5, 2))
+                        else:
+                            g.update_edge_weight(n, m, g.all_out_edges_of_node(n)[m] * uniform(0.5, 2))
+                elif r < 0.85:
+                    g.remove_node(n)
+                elif r < 0.9:
+                    g.add_node(n)
+                elif r < 0.95:
+                    g.add_edges_from((randint(0, v - 1), randint(0, v - 1), uniform(0.1, 5)) for _ in range(4))
+                else:
+                    edges = [(a, b, uniform(0.1, 5)) for a in g.get_all_v() for b in g.all_out_edges_of_node(a)]
+                    g.update_edge_weights(random.sample(edges, min(5, len(edges))))
+                self.assert_tree(g, sssp)
+
+    def test_repair_is_local(self):
+        ga = GraphAlgo()
+        self.assertTrue(ga.load_from_json('../data/1kG.json'))
+        g = ga.get_graph()
+        sssp = ga.track_distances(0)
+        random.seed(14)
+        for _ in range(50):
+            n = random.choice(list(g.get_all_v()))
+            m = random.choice(list(g.all_out_edges_of_node(n)))
+            g.update_edge_weight(n, m, g.all_out_edges_of_node(n)[m] * uniform(0.5, 2))
+        self.assert_tree(g, sssp)
+        # 50 changes settle fewer nodes than 5 full recomputes
+        self.assertLess(sssp.settled, 5 * g.v_size())
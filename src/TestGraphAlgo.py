@@ -1,8 +1,11 @@
 import random
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from random import randint, uniform
 from unittest import TestCase
 
+import numpy as np
+
 from GraphAlgo import *
 from TestDiGraph import TestDiGraph as tdg
 
@@ -36,6 +39,181 @@ class TestGraphAlgo(TestCase):
         expected_lst = [3, 7, 8, 9]
         self.assertEqual((9, expected_lst), ga.shortest_path(3, 9))
 
+    def test_shortest_path_methods(self):
+        random.seed(6)
+        for _ in range(30):
+            g = DiGraph()
+            v = random.randint(2, 60)
+            g.add_nodes_from(range(v))
+            g.add_edges_from((randint(0, v - 1), randint(0, v - 1), random.choice([1, 2, uniform(0.1, 5)]))
+                             for _ in range(randint(0, 4 * v)))
+            ga = GraphAlgo(g)
+            for _ in range(20):
+                id1, id2 = randint(0, v - 1), randint(0, v - 1)
+                expected = ga.shortest_path(id1, id2, 'dijkstra')
+                stats = {}
+                res = ga.bidirectional_dijkstra(id1, id2, stats) if id1 != id2 else expected
+                self.assertAlmostEqual(expected[0], res[0])
+                self.assertEqual(res, ga.shortest_path(id1, id2, 'bidirectional'))
+                if res[1] is None:
+                    self.assertIsNone(expected[1])
+                    continue
+                self.assertEqual([id1, id2], [res[1][0], res[1][-1]])
+                self.assertAlmostEqual(res[0], sum(g.all_out_edges_of_node(res[1][i - 1])[res[1][i]]
+                                                   for i in range(1, len(res[1]))))
+        with self.assertRaises(ValueError):
+            ga.shortest_path(0, 1, 'no_such_method')
+
+        # graphs of at least BIDIRECTIONAL_MIN_NODES nodes use bidirectional search by default, smaller ones dijkstra
+        for v, method in [(GraphAlgo.BIDIRECTIONAL_MIN_NODES, 'bidirectional'),
+                          (GraphAlgo.BIDIRECTIONAL_MIN_NODES - 1, 'dijkstra')]:
+            g = DiGraph()
+            g.add_nodes_from(range(v))
+            g.add_edges_from((i, (i + 1) % v, 1) for i in range(v))
+            ga = GraphAlgo(g, cache_size=4)
+            self.assertEqual(v - 1, ga.shortest_path(1, 0)[0])
+            self.assertEqual(v - 1, ga.shortest_path(1, 0, method)[0])
+            self.assertEqual(1, ga.cache_stats()['hits'], method)
+
+    def test_astar(self):
+        for file in ['../data/A0', '../data/A3', '../data/A5', '../data/1kG.json', '../data/T0.json']:
+            ga = GraphAlgo()
+            self.assertTrue(ga.load_from_json(file))
+            nodes = list(ga.get_graph().get_all_v())
+            random.seed(7)
+            for _ in range(30):
+                id1, id2 = random.choice(nodes), random.choice(nodes)
+                expected = ga.shortest_path(id1, id2, 'dijkstra')
+                res = ga.shortest_path(id1, id2, 'astar')
+                self.assertAlmostEqual(expected[0], res[0])
+                if res[1] is not None:
+                    self.assertEqual([id1, id2], [res[1][0], res[1][-1]])
+        self.assertIsNone(ga.position_scale())
+
+    def test_astar_search_space(self):
+        # a grid with unit spacing and weights of 1 to 2 per unit of length
+        random.seed(8)
+        g = DiGraph()
+        g.add_nodes_from((x * 30 + y, (x, y)) for x in range(30) for y in range(30))
+        for x in range(30):
+            for y in range(30):
+                for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+                    if 0 <= x + dx < 30 and 0 <= y + dy < 30:
+                        g.add_edge(x * 30 + y, (x + dx) * 30 + y + dy, uniform(1, 2))
+        ga = GraphAlgo(g)
+        self.assertAlmostEqual(1, ga.position_scale(), 2)
+        stats_d, stats_a = {}, {}
+        for _ in range(20):
+            id1, id2 = randint(0, 899), randint(0, 899)
+            dist, prev = ga.dijkstra(id1, (id2,), stats_d)
+            res = ga.astar(id1, id2, stats_a)
+            self.assertAlmostEqual(dist[id2], res[0])
+        self.assertLess(stats_a['settled'], stats_d['settled'])
+
+        # an edge shorter than its length changes the scale
+        g.remove_edge(0, 1)
+        g.add_edge(0, 1, 0.5)
+        self.assertAlmostEqual(0.5, ga.position_scale())
+        self.assertEqual((0.5, [0, 1]), ga.shortest_path(0, 1, 'astar'))
+
+    def test_shortest_path_tree(self):
+        g = tdg.simple_graph_generate()
+        ga = GraphAlgo(g)
+        dist, prev = ga.shortest_path_tree(1)
+        self.assertEqual(set(range(1, 10)), set(dist.keys()))
+        self.assertIsNone(prev[1])
+        for n in dist:
+            expected = ga.shortest_path(1, n)
+            self.assertEqual(expected[0], dist[n])
+            self.assertEqual(expected[1], GraphAlgo.path_to(prev, n))
+        self.assertEqual(({}, {}), ga.shortest_path_tree(88))
+        self.assertEqual(({0: 0}, {0: None}), ga.shortest_path_tree(0))
+
+    def test_shortest_paths(self):
+        ga = GraphAlgo()
+        self.assertTrue(ga.load_from_json('../data/A5'))
+        targets = [7, 19, 2, 30, 88]
+        res = ga.shortest_paths(1, targets)
+        self.assertEqual(set(targets), set(res.keys()))
+        for t in targets[:-1]:
+            self.assertEqual(ga.shortest_path(1, t), res[t])
+        self.assertEqual((float("inf"), None), res[88])
+        self.assertEqual((0, [1]), ga.shortest_paths(1, [1])[1])
+        self.assertEqual({3: (float("inf"), None)}, ga.shortest_paths(88, [3]))
+
+    def test_distance_matrix(self):
+        ga = GraphAlgo()
+        self.assertTrue(ga.load_from_json('../data/A5'))
+        sources = [1, 7, 88, 19, 2, 30]
+        targets = [7, 19, 2, 30, 88, 1]
+        res = ga.distance_matrix(sources, targets)
+        self.assertEqual((6, 6), res.shape)
+        for i, s in enumerate(sources):
+            for j, t in enumerate(targets):
+                self.assertAlmostEqual(ga.shortest_path(s, t)[0], res[i][j])
+        self.assertTrue(np.array_equal(res, ga.distance_matrix(sources, targets, workers=2)))
+        self.assertTrue(np.array_equal(ga.distance_matrix(sources, sources),
+                                       ga.distance_matrix(sources, workers=3)))
+        self.assertEqual((0, 6), ga.distance_matrix([], targets, workers=2).shape)
+        self.assertEqual((6, 0), ga.distance_matrix(sources, [], workers=2).shape)
+        g = tdg.simple_graph_generate()
+        g.remove_edge(3, 7)
+        nodes = list(g.get_all_v())
+        res = GraphAlgo(g).distance_matrix(nodes, workers=4)
+        for i, s in enumerate(nodes):
+            self.assertEqual([GraphAlgo(g).shortest_path(s, t)[0] for t in nodes], list(res[i]))
+
+    def test_distance_matrix_string_ids(self):
+        ga = GraphAlgo(tdg.string_graph_generate())
+        nodes = list(ga.get_graph().get_all_v()) + ['n88']
+        res = ga.distance_matrix(nodes)
+        for i, s in enumerate(nodes):
+            self.assertEqual([ga.shortest_path(s, t)[0] for t in nodes], list(res[i]))
+        self.assertTrue(np.array_equal(res, ga.distance_matrix(nodes, workers=2)))
+
+    def test_all_pairs_shortest_paths(self):
+        graphs = [tdg.simple_graph_generate(), tdg.string_graph_generate(), DiGraph()]
+        for file in ['../data/A5', '../data/T0.json']:
+            ga = GraphAlgo()
+            self.assertTrue(ga.load_from_json(file))
+            graphs.append(ga.get_graph())
+        for _ in range(5):
+            g = DiGraph()
+            v = randint(1, 80)
+            g.add_nodes_from(range(v))
+            g.add_edges_from((randint(0, v - 1), randint(0, v - 1), uniform(0.1, 5)) for _ in range(randint(0, v * v // 4)))
+            graphs.append(g)
+        for g in graphs:
+            ga = GraphAlgo(g)
+            results = [ga.all_pairs_shortest_paths(method) for method in ('floyd_warshall', 'dijkstra', None)]
+            ids, dist, next_hop = results[0]
+            self.assertEqual(list(g.get_all_v()), ids)
+            self.assertEqual((len(ids), len(ids)), dist.shape)
+            for ids1, dist1, _ in results[1:]:
+                self.assertEqual(ids, ids1)
+                self.assertTrue(np.allclose(dist, dist1))
+            for i, s in enumerate(ids):
+                tree = ga.shortest_path_tree(s)[0]
+                for j, t in enumerate(ids):
+                    expected = tree.get(t, float("inf"))
+                    for _, d, hops in results:
+                        self.assertAlmostEqual(expected, d[i][j])
+                        if expected == float("inf"):
+                            self.assertEqual(-1, hops[i][j])
+                            continue
+                        # follow the next hops
+                        k, length = i, 0
+                        while k != j:
+                            length += g.all_out_edges_of_node(ids[k])[ids[hops[k][j]]]
+                            k = hops[k][j]
+                        self.assertAlmostEqual(expected, length)
+
+        ga = GraphAlgo(graphs[0])
+        with self.assertRaises(MemoryError):
+            ga.all_pairs_shortest_paths(max_bytes=100)
+        with self.assertRaises(ValueError):
+            ga.all_pairs_shortest_paths('bellman_ford')
+
     def test_connected_component(self):
         g = tdg.simple_graph_generate()
         ga = GraphAlgo(g)
@@ -80,6 +258,113 @@ class TestGraphAlgo(TestCase):
 
         self.assertTrue(flag)
 
+    def test_connected_components_map(self):
+        g = tdg.simple_graph_generate()
+        ga = GraphAlgo(g)
+        lst = ga.connected_components()
+        comp_of = ga.connected_components(as_map=True)
+        self.assertEqual(set(g.nodes.keys()), set(comp_of.keys()))
+        for comp_id, component in enumerate(lst):
+            for n in component:
+                self.assertEqual(comp_id, comp_of[n])
+        self.assertNotEqual(comp_of[0], comp_of[1])
+        self.assertEqual(comp_of[1], comp_of[9])
+
+    def test_connected_components_long_cycle(self):
+        # a cycle deeper than the recursion limit, plus a tail that is not part of it
+        v = 50000
+        g = DiGraph()
+        for i in range(v):
+            g.add_node(i)
+        for i in range(v - 1):
+            g.add_edge(i, i + 1, 1)
+        g.add_edge(v - 2, 0, 1)
+        for n in g.nodes.values():
+            n.tag = 7
+            n.remark = 3
+        lst = GraphAlgo(g).connected_components()
+        self.assertEqual(2, len(lst))
+        self.assertEqual([v - 1], lst[0])
+        self.assertEqual(set(range(v - 1)), set(lst[1]))
+        for n in g.nodes.values():
+            self.assertEqual(7, n.tag)
+            self.assertEqual(3, n.remark)
+
+    def test_connected_components_vs_connected_component(self):
+        ga = GraphAlgo()
+        self.assertTrue(ga.load_from_json('../data/A5_edited'))
+        lst = ga.connected_components()
+        self.assertEqual(ga.get_graph().v_size(), sum(len(c) for c in lst))
+        for component in lst:
+            self.assertEqual(set(component), set(ga.connected_component(component[0])))
+
+    def test_concurrent_queries(self):
+        ga = GraphAlgo()
+        self.assertTrue(ga.load_from_json('../data/1kG.json'))
+        ga1 = GraphAlgo(ga.get_graph())
+        random.seed(4)
+        nodes = list(ga.get_graph().get_all_v())
+        queries = [(random.choice(nodes), random.choice(nodes)) for _ in range(300)]
+
+        def run(q):
+            id1, id2 = q
+            algo = ga if id1 % 2 == 0 else ga1
+            return algo.shortest_path(id1, id2), set(algo.connected_component(id1))
+
+        serial = [run(q) for q in queries]
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            parallel = list(pool.map(run, queries))
+        self.assertEqual(serial, parallel)
+        for n in ga.get_graph().get_all_v().values():
+            self.assertEqual(-1, n.tag)
+
+    def test_cache(self):
+        g = tdg.simple_graph_generate()
+        ga = GraphAlgo(g, cache_size=3)
+        self.assertEqual((3.0, [1, 2, 3, 7]), ga.shortest_path(1, 7))
+        res = ga.shortest_path(1, 7)
+        self.assertEqual((3.0, [1, 2, 3, 7]), res)
+        res[1].append(0)  # the result is a copy
+        self.assertEqual((3.0, [1, 2, 3, 7]), ga.shortest_path(1, 7))
+        self.assertEqual((float("inf"), None), ga.shortest_path(1, 88))
+        self.assertEqual((float("inf"), None), ga.shortest_path(1, 88))
+        stats = ga.cache_stats()
+        self.assertEqual((3, 2, 0, 2), (stats['hits'], stats['misses'], stats['evictions'], stats['size']))
+
+        expected = GraphAlgo(g).connected_components()
+        self.assertEqual(expected, ga.connected_components())
+        self.assertEqual(expected, ga.connected_components())
+        self.assertEqual(GraphAlgo(g).connected_components(True), ga.connected_components(True))
+        self.assertEqual(set(GraphAlgo(g).connected_component(1)), set(ga.connected_component(1)))
+        stats = ga.cache_stats()
+        self.assertEqual((5, 4, 1, 3), (stats['hits'], stats['misses'], stats['evictions'], stats['size']))
+
+        # any change of the graph clears the cache
+        g.remove_edge(3, 7)
+        self.assertEqual(GraphAlgo(g).shortest_path(1, 7), ga.shortest_path(1, 7))
+        self.assertEqual(GraphAlgo(g).connected_components(), ga.connected_components())
+        self.assertEqual(1, ga.cache_stats()['invalidations'])
+        self.assertEqual(2, ga.cache_stats()['size'])
+        ga.graph = tdg.simple_graph_generate()
+        self.assertEqual((3.0, [1, 2, 3, 7]), ga.shortest_path(1, 7))
+        self.assertEqual(2, ga.cache_stats()['invalidations'])
+
+        ga.set_cache_size(0)
+        ga.shortest_path(1, 7)
+        self.assertEqual(0, ga.cache_stats()['misses'])
+
+    def test_concurrent_cached_queries(self):
+        ga = GraphAlgo(cache_size=100)
+        self.assertTrue(ga.load_from_json('../data/1kG.json'))
+        random.seed(4)
+        nodes = list(ga.get_graph().get_all_v())
+        queries = [(random.choice(nodes), random.choice(nodes)) for _ in range(50)] * 4
+        serial = [GraphAlgo(ga.get_graph()).shortest_path(id1, id2) for id1, id2 in queries]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            parallel = list(pool.map(lambda q: ga.shortest_path(*q), queries))
+        self.assertEqual(serial, parallel)
+        self.assertGreater(ga.cache_stats()['hits'], 0)
+
     @unittest.skip
     def test_plot_graph(self):
         ga = GraphAlgo()
@@ -0,0 +1,277 @@
+import gzip
+import io
+import json
+import os
+import random
+import tempfile
+from unittest import TestCase, mock
+
+from GraphAlgo import *
+from GraphJson import CHUNK_SIZE, JsonArrayReader, format_pos, iter_graph_json, parse_pos, write_graph_json
+
+
+class TestGraphJson(TestCase):
+    FILES = ['../data/A0', '../data/A5', '../data/T0.json', '../data/1kG.json']
+
+    @staticmethod
+    def dump(g: DiGraph, **kwargs) -> str:
+        # the document of the former save_to_json, built as a whole and dumped at once
+        j = {'Edges': [], 'Nodes': []}
+        for i in g.nodes.values():
+            j['Nodes'].append({'pos': format_pos(i.position), 'id': i.id})
+            for key, weight in i.node_out.items():
+                j['Edges'].append({'src': i.id, 'w': weight, 'dest': key})
+        return json.dumps(j, **kwargs)
+
+    @staticmethod
+    def random_graph(unplaced: bool = True) -> DiGraph:
+        # if unplaced, some nodes have no position
+        random.seed(5)
+        g = DiGraph()
+        for i in random.sample(range(1000), 300):
+            g.add_node(i, None if unplaced and i % 7 == 0 else (random.uniform(-1e3, 1e3), random.random()))
+        ids = list(g.nodes)
+        for _ in range(2000):
+            g.add_edge(random.choice(ids), random.choice(ids), random.choice([1, 2.5, 1e-12, 3e20, random.random()]))
+        return g
+
+    def test_items(self):
+        text = '{"Edges": [{"src": 0, "w": 1.25, "dest": 1}, {"src": 1, "w": 12345.5, "dest": 0}], ' \
+               '"Name": {"a": [1, 2]}, "Empty": [], "Nodes": [{"pos": "1.0,2.0,0.0", "id": 0}, {"id": 1}], ' \
+               '"Size": 123456}'
+        expected = [(k, i) for k, v in json.loads(text).items() if isinstance(v, list) for i in v]
+        for chunk_size in [1, 2, 3, 7, 64, 1 << 16]:
+            reader = JsonArrayReader(io.StringIO(text), chunk_size)
+            self.assertEqual(expected, list(reader.items()))
+            self.assertEqual(['Edges', 'Name', 'Empty', 'Nodes', 'Size'], reader.keys)
+        self.assertEqual(expected, list(iter_graph_json(io.StringIO(text), 5)))
+        self.assertEqual([], list(JsonArrayReader(io.StringIO(' { } ')).items()))
+
+    def test_nested_items(self):
+        # "}," inside strings and nested objects must not be taken as a cut between elements
+        text = '{"Edges": [{"a": {"b": 1}, "c": "x},y"}, {"a": {"b": [2, {"d": 3}]}, "c": 3},\n {"e": "},"}],' \
+               ' "Nodes": [{"id": 0}, 5, "},", {"id": 1}, []], "Other": [{"x": 1}, {"y": 2}]}'
+        expected = [(k, i) for k, v in json.loads(text).items() for i in v]
+        for chunk_size in [1, 3, 8, 20, 1 << 16]:
+            self.assertEqual(expected, list(JsonArrayReader(io.StringIO(text), chunk_size).items()))
+
+    def test_skip_array(self):
+        # nested arrays, escapes and ']' inside strings, the arrays of skip are not decoded
+        text = '{"Edges": [{"a": {"b": 1}, "c": "x],y"}, {"a": {"b": [2, {"d": 3}]}, "c": 3},\n {"e": "\\"],"}],' \
+               ' "Nodes": [{"id": 0}, 5, "],", {"id": 1}, []], "Other": [{"x": "]"}, {"y": 2}], "Last": [1]}'
+        data = json.loads(text)
+        for skip in [{'Edges'}, {'Nodes', 'Other'}, set(data)]:
+            expected = [(k, i) for k, v in data.items() if k not in skip for i in v]
+            for chunk_size in [1, 3, 8, 20, 1 << 16]:
+                reader = JsonArrayReader(io.StringIO(text), chunk_size)
+                self.assertEqual(expected, [(k, i) for k, batch in reader.batches(skip) for i in batch])
+                self.assertEqual(list(data), reader.keys)
+        with self.assertRaises(ValueError):
+            list(JsonArrayReader(io.StringIO('{"Edges": [{"a": "]"}, 1'), 4).batches({'Edges'}))
+
+    def test_bad_json(self):
+        for text in ['', '[1, 2]', '{"Nodes": [{"id": 0}', '{"Nodes": [{"id": 0}]', '{"Nodes" [1]}']:
+            with self.assertRaises(ValueError):
+                list(JsonArrayReader(io.StringIO(text), 4).items())
+
+    def test_files(self):
+        for file in ['../data/A0', '../data/A5', '../data/T0.json', '../data/1kG.json']:
+            with open(file, 'r') as f:
+                data = json.load(f)
+            with open(file, 'r') as f:
+                items = list(iter_graph_json(f, 1000))
+            self.assertEqual([i for i in data['Nodes']], [i for k, i in items if k == 'Nodes'])
+            self.assertEqual([i for i in data['Edges']], [i for k, i in items if k == 'Edges'])
+
+    def test_parse_pos(self):
+        self.assertEqual((35.18, 32.1), parse_pos('35.18,32.1,0.0'))
+
+    def test_load_from_json(self):
+        for file in ['../data/A0', '../data/A5', '../data/T0.json', '../data/1kG.json']:
+            with open(file, 'r') as f:
+                data = json.load(f)
+            g = DiGraph()
+            for i in data['Nodes']:
+                g.add_node(i['id'], parse_pos(i['pos']) if 'pos' in i else None)
+            for i in data['Edges']:
+                g.add_edge(i['src'], i['dest'], i['w'])
+            ga = GraphAlgo()
+            self.assertTrue(ga.load_from_json(file))
+            self.assertEqual(g, ga.get_graph())
+            self.assertEqual(g.e_size(), ga.get_graph().e_size())
+            self.assertEqual(g.get_mc(), ga.get_graph().get_mc())
+
+    def test_write_graph_json(self):
+        graphs = [DiGraph(), TestGraphJson.random_graph()]
+        for file in TestGraphJson.FILES:
+            ga = GraphAlgo()
+            self.assertTrue(ga.load_from_json(file))
+            graphs.append(ga.get_graph())
+        for g in graphs:
+            for chunk_size in [1, 3, 1 << 14]:
+                f = io.StringIO()
+                write_graph_json(g, f, chunk_size=chunk_size)
+                self.assertEqual(TestGraphJson.dump(g), f.getvalue())
+                f = io.StringIO()
+                write_graph_json(g, f, compact=True, chunk_size=chunk_size)
+                self.assertEqual(TestGraphJson.dump(g, separators=(',', ':')), f.getvalue())
+
+    def test_write_sorted(self):
+        g = TestGraphJson.random_graph()
+        f = io.StringIO()
+        write_graph_json(g, f, sort=True, chunk_size=10)
+        data = json.loads(f.getvalue())
+        self.assertEqual(sorted(g.nodes), [i['id'] for i in data['Nodes']])
+        edges = [(i['src'], i['dest']) for i in data['Edges']]
+        self.assertEqual(sorted(edges), edges)
+        self.assertEqual(g.e_size(), len(edges))
+
+        # the same graph built in another order gives the same file
+        h = DiGraph()
+        for i in sorted(g.nodes, reverse=True):
+            h.add_node(i, g.nodes[i].position)
+        for src, dest in reversed(edges):
+            h.add_edge(src, dest, g.all_out_edges_of_node(src)[dest])
+        f2 = io.StringIO()
+        write_graph_json(h, f2, sort=True)
+        self.assertEqual(f.getvalue(), f2.getvalue())
+
+    def test_write_sorted_mixed_ids(self):
+        g = DiGraph()
+        g.add_nodes_from(['b', 3, 'a', 1, 2.5])
+        g.add_edges_from([(3, 'b', 1), (3, 'a', 2), (3, 1, 3), ('a', 2.5, 4)])
+        f = io.StringIO()
+        write_graph_json(g, f, sort=True)
+        data = json.loads(f.getvalue())
+        self.assertEqual([2.5, 1, 3, 'a', 'b'], [i['id'] for i in data['Nodes']])
+        self.assertEqual([(3, 1), (3, 'a'), (3, 'b'), ('a', 2.5)], [(i['src'], i['dest']) for i in data['Edges']])
+        self.assertTrue(GraphAlgo(g).save_to_json(io.StringIO(), sort=True))
+
+    def test_save_round_trip(self):
+        # a node without a position is saved at 0,0 and loaded there
+        ga = GraphAlgo(TestGraphJson.random_graph())
+        text = io.StringIO()
+        self.assertTrue(ga.save_to_json(text))
+        self.assertEqual(TestGraphJson.dump(ga.get_graph()), text.getvalue())
+        self.assertIn('{"pos": "0.0,0.0,0.0", "id": ', text.getvalue())
+
+        g = TestGraphJson.random_graph(unplaced=False)
+        ga = GraphAlgo(g)
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, options in [('g.json', {}), ('c.json', {'compact': True}), ('s.json', {'sort': True}),
+                                  ('g.json.gz', {}), ('z.json', {'compress': True, 'compact': True})]:
+                file = os.path.join(tmp, name)
+                self.assertTrue(ga.save_to_json(file, **options))
+                with open(file, 'rb') as f:
+                    self.assertEqual(name.endswith('.gz') or 'compress' in options, f.read(2) == b'\x1f\x8b')
+                ga1 = GraphAlgo()
+                self.assertTrue(ga1.load_from_json(file), name)
+                self.assertEqual(g, ga1.get_graph())
+                self.assertEqual(g.e_size(), ga1.get_graph().e_size())
+            self.assertFalse(ga.save_to_json(os.path.join(tmp, 'no_such_dir', 'g.json')))
+
+        # file objects are written and left open
+        binary = io.BytesIO()
+        self.assertTrue(ga.save_to_json(binary, compress=True))
+        self.assertFalse(binary.closed)
+        self.assertEqual(TestGraphJson.dump(g), gzip.decompress(binary.getvalue()).decode())
+
+    def test_load_ids(self):
+        # ids that are not integers are kept in lists, also when they follow integer ids in the same batch
+        text = '{"Edges": [{"src": 0, "w": 1.5, "dest": 1}, {"src": "a", "w": 2, "dest": 0}, ' \
+               '{"src": 1, "w": 0.5, "dest": "a"}, {"src": 2, "w": 1, "dest": 2.5}], ' \
+               '"Nodes": [{"pos": "1.0,2.0,0.0", "id": 0}, {"id": 1}, {"id": "a"}, {"id": 2}, {"id": 2.5}]}'
+        g = DiGraph()
+        for i in [0, 1, 'a', 2, 2.5]:
+            g.add_node(i, (1.0, 2.0) if i == 0 else None)
+        g.add_edge(0, 1, 1.5)
+        g.add_edge('a', 0, 2)
+        g.add_edge(1, 'a', 0.5)
+        g.add_edge(2, 2.5, 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            file = os.path.join(tmp, 'ids.json')
+            with open(file, 'w') as f:
+                f.write(text)
+            ga = GraphAlgo()
+            self.assertTrue(ga.load_from_json(file))
+            self.assertEqual(g, ga.get_graph())
+            self.assertEqual(4, ga.get_graph().e_size())
+            self.assertEqual({'a': 2}, ga.get_graph().all_in_edges_of_node(0))
+
+            # and saved as json.dump writes them
+            text = io.StringIO()
+            self.assertTrue(ga.save_to_json(text))
+            self.assertEqual(TestGraphJson.dump(ga.get_graph()), text.getvalue())
+            self.assertTrue(ga.save_to_json(file, compact=True))
+            self.assertTrue(ga.load_from_json(file))
+            for i in g.get_all_v():
+                self.assertEqual(g.all_out_edges_of_node(i), ga.get_graph().all_out_edges_of_node(i))
+
+    def test_load_weights(self):
+        # integer weights are loaded as integers, so the file is saved again as it was
+        g = TestGraphJson.random_graph(unplaced=False)
+        for i in list(g.get_all_v())[:50]:
+            for j in list(g.all_out_edges_of_node(i)):
+                g.remove_edge(i, j)
+                g.add_edge(i, j, 7)
+        text = TestGraphJson.dump(g)
+        self.assertIn('"w": 7,', text)
+        with tempfile.TemporaryDirectory() as tmp:
+            file = os.path.join(tmp, 'weights.json')
+            with open(file, 'w') as f:
+                f.write(text)
+            ga = GraphAlgo()
+            self.assertTrue(ga.load_from_json(file))
+            out = io.StringIO()
+            self.assertTrue(ga.save_to_json(out))
+            self.assertEqual(text, out.getvalue())
+
+    def test_load_two_pass(self):
+        g = TestGraphJson.random_graph(unplaced=False)
+        ids = list(g.get_all_v())
+        g.add_edges_from((random.choice(ids), random.choice(ids), random.random() + 1) for _ in range(20000))
+        edges_first = TestGraphJson.dump(g)
+        nodes_first = json.dumps({'Nodes': json.loads(edges_first)['Nodes'], 'Edges': json.loads(edges_first)['Edges']})
+
+        class Stream(io.StringIO):
+            def seekable(self):
+                return False
+
+        added = []
+        add_edges_from = DiGraph.add_edges_from
+
+        def count(graph, edges):
+            edges = list(edges)
+            added.append(len(edges))
+            return add_edges_from(graph, edges)
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(GraphAlgo, 'LOAD_BATCH', 100), \
+                mock.patch.object(DiGraph, 'add_edges_from', count):
+            file = os.path.join(tmp, 'g.json')
+            for text, seekable in [(edges_first, True), (nodes_first, True), (edges_first, False)]:
+                with open(file, 'w') as f:
+                    f.write(text)
+                added.clear()
+                ga = GraphAlgo()
+                with mock.patch.object(GraphAlgo, 'open_json', staticmethod(
+                        (lambda name: open(name)) if seekable else (lambda name: Stream(text)))):
+                    self.assertTrue(ga.load_from_json(file))
+                self.assertEqual(g, ga.get_graph())
+                self.assertEqual(g.e_size(), sum(added))
+                if seekable:
+                    # the edges are added in batches of LOAD_BATCH and at most one chunk of the file, in either order
+                    self.assertLess(max(added), 100 + CHUNK_SIZE // 30)
+                else:
+                    # all the edges are kept until the end of a stream that can not be read again
+                    self.assertEqual([g.e_size()], added)
+
+    def test_load_invalid(self):
+        ga = GraphAlgo()
+        self.assertFalse(ga.load_from_json('../data/no_such_file.json'))
+        self.assertFalse(ga.load_from_json('../Ex3.pdf'))
+        with tempfile.TemporaryDirectory() as tmp:
+            file = os.path.join(tmp, 'no_nodes.json')
+            with open(file, 'w') as f:
+                f.write('{"Edges": [{"src": 0, "w": 1.5, "dest": 1}]}')
+            self.assertFalse(ga.load_from_json(file))
+        self.assertIsNone(ga.get_graph())
@@ -0,0 +1,63 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+
+from GraphAlgo import *
+from Gui import HEAD_LENGTH
+from TestDiGraph import TestDiGraph as tdg
+
+
+class TestGui(TestCase):
+    def test_arrows(self):
+        start = np.array([[0.0, 0.0], [1.0, 1.0], [2.0, 2.0]])
+        end = np.array([[3.0, 4.0], [1.0, 1.0], [2.1, 2.0]])
+        lines, heads = Gui.arrows(start, end)
+        self.assertEqual((3, 2, 2), lines.shape)
+        self.assertEqual((2, 3, 2), heads.shape)
+        # the shaft ends where the head starts, the head ends at the destination
+        self.assertTrue(np.allclose([3 - 0.6 * HEAD_LENGTH, 4 - 0.8 * HEAD_LENGTH], lines[0, 1]))
+        self.assertTrue(np.allclose([3, 4], heads[0, 0]))
+        self.assertTrue(np.allclose(lines[0, 1], heads[0, 1:].mean(axis=0)))
+        # a head longer than the arrow starts at its start
+        self.assertTrue(np.allclose([2, 2], lines[2, 1]))
+
+    def test_render(self):
+        g = tdg.simple_graph_generate()
+        fig = Gui(g, show=False).render()
+        ax = fig.axes[0]
+        lines = [c for c in ax.collections if isinstance(c, LineCollection)]
+        heads = [c for c in ax.collections if isinstance(c, PolyCollection)]
+        self.assertEqual(1, len(lines))
+        self.assertEqual(1, len(heads))
+        self.assertEqual(g.e_size(), len(lines[0].get_segments()))
+        self.assertEqual(g.v_size(), len(ax.texts))
+        plt.close(fig)
+
+        fig = Gui(g, show=False, max_edges=5, label_limit=5).render()
+        ax = fig.axes[0]
+        self.assertEqual(5, len(ax.collections[0].get_segments()))
+        self.assertEqual(0, len(ax.texts))
+        plt.close(fig)
+
+    def test_draw_to_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for file in ['../data/A5', '../data/1kG.json', '../data/T0.json']:
+                ga = GraphAlgo()
+                self.assertTrue(ga.load_from_json(file))
+                png = os.path.join(tmp, os.path.basename(file) + '.png')
+                Gui(ga.get_graph(), show=False, label_limit=50).draw(png)
+                with open(png, 'rb') as f:
+                    self.assertEqual(b'\x89PNG', f.read(4))
+            g = DiGraph()
+            g.add_node(0, (1.0, 1.0))
+            png = os.path.join(tmp, 'one.png')
+            Gui(g, show=False).draw(png)
+            self.assertTrue(os.path.exists(png))
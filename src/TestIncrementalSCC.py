@@ -0,0 +1,106 @@
+import random
+from random import randint, uniform
+from unittest import TestCase
+
+from GraphAlgo import *
+from IncrementalSCC import IncrementalSCC
+from TestDiGraph import TestDiGraph as tdg
+
+
+class TestIncrementalSCC(TestCase):
+    def assert_components(self, g: DiGraph, tracker: IncrementalSCC):
+        expected = {frozenset(c) for c in GraphAlgo(g).connected_components()}
+        components = tracker.connected_components()
+        self.assertEqual(expected, {frozenset(c) for c in components})
+        self.assertEqual(len(expected), len(components))
+        comp_map = tracker.connected_components(as_map=True)
+        for i, c in enumerate(components):
+            for n in c:
+                self.assertEqual(i, comp_map[n])
+                self.assertEqual(set(c), set(tracker.connected_component(n)))
+        # every component appears before any component that can reach it
+        for n in g.get_all_v():
+            for m in g.all_out_edges_of_node(n):
+                self.assertGreaterEqual(comp_map[n], comp_map[m])
+
+    def test_simple_graph(self):
+        g = tdg.simple_graph_generate()
+        tracker = IncrementalSCC(g)
+        self.assert_components(g, tracker)
+        self.assertIsNone(tracker.connected_component(88))
+        g.remove_edge(3, 7)
+        self.assert_components(g, tracker)
+        g.add_edge(3, 7, 1)
+        self.assert_components(g, tracker)
+        g.add_edge(1, 0, 1)
+        g.add_edge(0, 1, 1)
+        self.assertEqual(tracker.component_id(0), tracker.component_id(1))
+        self.assert_components(g, tracker)
+        g.remove_node(1)
+        self.assert_components(g, tracker)
+        tracker.close()
+        g.add_edge(2, 0, 1)
+        self.assertEqual([], g.listeners)
+
+    def test_long_cycle(self):
+        g = DiGraph()
+        g.add_nodes_from(range(200))
+        tracker = IncrementalSCC(g)
+        for i in range(199):
+            g.add_edge(i + 1, i, 1)
+        self.assertEqual(200, len(tracker.connected_components()))
+        g.add_edge(0, 199, 1)
+        self.assertEqual(1, len(tracker.connected_components()))
+        g.remove_edge(100, 99)
+        self.assert_components(g, tracker)
+        self.assertEqual(200, len(tracker.connected_components()))
+
+    def test_random_changes(self):
+        random.seed(12)
+        for _ in range(20):
+            g = DiGraph()
+            v = randint(2, 40)
+            g.add_nodes_from(range(v))
+            g.add_edges_from((randint(0, v - 1), randint(0, v - 1), 1) for _ in range(randint(0, 2 * v)))
+            tracker = IncrementalSCC(g)
+            self.assert_components(g, tracker)
+            for _ in range(60):
+                r = random.random()
+                if r < 0.45:
+                    g.add_edge(randint(0, v), randint(0, v), uniform(1, 2))
+                elif r < 0.75:
+                    nodes = list(g.get_all_v())
+                    if nodes:
+                        n = random.choice(nodes)
+                        if g.all_out_edges_of_node(n):
+                            g.remove_edge(n, random.choice(list(g.all_out_edges_of_node(n))))
+                elif r < 0.8:
+                    g.remove_node(randint(0, v))
+                elif r < 0.85:
+                    g.add_node(randint(0, v))
+                elif r < 0.92:
+                    g.add_edges_from((randint(0, v), randint(0, v), 1) for _ in range(5))
+                else:
+                    g.remove_edges_from((randint(0, v), randint(0, v)) for _ in range(15))
+                if random.random() < 0.5:
+                    self.assert_components(g, tracker)
+            self.assert_components(g, tracker)
+
+    def test_graph_algo(self):
+        ga = GraphAlgo()
+        self.assertTrue(ga.load_from_json('../data/A5'))
+        g = ga.get_graph()
+        expected = {frozenset(c) for c in ga.connected_components()}
+        tracker = ga.track_components()
+        self.assertIs(tracker, ga.track_components())
+        self.assertEqual(expected, {frozenset(c) for c in ga.connected_components()})
+        g.remove_edge(0, 1)
+        g.remove_edge(1, 0)
+        self.assertEqual({frozenset(c) for c in GraphAlgo(g).connected_components()},
+                         {frozenset(c) for c in ga.connected_components()})
+        self.assertEqual(set(GraphAlgo(g).connected_component(0)), set(ga.connected_component(0)))
+
+        # loading another graph drops the tracker of the old one
+        self.assertTrue(ga.load_from_json('../data/A0'))
+        self.assertIsNone(ga.components_tracker())
+        self.assertEqual([], g.listeners)
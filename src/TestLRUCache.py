@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from LRUCache import LRUCache
+
+
+class TestLRUCache(TestCase):
+    def test_get_and_put(self):
+        cache = LRUCache(2)
+        self.assertIs(LRUCache.MISSING, cache.get('a'))
+        cache.put('a', 1)
+        cache.put('b', None)
+        self.assertEqual(1, cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        cache.put('a', 3)
+        self.assertEqual(3, cache.get('a'))
+        self.assertEqual(2, len(cache))
+        self.assertEqual({'hits': 3, 'misses': 1, 'evictions': 0, 'invalidations': 0, 'size': 2, 'maxsize': 2},
+                         cache.stats())
+
+    def test_eviction(self):
+        cache = LRUCache(3)
+        for i in range(3):
+            cache.put(i, i)
+        cache.get(0)  # 1 is now the least recently used
+        cache.put(3, 3)
+        self.assertNotIn(1, cache)
+        self.assertEqual([0, 2, 3], sorted(cache.entries))
+        cache.put(4, 4)
+        self.assertNotIn(2, cache)
+        self.assertEqual(2, cache.stats()['evictions'])
+
+    def test_clear_and_disabled(self):
+        cache = LRUCache(3)
+        cache.clear()
+        self.assertEqual(0, cache.stats()['invalidations'])
+        cache.put(1, 1)
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual(1, cache.stats()['invalidations'])
+
+        cache = LRUCache(0)
+        cache.put(1, 1)
+        self.assertIs(LRUCache.MISSING, cache.get(1))
+        with self.assertRaises(ValueError):
+            LRUCache(-1)
+
+    def test_threads(self):
+        cache = LRUCache(50)
+
+        def work(t):
+            for i in range(2000):
+                key = (t * 7 + i) % 100
+                if cache.get(key) is LRUCache.MISSING:
+                    cache.put(key, key)
+
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(work, range(4)))
+        stats = cache.stats()
+        self.assertEqual(8000, stats['hits'] + stats['misses'])
+        self.assertEqual(50, stats['size'])
+        self.assertLessEqual(stats['evictions'], stats['misses'] - 50)
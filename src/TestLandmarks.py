@@ -0,0 +1,144 @@
+import os
+import random
+import tempfile
+from random import randint, uniform
+from unittest import TestCase
+
+import numpy as np
+
+from GraphAlgo import *
+from Landmarks import LandmarkIndex, UNREACHABLE
+from TestDiGraph import TestDiGraph as tdg
+
+
+class TestLandmarks(TestCase):
+    def test_build(self):
+        g = tdg.simple_graph_generate()
+        csr = g.to_csr()
+        index = LandmarkIndex.build(csr, 3)
+        self.assertEqual(3, len(set(index.landmarks)))
+        self.assertEqual((3, g.v_size()), index.dist_from.shape)
+        self.assertEqual(g.get_mc(), index.mc)
+        # node 0 is isolated, it can not be reached from any other node, so it is a landmark
+        self.assertIn(csr.index[0], index.landmarks)
+        ga = GraphAlgo(g)
+        for i, landmark in enumerate(index.landmarks):
+            dist, _ = ga.shortest_path_tree(csr.ids[landmark])
+            for n in g.get_all_v():
+                self.assertAlmostEqual(dist.get(n, UNREACHABLE), index.dist_from[i, csr.index[n]])
+        self.assertEqual(g.v_size(), len(LandmarkIndex.build(csr, 100).landmarks))
+        self.assertEqual([], LandmarkIndex.build(DiGraph().to_csr()).landmarks)
+
+    def test_lower_bound(self):
+        ga = GraphAlgo()
+        self.assertTrue(ga.load_from_json('../data/A5'))
+        index = ga.build_landmarks(4)
+        nodes = list(ga.get_graph().get_all_v())
+        for id1 in nodes:
+            dist, _ = ga.shortest_path_tree(id1)
+            h = index.heuristic(id1, nodes[-1])
+            for id2 in nodes:
+                self.assertLessEqual(index.lower_bound(id1, id2), dist[id2] + 1e-9)
+            for n in nodes:
+                self.assertLessEqual(h(n), ga.shortest_path(n, nodes[-1])[0] + 1e-9)
+
+    def test_alt(self):
+        for file in ['../data/A0', '../data/A3', '../data/A5', '../data/1kG.json', '../data/T0.json']:
+            ga = GraphAlgo()
+            self.assertTrue(ga.load_from_json(file))
+            ga.build_landmarks()
+            nodes = list(ga.get_graph().get_all_v())
+            random.seed(7)
+            for _ in range(30):
+                id1, id2 = random.choice(nodes), random.choice(nodes)
+                expected = ga.shortest_path(id1, id2, 'dijkstra')
+                res = ga.shortest_path(id1, id2, 'alt')
+                self.assertAlmostEqual(expected[0], res[0])
+                if res[1] is not None:
+                    self.assertEqual([id1, id2], [res[1][0], res[1][-1]])
+
+    def test_alt_random_graphs(self):
+        random.seed(9)
+        for _ in range(30):
+            g = DiGraph()
+            v = random.randint(2, 60)
+            g.add_nodes_from(range(v))
+            g.add_edges_from((randint(0, v - 1), randint(0, v - 1), uniform(0.1, 5))
+                             for _ in range(randint(0, 4 * v)))
+            ga = GraphAlgo(g)
+            ga.build_landmarks(randint(1, 5))
+            for _ in range(20):
+                id1, id2 = randint(0, v - 1), randint(0, v - 1)
+                expected = ga.shortest_path(id1, id2, 'dijkstra')
+                res = ga.shortest_path(id1, id2, 'alt')
+                self.assertAlmostEqual(expected[0], res[0])
+                self.assertEqual(expected[1] is None, res[1] is None)
+
+    def test_alt_search_space(self):
+        random.seed(8)
+        g = DiGraph()
+        g.add_nodes_from(x * 30 + y for x in range(30) for y in range(30))
+        for x in range(30):
+            for y in range(30):
+                for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+                    if 0 <= x + dx < 30 and 0 <= y + dy < 30:
+                        g.add_edge(x * 30 + y, (x + dx) * 30 + y + dy, uniform(1, 2))
+        ga = GraphAlgo(g)
+        ga.build_landmarks(8)
+        stats_d, stats_a = {}, {}
+        for _ in range(20):
+            id1, id2 = randint(0, 899), randint(0, 899)
+            dist, prev = ga.dijkstra(id1, (id2,), stats_d)
+            res = ga.alt(id1, id2, stats_a)
+            self.assertAlmostEqual(dist[id2], res[0])
+        self.assertLess(stats_a['settled'], stats_d['settled'] / 2)
+
+    def test_invalidation(self):
+        g = tdg.simple_graph_generate()
+        ga = GraphAlgo(g)
+        ga.build_landmarks(2)
+        self.assertIsNotNone(ga.landmark_index())
+        g.remove_edge(3, 7)
+        self.assertIsNone(ga.landmark_index())
+        self.assertEqual(ga.shortest_path(1, 7, 'dijkstra'), ga.shortest_path(1, 7, 'alt'))
+        ga.build_landmarks(2)
+        self.assertEqual(ga.shortest_path(1, 7, 'dijkstra'), ga.shortest_path(1, 7, 'alt'))
+        ga.graph = tdg.simple_graph_generate()
+        self.assertIsNone(ga.landmark_index())
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file = os.path.join(tmp, 'A5.landmarks')
+            ga = GraphAlgo()
+            self.assertTrue(ga.load_from_json('../data/A5'))
+            self.assertFalse(ga.save_landmarks(file))
+            index = ga.build_landmarks(4)
+            self.assertTrue(ga.save_landmarks(file))
+            self.assertTrue(os.path.exists(file))
+
+            ga1 = GraphAlgo()
+            self.assertTrue(ga1.load_from_json('../data/A5'))
+            self.assertTrue(ga1.load_landmarks(file))
+            index1 = ga1.landmark_index()
+            self.assertEqual(index.landmarks, index1.landmarks)
+            self.assertTrue(np.array_equal(index.dist_from, index1.dist_from))
+            self.assertTrue(np.array_equal(index.dist_to, index1.dist_to))
+            self.assertEqual(ga.shortest_path(0, 30, 'alt'), ga1.shortest_path(0, 30, 'alt'))
+
+            # ids that are not integers are saved as JSON
+            ga2 = GraphAlgo(tdg.string_graph_generate())
+            index2 = ga2.build_landmarks(3)
+            self.assertEqual(list(ga2.get_graph().get_all_v()), index2.ids)
+            self.assertEqual(ga2.shortest_path('n1', 'n7', 'dijkstra'), ga2.shortest_path('n1', 'n7', 'alt'))
+            self.assertTrue(ga2.save_landmarks(file + '2'))
+            ga2.landmarks = None
+            self.assertTrue(ga2.load_landmarks(file + '2'))
+            self.assertEqual(index2.ids, ga2.landmark_index().ids)
+
+            # an index of another version of the graph is rejected
+            ga1.get_graph().remove_edge(0, 1)
+            self.assertFalse(ga1.load_landmarks(file))
+            ga2 = GraphAlgo()
+            self.assertTrue(ga2.load_from_json('../data/A0'))
+            self.assertFalse(ga2.load_landmarks(file))
+            self.assertFalse(ga2.load_landmarks('../data/A0'))
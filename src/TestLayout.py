@@ -0,0 +1,91 @@
+import copy
+import os
+import tempfile
+from unittest import TestCase
+
+from GraphAlgo import *
+from Layout import force_layout, random_layout, repulsion
+
+
+class TestLayout(TestCase):
+    @staticmethod
+    def ring(v: int, positioned: int = 0) -> DiGraph:
+        g = DiGraph()
+        for i in range(v):
+            g.add_node(i, (float(i), float(i % 3)) if i < positioned else None)
+        g.add_edges_from((i, (i + 1) % v, 1) for i in range(v))
+        return g
+
+    def test_random_layout(self):
+        g = TestLayout.ring(1000, positioned=10)
+        positions = random_layout(g)
+        self.assertEqual(set(range(10, 1000)), set(positions))
+        xs = [x for x, _ in positions.values()]
+        ys = [y for _, y in positions.values()]
+        self.assertEqual(990 * 2, len(set(xs) | set(ys)))
+        self.assertTrue(all(0 <= c < 2000 for c in xs + ys))
+        self.assertEqual(positions, random_layout(g))
+        self.assertNotEqual(positions, random_layout(g, seed=2))
+        self.assertEqual({}, random_layout(DiGraph()))
+
+    def test_force_layout(self):
+        g = TestLayout.ring(200)
+        positions = force_layout(g, seed=3)
+        self.assertEqual(set(range(200)), set(positions))
+        self.assertEqual(positions, force_layout(g, seed=3))
+        self.assertEqual(200, len(set(positions.values())))
+
+        def length(a, b):
+            return ((positions[a][0] - positions[b][0]) ** 2 + (positions[a][1] - positions[b][1]) ** 2) ** 0.5
+
+        # neighbours on the ring end up closer than nodes far apart on it
+        near = sum(length(i, (i + 1) % 200) for i in range(200)) / 200
+        far = sum(length(i, (i + 100) % 200) for i in range(200)) / 200
+        self.assertLess(2 * near, far)
+
+        g = TestLayout.ring(50, positioned=25)
+        positions = force_layout(g, iterations=20)
+        self.assertEqual(set(range(25, 50)), set(positions))
+        self.assertEqual((0.0, 0.0), g.get_all_v()[0].position)
+        self.assertEqual({}, force_layout(TestLayout.ring(10, positioned=10)))
+
+    def test_repulsion_chunks(self):
+        rnd = np.random.default_rng(2)
+        pos = np.concatenate([rnd.random((300, 2)) * 20, rnd.random((200, 2))])  # a crowded cell
+        expected = repulsion(pos, 1.5, 4, chunk=len(pos))
+        for chunk in [1, 7, 64]:
+            self.assertTrue(np.allclose(expected, repulsion(pos, 1.5, 4, chunk)), chunk)
+
+    def test_set_positions(self):
+        g = TestLayout.ring(5, positioned=2)
+        events = []
+        g.add_listener(events.append)
+        mc = g.get_mc()
+        self.assertEqual(2, g.set_positions({1: (1.0, 1.0), 2: (5.0, 6.0), 3: (7.0, 8.0), 9: (1.0, 1.0)}))
+        self.assertEqual(mc + 1, g.get_mc())
+        self.assertEqual([('set_pos', 2, (5.0, 6.0)), ('set_pos', 3, (7.0, 8.0))], events)
+        self.assertEqual(0, g.set_positions({2: (5.0, 6.0)}))
+        self.assertEqual(mc + 1, g.get_mc())
+
+    def test_layout_saved(self):
+        ga = GraphAlgo()
+        self.assertTrue(ga.load_from_json('../data/T0.json'))
+        g = ga.get_graph()
+        g.enable_journal()
+        replica = copy.deepcopy(g)
+        mc = g.get_mc()
+        self.assertEqual(g.v_size(), ga.layout())
+        self.assertEqual(0, ga.layout())
+        self.assertTrue(all(n.position is not None for n in g.get_all_v().values()))
+        replica.apply_changes(g.changes_since(mc))
+        self.assertEqual(g, replica)
+        with tempfile.TemporaryDirectory() as tmp:
+            file = os.path.join(tmp, 'T0_layout.json')
+            self.assertTrue(ga.save_to_json(file))
+            ga1 = GraphAlgo()
+            self.assertTrue(ga1.load_from_json(file))
+            self.assertEqual(g, ga1.get_graph())
+            self.assertEqual(0, ga1.layout('force'))
+        with self.assertRaises(ValueError):
+            ga.layout('circle')
+        self.assertEqual(30, GraphAlgo(TestLayout.ring(30)).layout('force', iterations=5))
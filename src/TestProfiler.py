@@ -0,0 +1,143 @@
+import os
+import pickle
+import random
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from GraphAlgo import *
+from Profiler import Profiler
+from TestDiGraph import TestDiGraph as tdg
+
+
+class TestProfiler(TestCase):
+    @staticmethod
+    def chain() -> DiGraph:
+        # 0 -> 1 -> 2 -> 3 and a long edge 0 -> 3
+        g = DiGraph()
+        for i in range(4):
+            g.add_node(i)
+        g.add_edge(0, 1, 1)
+        g.add_edge(1, 2, 1)
+        g.add_edge(2, 3, 1)
+        g.add_edge(0, 3, 10)
+        return g
+
+    def test_record_and_percentiles(self):
+        profiler = Profiler()
+        for i in range(1, 101):
+            profiler.record('op', i / 1000, {'settled': i})
+        op = profiler.stats()['op']
+        self.assertEqual(100, op['calls'])
+        self.assertAlmostEqual(5.05, op['total'])
+        self.assertAlmostEqual(0.0505, op['mean'])
+        self.assertAlmostEqual(0.1, op['max'])
+        self.assertAlmostEqual(0.05, op['p50'])
+        self.assertAlmostEqual(0.09, op['p90'])
+        self.assertAlmostEqual(0.099, op['p99'])
+        self.assertEqual({'total': 5050, 'mean': 50.5, 'max': 100}, op['counters']['settled'])
+        self.assertIn('op', profiler.report())
+        profiler.reset()
+        self.assertEqual({}, profiler.stats())
+
+    def test_samples(self):
+        profiler = Profiler(samples=10)
+        for i in range(100):
+            profiler.record('op', i)
+        op = profiler.stats()['op']
+        self.assertEqual(100, op['calls'])
+        # the percentiles are of the last 10 times, the total and max of all
+        self.assertEqual(94, op['p50'])
+        self.assertEqual(4950, op['total'])
+        self.assertEqual(99, op['max'])
+        self.assertRaises(ValueError, Profiler, 0)
+
+    def test_search_counters(self):
+        ga = GraphAlgo(TestProfiler.chain())
+        stats = {}
+        dist, prev = ga.dijkstra(0, (3,), stats)
+        self.assertEqual(3, dist[3])
+        # 3 is settled but its edges are not relaxed
+        self.assertEqual({'settled': 4, 'relaxed': 4, 'pushes': 4}, stats)
+        stats = {}
+        ga.dijkstra(0, None, stats)
+        self.assertEqual({'settled': 4, 'relaxed': 4, 'pushes': 4}, stats)
+        for method in GraphAlgo.SHORTEST_PATH_METHODS:
+            stats = {}
+            self.assertEqual((3, [0, 1, 2, 3]), ga.search(0, 3, method, stats))
+            self.assertGreater(stats['settled'], 0, method)
+            self.assertGreaterEqual(stats['relaxed'], stats['pushes'], method)
+
+    def test_profile(self):
+        ga = GraphAlgo(TestProfiler.chain(), cache_size=8)
+        with ga.profile() as profiler:
+            self.assertIsNot(ga.shortest_path, GraphAlgo.shortest_path.__get__(ga))
+            ga.shortest_path(0, 3)
+            ga.shortest_path(0, 3)  # from the cache, not searched again
+            ga.connected_components()
+            ga.get_graph().add_edge(3, 0, 1)
+            ga.get_graph().remove_edge(0, 3)
+        # the methods of the class are used again
+        self.assertNotIn('shortest_path', ga.__dict__)
+        self.assertNotIn(profiler.event, ga.get_graph().listeners)
+        ga.shortest_path(1, 3)
+
+        stats = ga.stats()
+        self.assertEqual(stats, profiler.stats())
+        self.assertEqual(2, stats['shortest_path']['calls'])
+        self.assertEqual(1, stats['search']['calls'])
+        self.assertEqual({'total': 4, 'mean': 4, 'max': 4}, stats['search']['counters']['settled'])
+        self.assertEqual(1, stats['connected_components']['calls'])
+        self.assertEqual(1, stats['graph.add_edge']['calls'])
+        self.assertEqual(1, stats['graph.remove_edge']['calls'])
+        self.assertGreater(stats['shortest_path']['p99'], 0)
+        self.assertEqual({}, GraphAlgo().stats())
+
+    def test_nested_profile(self):
+        ga = GraphAlgo(TestProfiler.chain())
+        outer = ga.enable_profiling()
+        with ga.profile() as inner:
+            ga.shortest_path(0, 3)
+        ga.shortest_path(0, 2)
+        ga.disable_profiling()
+        ga.disable_profiling()
+        self.assertEqual(1, inner.stats()['shortest_path']['calls'])
+        self.assertEqual(1, outer.stats()['shortest_path']['calls'])
+        self.assertEqual(outer.stats(), ga.stats())
+
+    def test_load_moves_profiling(self):
+        ga = GraphAlgo(tdg.simple_graph_generate())
+        old = ga.get_graph()
+        profiler = ga.enable_profiling()
+        self.assertTrue(ga.load_from_json('../data/A5'))
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertTrue(ga.save_to_json(os.path.join(tmp, 'g.json')))
+        self.assertEqual([], old.listeners)
+        self.assertIs(profiler, ga.get_graph().profiler)
+        ga.get_graph().add_node(100)
+        ga.disable_profiling()
+        stats = profiler.stats()
+        self.assertEqual(1, stats['load_from_json']['calls'])
+        self.assertEqual(1, stats['save_to_json']['calls'])
+        self.assertEqual(1, stats['graph.add_node']['calls'])
+
+        # the profiler is not pickled with the graph
+        g = ga.get_graph()
+        g.enable_profiling(profiler)
+        copy = pickle.loads(pickle.dumps(g))
+        self.assertIsNone(copy.profiler)
+        self.assertEqual([], copy.listeners)
+
+    def test_threads(self):
+        random.seed(3)
+        g = DiGraph()
+        for i in range(200):
+            g.add_node(i)
+        for _ in range(1000):
+            g.add_edge(random.randint(0, 199), random.randint(0, 199), random.uniform(1, 10))
+        ga = GraphAlgo(g)
+        pairs = [(random.randint(0, 199), random.randint(0, 199)) for _ in range(200)]
+        with ga.profile() as profiler:
+            with ThreadPoolExecutor(4) as pool:
+                list(pool.map(lambda p: ga.shortest_path(*p), pairs))
+        self.assertEqual(200, profiler.stats()['shortest_path']['calls'])
@@ -0,0 +1,5 @@
+"""
+Micro-benchmarks for the graph and its algorithms.
+Every module in this package can be run from the src directory, e.g.:
+py -m benchmarks.shortest_path
+"""
@@ -0,0 +1,43 @@
+"""
+Compares the two methods of GraphAlgo.all_pairs_shortest_paths, the blocked Floyd-Warshall in NumPy
+and repeated Dijkstra, on random graphs of growing density, and shows the method picked by default.
+The ratio of their costs per step is what DistanceMatrix.FW_CELL_COST is set from.
+Usage, from the src directory:
+py -m benchmarks.all_pairs [nodes]
+"""
+import random
+import sys
+from time import perf_counter
+
+from DiGraph import DiGraph
+from DistanceMatrix import FW_CELL_COST
+from GraphAlgo import GraphAlgo
+
+
+def random_graph(v: int, e: int, seed: int = 1) -> DiGraph:
+    rnd = random.Random(seed)
+    g = DiGraph()
+    g.add_nodes_from(range(v))
+    g.add_edges_from((rnd.randrange(v), rnd.randrange(v), rnd.uniform(1, 10)) for _ in range(e))
+    return g
+
+
+def main(v: int = 800, degrees: tuple = (2, 4, 8, 40, 200)):
+    for degree in degrees:
+        ga = GraphAlgo(random_graph(v, v * degree))
+        g = ga.get_graph()
+        times = {}
+        for method in ('floyd_warshall', 'dijkstra'):
+            start = perf_counter()
+            ga.all_pairs_shortest_paths(method)
+            times[method] = perf_counter() - start
+        cost = times['floyd_warshall'] / v ** 3 / (times['dijkstra'] / (v * (v + g.e_size())))
+        picked = 'floyd_warshall' if v * v * FW_CELL_COST < v + g.e_size() else 'dijkstra'
+        print('|V| =', v, '|E| =', str(g.e_size()).ljust(8),
+              'floyd_warshall:', str(round(times['floyd_warshall'], 2)).ljust(6), 's',
+              '\tdijkstra:', str(round(times['dijkstra'], 2)).ljust(6), 's',
+              '\tcell cost:', round(cost, 4), '\tpicked:', picked)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,58 @@
+"""
+Measures building a graph in bulk: add_node / add_edge loops against add_nodes_from / add_edges_from
+of lists and of NumPy arrays (validated and grouped in NumPy, see DiGraph.add_edges_array).
+Usage, from the src directory:
+py -m benchmarks.build [nodes] [edges]
+"""
+import sys
+
+import numpy as np
+
+from DiGraph import DiGraph
+from benchmarks.suite import format_seconds
+from benchmarks.timing import measure
+
+
+def main(v: int = 100000, e: int = 1000000):
+    rnd = np.random.default_rng(1)
+    ids = np.arange(v)
+    edges = np.column_stack([rnd.integers(0, v, e), rnd.integers(0, v, e), rnd.uniform(1, 10, e)])
+    id_list = ids.tolist()
+    edge_list = [(int(a), int(b), c) for a, b, c in edges.tolist()]
+    print('|V| =', v, 'edges given:', e)
+
+    def loop():
+        g = DiGraph()
+        for i in id_list:
+            g.add_node(i)
+        for a, b, c in edge_list:
+            g.add_edge(a, b, c)
+        return g
+
+    def from_lists():
+        g = DiGraph()
+        g.add_nodes_from(id_list)
+        g.add_edges_from(edge_list)
+        return g
+
+    def from_arrays():
+        g = DiGraph()
+        g.add_nodes_from(ids)
+        g.add_edges_from(edges)
+        return g
+
+    assert loop() == from_lists() == from_arrays()
+    for name, func in [('add_node / add_edge loop', loop), ('add_*_from lists', from_lists),
+                       ('add_*_from arrays', from_arrays)]:
+        res = measure(func, 3, memory=False)
+        print('\t', name.ljust(28), format_seconds(res['median']))
+    g = DiGraph()
+    g.add_nodes_from(ids)
+    res = measure(lambda: DiGraph().add_nodes_from(ids), 3, memory=False)
+    print('\t', 'add_nodes_from array only'.ljust(28), format_seconds(res['median']))
+    res = measure(lambda: DiGraph().add_nodes_from(id_list), 3, memory=False)
+    print('\t', 'add_nodes_from list only'.ljust(28), format_seconds(res['median']))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
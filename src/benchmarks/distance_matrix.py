@@ -0,0 +1,43 @@
+"""
+Measures GraphAlgo.distance_matrix with 1, 2, 4 and 8 worker processes,
+against a loop of shortest_path over all the pairs, on a random geometric graph.
+The speedup is bounded by the number of CPUs of the machine (printed first).
+Usage, from the src directory:
+py -m benchmarks.distance_matrix [sources] [geometric graph nodes]
+"""
+import os
+import random
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from GraphAlgo import GraphAlgo
+from benchmarks.generator import geometric_graph
+
+
+def main(sources: int = 64, v: int = 20000, workers: tuple = (1, 2, 4, 8)):
+    ga = GraphAlgo(geometric_graph(v))
+    nodes = list(ga.get_graph().get_all_v())
+    rnd = random.Random(1)
+    depots = rnd.sample(nodes, sources)
+    print('cpus:', os.cpu_count(), '|V| =', len(nodes), '|E| =', ga.get_graph().e_size(),
+          'matrix:', sources, 'x', sources)
+    ga.get_graph().to_csr()
+
+    start = perf_counter()
+    loop = np.array([[ga.shortest_path(s, t)[0] for t in depots] for s in depots[:4]])
+    print('\t', 'shortest_path loop'.ljust(24), round((perf_counter() - start) * sources / 4, 2), 's (estimated)')
+
+    base = None
+    for w in workers:
+        start = perf_counter()
+        res = ga.distance_matrix(depots, workers=w)
+        elapsed = perf_counter() - start
+        base = base or elapsed
+        assert np.allclose(loop, res[:4])
+        print('\t', ('workers=' + str(w)).ljust(24), round(elapsed, 2), 's', '\tspeedup:', round(base / elapsed, 2))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,87 @@
+"""
+Deterministic graph generators for the benchmarks, the same arguments always give the same graph.
+Usage, from the src directory, writes G_{V}_{E}_{seed}.json into a directory:
+py -m benchmarks.generator directory V E [seed]
+"""
+import math
+import os
+import random
+import sys
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+
+
+def circle_graph(v: int, e: int, seed: int = 1) -> DiGraph:
+    """
+    The graphs of the Graphs_on_circle family (G_{V}_{E}_{seed}): v nodes evenly spaced on a circle,
+    and e edges, e // v from every node (one more from the first e % v nodes) to different random nodes
+    other than itself, with weights uniform in [1, 2).
+    :param v: the number of nodes.
+    :param e: the number of edges, at most v * (v - 1).
+    :param seed: the seed of the random choices.
+    :return: new DiGraph
+    """
+    if e > v * (v - 1):
+        raise ValueError('A graph of ' + str(v) + ' nodes has at most ' + str(v * (v - 1)) + ' edges')
+    rnd = random.Random(seed)
+    g = DiGraph()
+    g.add_nodes_from((i, (math.cos(2 * math.pi * i / v), math.sin(2 * math.pi * i / v))) for i in range(v))
+    edges = []
+    for i in range(v):
+        # the targets are drawn from the v - 1 other nodes, t >= i stands for t + 1
+        for t in rnd.sample(range(v - 1), e // v + (1 if i < e % v else 0)):
+            edges.append((i, t if t < i else t + 1, rnd.uniform(1, 2)))
+    g.add_edges_from(edges)
+    return g
+
+
+def circle_graph_name(v: int, e: int, seed: int = 1) -> str:
+    """
+    :return: the file name of a circle graph, G_{V}_{E}_{seed}.json
+    """
+    return 'G_' + str(v) + '_' + str(e) + '_' + str(seed) + '.json'
+
+
+def circle_graph_file(directory: str, v: int, e: int, seed: int = 1) -> str:
+    """
+    Writes the json file of a circle graph (see circle_graph) into directory, unless it is already there.
+    :return: the path of the file.
+    """
+    file_name = os.path.join(directory, circle_graph_name(v, e, seed))
+    if not os.path.exists(file_name):
+        os.makedirs(directory, exist_ok=True)
+        if not GraphAlgo(circle_graph(v, e, seed)).save_to_json(file_name):
+            raise OSError('Can not write ' + file_name)
+    return file_name
+
+
+def geometric_graph(v: int, k: int = 4, seed: int = 1) -> DiGraph:
+    """
+    Random geometric graph: v nodes in a sqrt(v) x sqrt(v) square, edges in both directions
+    from every node to its k nearest neighbours (found through a grid of unit cells),
+    with weight = distance * uniform(1, 1.5).
+    """
+    rnd = random.Random(seed)
+    side = math.sqrt(v)
+    pos = [(rnd.uniform(0, side), rnd.uniform(0, side)) for _ in range(v)]
+    grid = {}
+    for i, (x, y) in enumerate(pos):
+        grid.setdefault((int(x), int(y)), []).append(i)
+    g = DiGraph()
+    g.add_nodes_from(enumerate(pos))
+    edges = []
+    for i, (x, y) in enumerate(pos):
+        cx, cy = int(x), int(y)
+        near = [j for dx in (-1, 0, 1) for dy in (-1, 0, 1) for j in grid.get((cx + dx, cy + dy), ()) if j != i]
+        near.sort(key=lambda j: (pos[j][0] - x) ** 2 + (pos[j][1] - y) ** 2)
+        for j in near[:k]:
+            w = math.dist(pos[i], pos[j]) * rnd.uniform(1, 1.5)
+            edges.append((i, j, w))
+            edges.append((j, i, w))
+    g.add_edges_from(edges)
+    return g
+
+
+if __name__ == '__main__':
+    print(circle_graph_file(sys.argv[1], *[int(a) for a in sys.argv[2:]]))
@@ -0,0 +1,94 @@
+"""
+Measures the load time and the peak memory (RSS) of GraphAlgo.load_from_json,
+against loading with json.load of the whole file followed by add_node/add_edge calls.
+Every loader runs in a fresh process, so the peak RSS of each one is measured on its own.
+Usage, from the src directory:
+py -m benchmarks.load [nodes] [edges per node]
+"""
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+
+
+def generate(file_name: str, v: int, edges_per_node: int, seed: int = 1):
+    """
+    Writes a random graph json file with v nodes and v * edges_per_node edges.
+    The elements are written one by one, so the generator itself does not hold the graph.
+    """
+    rnd = random.Random(seed)
+    with open(file_name, 'w') as f:
+        f.write('{"Edges": [')
+        first = True
+        for src in range(v):
+            dests = [dest for dest in rnd.sample(range(v), edges_per_node + 1) if dest != src]
+            for dest in dests[:edges_per_node]:
+                f.write(('' if first else ', ') + json.dumps({"src": src, "w": rnd.uniform(1, 2), "dest": dest}))
+                first = False
+        f.write('], "Nodes": [')
+        f.write(', '.join(json.dumps({"pos": str(rnd.random()) + ',' + str(rnd.random()) + ',0.0', "id": i})
+                          for i in range(v)))
+        f.write(']}')
+
+
+def load_json_load(file_name: str) -> DiGraph:
+    """
+    Loads the whole document with json.load, then adds the elements one at a time.
+    """
+    with open(file_name, 'r') as file:
+        data = json.load(file)
+        g = DiGraph()
+        for i in data['Nodes']:
+            if 'pos' in i.keys():
+                str_lst = i['pos'].split(',')
+                g.add_node(i['id'], (float(str_lst[0]), float(str_lst[1])))
+            else:
+                g.add_node(i['id'])
+        for i in data['Edges']:
+            g.add_edge(i['src'], i['dest'], i['w'])
+    return g
+
+
+def load_streaming(file_name: str) -> DiGraph:
+    ga = GraphAlgo()
+    ga.load_from_json(file_name)
+    return ga.get_graph()
+
+
+LOADERS = {'json.load': load_json_load, 'load_from_json': load_streaming}
+
+
+def measure(loader: str, file_name: str):
+    """
+    Runs one loader in this process and prints: loader |E| seconds peak_rss_kb
+    """
+    start = perf_counter()
+    g = LOADERS[loader](file_name)
+    elapsed = perf_counter() - start
+    print(loader, g.e_size(), elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def main(v: int = 100000, edges_per_node: int = 10):
+    with tempfile.TemporaryDirectory() as tmp:
+        file_name = os.path.join(tmp, 'G_' + str(v) + '_' + str(v * edges_per_node) + '.json')
+        generate(file_name, v, edges_per_node)
+        print(file_name, os.path.getsize(file_name) // 2 ** 20, 'MB')
+        for loader in LOADERS:
+            out = subprocess.run([sys.executable, '-m', 'benchmarks.load', 'measure', loader, file_name],
+                                 capture_output=True, text=True, check=True).stdout.split()
+            print(loader.ljust(16), '|E| =', out[-3], '\ttime:', round(float(out[-2]), 2), 's',
+                  '\tpeak RSS:', int(out[-1]) // 1024, 'MB')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'measure':
+        measure(sys.argv[2], sys.argv[3])
+    else:
+        main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,89 @@
+"""
+Measures drawing a graph to a png file with the Agg backend (no display needed):
+the time and the peak Python memory (tracemalloc) of Gui.draw, with and without the level of detail options,
+against the old way of drawing, one plt.arrow patch per edge.
+Usage, from the src directory:
+py -m benchmarks.plot [geometric graph nodes] [old: 0 to skip the per-edge drawing]
+"""
+import os
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+
+from GraphAlgo import GraphAlgo
+from Gui import Gui
+from benchmarks.generator import geometric_graph
+
+FILES = ['../data/A5', '../data/1kG.json']
+
+
+def draw_arrows(gui: Gui, file_name: str):
+    """
+    The old Gui.draw: a plt.arrow per edge, saved instead of shown.
+    """
+    fig, ax = plt.subplots()
+    fig.tight_layout()
+    fig.set_size_inches(10, 5)
+    xs = []
+    ys = []
+    labels = []
+    for i in gui.graph.nodes.values():
+        x_src = gui.w2fx(i.position[0])
+        y_src = gui.w2fy(i.position[1])
+        xs.append(x_src)
+        ys.append(y_src)
+        labels.append(i.id)
+        for node_out in i.node_out.keys():
+            n = gui.graph.nodes[node_out]
+            x_dest = gui.w2fx(n.position[0])
+            y_dest = gui.w2fy(n.position[1])
+            plt.arrow(x_src, y_src, -(x_src - x_dest), -(y_src - y_dest), head_width=0.28,
+                      length_includes_head=True)
+    plt.plot(xs, ys, 'ro', markersize=10)
+    for i, txt in enumerate(labels):
+        ax.annotate(txt, (xs[i] - .2, ys[i] - .1), fontsize=8)
+    plt.axis('equal')
+    fig.savefig(file_name)
+    plt.close(fig)
+
+
+def measure(name: str, draw, file_name: str):
+    tracemalloc.start()
+    start = perf_counter()
+    draw(file_name)
+    elapsed = perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print('\t', name.ljust(36), str(round(elapsed, 2)).ljust(8), 's', '\tpeak:', round(peak / 2 ** 20, 1), 'MiB')
+
+
+def compare(name: str, ga: GraphAlgo, old: bool):
+    g = ga.get_graph()
+    print(name, '|V| =', g.v_size(), '|E| =', g.e_size())
+    with tempfile.TemporaryDirectory() as tmp:
+        png = os.path.join(tmp, 'graph.png')
+        if old:
+            measure('plt.arrow per edge', lambda f: draw_arrows(Gui(g, show=False, label_limit=g.v_size()), f), png)
+        measure('Gui.draw', lambda f: Gui(g, show=False, label_limit=g.v_size()).draw(f), png)
+        measure('Gui.draw, no labels', lambda f: Gui(g, show=False, label_limit=0).draw(f), png)
+        measure('Gui.draw, no labels, 2000 edges', lambda f: Gui(g, show=False, max_edges=2000, label_limit=0).draw(f),
+                png)
+
+
+def main(v: int = 5000, old: int = 1):
+    for file in FILES:
+        ga = GraphAlgo()
+        if ga.load_from_json(file):
+            compare(file, ga, bool(old))
+    compare('geometric', GraphAlgo(geometric_graph(v)), bool(old))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
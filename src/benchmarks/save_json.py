@@ -0,0 +1,61 @@
+"""
+Measures GraphAlgo.save_to_json, which streams the file in chunks, with its options,
+against the former implementation, which built the whole document as dictionaries and called json.dump,
+on a circle graph (see generator.circle_graph): the time (median) and the peak Python memory (tracemalloc).
+Usage, from the src directory:
+py -m benchmarks.save_json [nodes] [edges]
+"""
+import json
+import os
+import sys
+import tempfile
+
+from GraphAlgo import GraphAlgo
+from benchmarks.generator import circle_graph_file
+from benchmarks.suite import DATA_DIR, format_bytes, format_seconds
+from benchmarks.timing import measure
+
+
+def old_save_to_json(ga: GraphAlgo, file_name: str) -> bool:
+    """
+    The former save_to_json.
+    """
+    j = dict()
+    j["Edges"] = list()
+    j["Nodes"] = list()
+    for i in ga.get_graph().nodes.values():
+        if i.position is None:
+            pos = '0.0,0.0,0.0'
+        else:
+            pos = str(str(i.position[0]) + ',' + str(i.position[1]) + ',0.0')
+        j["Nodes"].append({"pos": pos, "id": i.id})
+        for key, weight in i.node_out.items():
+            j["Edges"].append({"src": i.id, "w": weight, "dest": key})
+    with open(file_name, 'w') as json_f:
+        json.dump(j, json_f)
+        return True
+
+
+def main(v: int = 10000, e: int = 80000):
+    ga = GraphAlgo()
+    ga.load_from_json(circle_graph_file(DATA_DIR, v, e))
+    print('|V| =', ga.get_graph().v_size(), '|E| =', ga.get_graph().e_size())
+    with tempfile.TemporaryDirectory() as tmp:
+        old = os.path.join(tmp, 'old.json')
+        new = os.path.join(tmp, 'new.json')
+        cases = [('json.dump of the document', old, lambda: old_save_to_json(ga, old)),
+                 ('save_to_json', new, lambda: ga.save_to_json(new)),
+                 ('save_to_json compact', new, lambda: ga.save_to_json(new, compact=True)),
+                 ('save_to_json sort', new, lambda: ga.save_to_json(new, sort=True)),
+                 ('save_to_json compact gzip', new + '.gz', lambda: ga.save_to_json(new + '.gz', compact=True))]
+        for name, file_name, func in cases:
+            res = measure(func, 5)
+            print('\t', name.ljust(28), format_seconds(res['median']).ljust(10),
+                  'peak:', format_bytes(res['peak_bytes']).ljust(10), 'file:', format_bytes(os.path.getsize(file_name)))
+        ga.save_to_json(new)
+        with open(old, 'rb') as f_old, open(new, 'rb') as f_new:
+            print('same bytes as before:', f_old.read() == f_new.read())
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
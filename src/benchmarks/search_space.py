@@ -0,0 +1,60 @@
+"""
+Compares the shortest path methods of GraphAlgo by the number of nodes they settle per query
+(the search space), and by their throughput, on random pairs of nodes.
+The landmarks of alt and the contraction hierarchy of ch are built before the queries,
+their build times are printed separately.
+The graphs are the given json files, and a random geometric graph: nodes scattered in a square,
+each one connected to its nearest neighbours, with weights a bit larger than the distance.
+Usage, from the src directory:
+py -m benchmarks.search_space [queries] [geometric graph nodes]
+"""
+import random
+import sys
+from time import perf_counter
+
+from GraphAlgo import GraphAlgo
+from benchmarks.generator import geometric_graph
+
+FILES = ['../data/1kG.json']
+
+
+def compare(name: str, ga: GraphAlgo, queries: int, methods: tuple):
+    """
+    Prints, for every method, the mean number of settled nodes and the queries per second.
+    """
+    nodes = list(ga.get_graph().get_all_v())
+    rnd = random.Random(1)
+    pairs = [(rnd.choice(nodes), rnd.choice(nodes)) for _ in range(queries)]
+    print(name, '|V| =', len(nodes), '|E| =', ga.get_graph().e_size())
+    if 'alt' in methods:
+        start = perf_counter()
+        ga.build_landmarks()
+        print('\t', 'landmarks built in', round(perf_counter() - start, 2), 's')
+    if 'ch' in methods:
+        start = perf_counter()
+        ga.build_contraction_hierarchy()
+        print('\t', 'contraction hierarchy built in', round(perf_counter() - start, 2), 's')
+    for method in methods:
+        stats = {}
+        search = getattr(ga, method)
+        start = perf_counter()
+        for id1, id2 in pairs:
+            if method == 'dijkstra':
+                search(id1, (id2,), stats)
+            else:
+                search(id1, id2, stats)
+        elapsed = perf_counter() - start
+        print('\t', method.ljust(24), 'settled/query:', str(round(stats['settled'] / queries, 1)).ljust(10),
+              'queries/s:', round(queries / elapsed, 1))
+
+
+def main(queries: int = 200, v: int = 20000, methods: tuple = ('dijkstra', 'bidirectional_dijkstra', 'astar', 'alt', 'ch')):
+    for file in FILES:
+        ga = GraphAlgo()
+        if ga.load_from_json(file):
+            compare(file, ga, queries, methods)
+    compare('geometric', GraphAlgo(geometric_graph(v)), queries, methods)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
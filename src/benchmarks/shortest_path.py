@@ -0,0 +1,124 @@
+"""
+Measures the throughput (queries per second) of GraphAlgo.shortest_path
+on random pairs of nodes of the given json files, against the former implementation (see OldShortestPath),
+so the comparison does not depend on checking out an older version of the code.
+Usage, from the src directory:
+py -m benchmarks.shortest_path [queries] [file ...]
+"""
+import random
+import sys
+from math import isclose
+from queue import PriorityQueue
+from time import perf_counter
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+
+FILES = ['../data/A5', '../data/1kG.json']
+
+
+class OldShortestPath:
+    """
+    The former shortest_path: set_tag_dist runs Dijkstra's Algorithm on a queue.PriorityQueue of (tag, node),
+    after the tags of all the nodes are reset, and the path is rebuilt by list.insert(0, ...).
+    The nodes of the former DiGraph held the tag and were compared by it, they are kept here as Tagged objects.
+    """
+
+    class Tagged:
+        __slots__ = ('id', 'tag', 'node_out')
+
+        def __init__(self, node_id, node_out: dict):
+            self.id = node_id
+            self.tag = -1
+            self.node_out = node_out
+
+        def __lt__(self, other):
+            return self.tag < other.tag
+
+    def __init__(self, g: DiGraph):
+        self.nodes = {i: OldShortestPath.Tagged(i, g.all_out_edges_of_node(i)) for i in g.get_all_v()}
+
+    def init_tags(self):
+        for i in self.nodes.values():
+            i.tag = -1
+
+    def shortest_path(self, id1: int, id2: int) -> (float, list):
+        if id1 not in self.nodes.keys() or id2 not in self.nodes.keys():
+            return float("inf"), None
+        src = self.nodes[id1]
+        dest = self.nodes[id2]
+
+        if id1 == id2:
+            return 0, [src.id]
+
+        path = self.set_tag_dist(id1, id2)
+        if dest.tag == -1:
+            return float("inf"), None
+        curr = id2
+        lst = [id2]
+        while curr != id1:
+            temp = path[curr]
+            lst.insert(0, temp)
+            curr = temp
+
+        return dest.tag, lst
+
+    def set_tag_dist(self, id1, id2):
+        p_queue = PriorityQueue()
+        path = {id1: None}
+        self.init_tags()
+        curr = self.nodes[id1]
+        curr.tag = 0
+        p_queue.put((curr.tag, curr))
+        while not p_queue.empty():
+            curr = p_queue.get()[1]
+            if curr.id == id2:
+                return path
+            if self.nodes[id2].tag != -1:
+                if curr.tag >= self.nodes[id2].tag:
+                    break
+
+            for nodeIn_id, w in curr.node_out.items():
+                n = self.nodes[nodeIn_id]
+                if n.tag == -1 or n.tag > curr.tag + w:
+                    n.tag = curr.tag + w
+                    p_queue.put((n.tag, n))
+                    path[n.id] = curr.id
+
+        return path
+
+
+def queries_per_second(shortest_path, pairs: list) -> float:
+    """
+    Runs shortest_path on every pair, after one warm-up query.
+    :param shortest_path: function of (id1, id2), e.g. GraphAlgo.shortest_path of a loaded graph.
+    :param pairs: list of (id1, id2).
+    :return: number of queries per second.
+    """
+    shortest_path(*pairs[0])
+    start = perf_counter()
+    for id1, id2 in pairs:
+        shortest_path(id1, id2)
+    return len(pairs) / (perf_counter() - start)
+
+
+def main(queries: int = 1000, files: list = None):
+    for file in files or FILES:
+        ga = GraphAlgo()
+        if not ga.load_from_json(file):
+            continue
+        old = OldShortestPath(ga.get_graph())
+        nodes = list(ga.get_graph().get_all_v())
+        rnd = random.Random(1)
+        pairs = [(rnd.choice(nodes), rnd.choice(nodes)) for _ in range(queries)]
+        for id1, id2 in pairs[:100]:
+            assert isclose(old.shortest_path(id1, id2)[0], ga.shortest_path(id1, id2)[0])
+        before = queries_per_second(old.shortest_path, pairs)
+        after = queries_per_second(ga.shortest_path, pairs)
+        print(file, '|V| =', len(nodes), '|E| =', ga.get_graph().e_size(),
+              '\tset_tag_dist:', round(before, 1), 'queries/s',
+              '\tshortest_path:', round(after, 1), 'queries/s', '\tx' + str(round(after / before, 1)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000, sys.argv[2:])
@@ -0,0 +1,159 @@
+"""
+The benchmark suite of GraphAlgo: load, save, shortest_path, connected_component and connected_components
+on the circle graphs G_{V}_{E}_{seed} (see generator.circle_graph), generated on the first run.
+Every case is timed by timing.measure (warm-up, repeated perf_counter runs, peak memory),
+and the results can be written as json and compared with the results of an earlier run,
+flagging the cases that became slower (or use more memory) by more than a threshold.
+Usage, from the src directory:
+py -m benchmarks.suite run [--sizes 1000x8000 10000x80000] [--cases load save] [--repeats 5] [--out results.json]
+py -m benchmarks.suite compare old.json new.json [--threshold 0.1]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from GraphAlgo import GraphAlgo
+from benchmarks.generator import circle_graph_file
+from benchmarks.timing import measure
+
+DATA_DIR = os.path.join('..', 'data', 'Graphs_on_circle')
+SIZES = ['10x80', '100x800', '1000x8000', '10000x80000']
+CASES = ('load', 'save', 'shortest_path', 'connected_component', 'connected_components')
+QUERIES = 20  # shortest_path pairs and connected_component nodes per run
+THRESHOLD = 0.1  # a case is a regression if it got slower by more than this fraction
+
+
+def cases(file_name: str, tmp: str, seed: int = 1) -> dict:
+    """
+    :param file_name: the json file of the graph.
+    :param tmp: a directory for the files written by save.
+    :return: dictionary of case name -> function without arguments that runs the case once.
+    """
+    ga = GraphAlgo()
+    if not ga.load_from_json(file_name):
+        raise OSError('Can not load ' + file_name)
+    nodes = list(ga.get_graph().get_all_v())
+    rnd = random.Random(seed)
+    pairs = [(rnd.choice(nodes), rnd.choice(nodes)) for _ in range(QUERIES)]
+    sources = [rnd.choice(nodes) for _ in range(QUERIES)]
+    saved = os.path.join(tmp, 'saved.json')
+
+    def shortest_path():
+        for id1, id2 in pairs:
+            ga.shortest_path(id1, id2)
+
+    def connected_component():
+        for id1 in sources:
+            ga.connected_component(id1)
+
+    return {'load': lambda: GraphAlgo().load_from_json(file_name),
+            'save': lambda: ga.save_to_json(saved),
+            'shortest_path': shortest_path,
+            'connected_component': connected_component,
+            'connected_components': ga.connected_components}
+
+
+def run(sizes: list, repeats: int, warmup: int, seed: int = 1, data_dir: str = DATA_DIR, names=CASES) -> dict:
+    """
+    Runs every case on every graph size, printing the results as they come.
+    :param sizes: list of 'VxE' strings.
+    :param names: the cases to run, some of CASES.
+    :return: the results, as written by main: {'meta': {...}, 'results': [{'case', 'graph', times...}]}
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            v, e = (int(a) for a in size.split('x'))
+            file_name = circle_graph_file(data_dir, v, e, seed)
+            graph = os.path.basename(file_name)[:-len('.json')]
+            for name, func in cases(file_name, tmp, seed).items():
+                if name not in names:
+                    continue
+                res = measure(func, repeats, warmup)
+                res.update(case=name, graph=graph)
+                results.append(res)
+                print(graph.ljust(22), name.ljust(22), 'median:', format_seconds(res['median']).ljust(10),
+                      'min:', format_seconds(res['min']).ljust(10), 'peak:', format_bytes(res['peak_bytes']))
+    meta = {'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(),
+            'numpy': np.__version__, 'platform': platform.platform(), 'machine': platform.machine(),
+            'repeats': repeats, 'warmup': warmup, 'seed': seed}
+    return {'meta': meta, 'results': results}
+
+
+def compare(old: dict, new: dict, threshold: float = THRESHOLD) -> list:
+    """
+    Compares the times and the peak memory of the cases that appear in both results,
+    a case is slower if both its median and its min time grew by more than threshold
+    (one noisy run does not flag it).
+    :return: list of the (graph, case, what) regressions, what is 'time' or 'memory'.
+    """
+    before = {(r['graph'], r['case']): r for r in old['results']}
+    regressions = []
+    for r in new['results']:
+        key = (r['graph'], r['case'])
+        if key not in before:
+            continue
+        b = before[key]
+        ratio = r['median'] / b['median'] if b['median'] > 0 else 1.0
+        min_ratio = r['min'] / b['min'] if b['min'] > 0 else 1.0
+        flags = []
+        if ratio > 1 + threshold and min_ratio > 1 + threshold:
+            flags.append('time')
+        if b.get('peak_bytes') and r.get('peak_bytes') and r['peak_bytes'] > b['peak_bytes'] * (1 + threshold):
+            flags.append('memory')
+        regressions.extend((key[0], key[1], what) for what in flags)
+        print(key[0].ljust(22), key[1].ljust(22), format_seconds(b['median']).rjust(10), '->',
+              format_seconds(r['median']).ljust(10), ('x' + format(ratio, '.2f')).ljust(7),
+              'REGRESSION (' + ', '.join(flags) + ')' if flags else ('faster' if ratio < 1 - threshold else ''))
+    return regressions
+
+
+def format_seconds(t: float) -> str:
+    return format(t * 1000, '.3f') + ' ms' if t < 1 else format(t, '.3f') + ' s'
+
+
+def format_bytes(n) -> str:
+    return '-' if n is None else format(n / 2 ** 20, '.2f') + ' MiB'
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='benchmarks.suite', description='Benchmark suite of GraphAlgo.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('--sizes', nargs='+', default=SIZES, help='graph sizes as VxE')
+    run_parser.add_argument('--cases', nargs='+', default=CASES, choices=CASES)
+    run_parser.add_argument('--repeats', type=int, default=5)
+    run_parser.add_argument('--warmup', type=int, default=1)
+    run_parser.add_argument('--seed', type=int, default=1)
+    run_parser.add_argument('--data', default=DATA_DIR, help='directory of the generated graphs')
+    run_parser.add_argument('--out', help='json file to write the results to')
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        results = run(args.sizes, args.repeats, args.warmup, args.seed, args.data, args.cases)
+        if args.out:
+            with open(args.out, 'w') as f:
+                json.dump(results, f, indent=2)
+        return 0
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    regressions = compare(old, new, args.threshold)
+    print(len(regressions), 'regression(s)')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""
+Repeated timing of a function, shared by the benchmarks.
+"""
+import gc
+import statistics
+import tracemalloc
+from time import perf_counter
+
+
+def measure(func, repeats: int = 5, warmup: int = 1, memory: bool = True) -> dict:
+    """
+    Times func: warmup untimed calls, then repeats timed calls (perf_counter, with the garbage collector
+    off while timing), then, if memory is True, one more call traced by tracemalloc for its peak memory
+    (apart from the timed calls, tracing slows them down).
+    :param func: function without arguments.
+    :return: dictionary of the times in seconds: min, median, mean, max, stdev, repeats,
+    and peak_bytes, the largest memory allocated at once during a call (None if memory is False).
+    """
+    for _ in range(warmup):
+        func()
+    times = []
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = perf_counter()
+            func()
+            times.append(perf_counter() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'min': min(times), 'median': statistics.median(times), 'mean': statistics.fmean(times),
+            'max': max(times), 'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+            'repeats': repeats, 'peak_bytes': peak}